@@ -0,0 +1,248 @@
+# 타법개정문 일괄 생성 도구.
+# (찾을 문자열, 바꿀 문자열, 배제할 법률) 행이 담긴 CSV 또는 JSONL 파일을 읽어 행마다 개정문을 생성하고,
+# 법률 하나의 처리가 끝날 때마다 결과를 JSONL 또는 HTML 파일에 바로 기록합니다.
+# 모든 행이 법령 본문 캐시와 덩어리 추출/규칙 문장 메모를 함께 사용하므로, 여러 행에 걸친 법률은 한 번만 내려받습니다.
+# 사용법: python law_batch.py pairs.csv --output result.jsonl [--workers N] [--processes N] [--combine] [--resume]
+#         [--ignore-spacing]
+#         python law_batch.py pairs.jsonl --output result.html [--exclude 법률1,법률2]
+#
+# CSV 파일은 행마다 찾을 문자열, 바꿀 문자열, 배제할 법률(쉼표로 구분, 생략 가능) 순서의 열을 가지며,
+# 첫 행이 머리글(find 또는 찾을 문자열)이면 건너뜁니다.
+# JSONL 파일은 행마다 {"find": ..., "replace": ..., "exclude": [...] 또는 "법률1,법률2"} 객체를 가집니다.
+# 공백이 포함된 문자열을 개정하려면 화면에서와 같이 찾을 문자열을 큰따옴표로 감싸주세요.
+
+import argparse
+import csv
+import html
+import json
+import os
+import time
+
+import law_processor
+
+CSV_HEADERS = ("find", "찾을 문자열")
+
+def split_exclude_laws(value):
+    """배제할 법률 입력(쉼표로 구분한 문자열 또는 목록)을 법률명 목록으로 변환"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [law.strip() for law in value if law.strip()]
+
+def read_pair_rows(path):
+    """
+    CSV 또는 JSONL 파일에서 (행 번호, 찾을 문자열, 바꿀 문자열, 배제할 법률 목록) 목록을 읽는 함수.
+    행 번호는 파일의 줄 번호이며, 빈 줄은 건너뜁니다.
+    """
+    rows = []
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8-sig") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise SystemExit(f"{path}:{line_no}: JSON 형식 오류 - {e}")
+                if not isinstance(row, dict) or not row.get("find") or row.get("replace") is None:
+                    raise SystemExit(f"{path}:{line_no}: find와 replace 항목이 필요합니다.")
+                rows.append((line_no, row["find"], row["replace"], split_exclude_laws(row.get("exclude"))))
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            for line_no, row in enumerate(csv.reader(f), 1):
+                if not any(cell.strip() for cell in row):
+                    continue
+                if not rows and row[0].strip().lower() in CSV_HEADERS:
+                    continue # 머리글 행
+                if len(row) < 2 or not row[0].strip():
+                    raise SystemExit(f"{path}:{line_no}: 찾을 문자열과 바꿀 문자열 열이 필요합니다.")
+                rows.append((line_no, row[0], row[1], split_exclude_laws(row[2] if len(row) > 2 else "")))
+    return rows
+
+def plan_runs(rows, extra_exclude, combine):
+    """
+    입력 행들을 실행 단위 (행 번호 목록, (찾을 문자열, 바꿀 문자열) 쌍 목록, 배제할 법률 목록) 목록으로 묶는 함수.
+    combine이 참이면 배제할 법률 목록이 같은 행들을 하나로 묶어, 법률마다 모든 쌍의 개정 규칙을 합친 개정문 하나를 만듭니다.
+    """
+    runs = []
+    grouped = {}
+    for line_no, find_word, replace_word, exclude_laws in rows:
+        exclude_laws = exclude_laws + [law for law in extra_exclude if law not in exclude_laws]
+        key = tuple(sorted(set(law_processor.normalize_exclude_laws(exclude_laws))))
+        if combine and key in grouped:
+            run = grouped[key]
+            run[0].append(line_no)
+            run[1].append((find_word, replace_word))
+            continue
+        run = ([line_no], [(find_word, replace_word)], exclude_laws)
+        grouped[key] = run
+        runs.append(run)
+    return runs
+
+class JsonlWriter:
+    """
+    결과를 JSONL로 기록하는 클래스.
+    법률마다 {"type": "law", ...} 한 줄을, 실행 단위가 끝나면 {"type": "run", ...} 요약 한 줄을 기록합니다.
+    """
+
+    def __init__(self, path, resume=False):
+        self.done_rows = set()
+        mode = "w"
+        if resume and os.path.exists(path):
+            self.done_rows = self._keep_finished_runs(path)
+            mode = "a"
+        self.f = open(path, mode, encoding="utf-8")
+
+    @staticmethod
+    def _keep_finished_runs(path):
+        """
+        이전 실행의 출력에서 빠짐없이 끝난 실행 단위의 줄만 남기고, 끝난 행 번호 집합을 반환.
+        중단되었거나 일부 법률을 가져오지 못한 실행 단위는 지워서 다시 처리하도록 합니다.
+        """
+        with open(path, encoding="utf-8") as f:
+            records = []
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass # 중단되며 잘린 마지막 줄
+        done_rows = {tuple(record["rows"]) for record in records if record.get("type") == "run" and record.get("complete")}
+        with open(path, "w", encoding="utf-8") as f:
+            for record in records:
+                if tuple(record["rows"]) in done_rows:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return done_rows
+
+    def is_done(self, run):
+        return tuple(run[0]) in self.done_rows
+
+    def start_run(self, run):
+        pass
+
+    def write_law(self, run, law_name, amendment):
+        self._write({"type": "law", "rows": run[0], "law": law_name, "amendment": amendment})
+
+    def finish_run(self, run, summary):
+        self._write({"type": "run", "rows": run[0], "pairs": run[1], "exclude": run[2], **summary})
+
+    def _write(self, record):
+        self.f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.f.flush() # 법률 하나가 끝날 때마다 디스크에 기록
+
+    def close(self):
+        self.f.close()
+
+class HtmlWriter:
+    """결과를 하나의 HTML 문서로 기록하는 클래스 (실행 단위마다 제목을 달고 법률별 개정문을 차례로 기록)"""
+
+    def __init__(self, path, resume=False):
+        if resume:
+            raise SystemExit("--resume은 JSONL 출력에서만 사용할 수 있습니다.")
+        self.f = open(path, "w", encoding="utf-8")
+        self.f.write('<!DOCTYPE html>\n<html lang="ko">\n<head><meta charset="utf-8"><title>타법개정문</title></head>\n<body>\n')
+        self.f.flush()
+
+    def is_done(self, run):
+        return False
+
+    def start_run(self, run):
+        title = ", ".join(f"{find_word} → {replace_word}" for find_word, replace_word in run[1])
+        rows = ", ".join(map(str, run[0]))
+        self.f.write(f"<h2>{html.escape(title)} <small>(행 {rows})</small></h2>\n")
+        self.f.flush()
+
+    def write_law(self, run, law_name, amendment):
+        self.f.write(f"<p>{amendment}</p>\n")
+        self.f.flush()
+
+    def finish_run(self, run, summary):
+        if not summary["amended"]:
+            self.f.write("<p>⚠️ 개정 대상 조문이 없습니다.</p>\n")
+        if not summary["complete"]:
+            self.f.write("<p>⚠️ 일부 법률의 목록이나 본문을 가져오지 못했습니다. 다시 실행해주세요.</p>\n")
+        self.f.flush()
+
+    def close(self):
+        self.f.write("</body>\n</html>\n")
+        self.f.close()
+
+def run_batch(runs, writer, max_workers=None, spacing_insensitive=False):
+    """
+    실행 단위를 차례로 처리하며 법률별 개정문을 writer에 기록하는 함수.
+    모든 실행 단위가 법령 본문 캐시와 하나의 덩어리 추출/규칙 문장 메모(AmendmentMemo)를 함께 사용합니다.
+    spacing_insensitive가 참이면 띄어쓰기만 다른 표기도 찾습니다.
+    끝까지 처리하지 못한 법률이 있는 실행 단위의 수를 반환합니다.
+    """
+    memo = law_processor.AmendmentMemo()
+    incomplete = 0
+    for number, run in enumerate(runs, 1):
+        rows, pairs, exclude_laws = run
+        label = ", ".join(f"'{find_word}' → '{replace_word}'" for find_word, replace_word in pairs)
+        if writer.is_done(run):
+            print(f"[{number}/{len(runs)}] 이미 처리됨: {label}")
+            continue
+        writer.start_run(run)
+        metrics = law_processor.RunMetrics()
+        processed = total = amended = 0
+        for processed, total, law_name, amendment, _ in law_processor.iter_batch_amendment_logic(
+                pairs, exclude_laws, max_workers, memo, metrics, with_law_name=True,
+                spacing_insensitive=spacing_insensitive):
+            if amendment:
+                amended += 1
+                writer.write_law(run, law_name, amendment)
+        metrics.finish()
+        report = metrics.report()
+        complete = law_processor.is_complete_run(metrics)
+        incomplete += not complete
+        writer.finish_run(run, {
+            "processed": processed, "total": total, "amended": amended, "complete": complete,
+            "skipped_laws": report["skipped_laws"], "wall_seconds": report["wall_seconds"],
+        })
+        print(
+            f"[{number}/{len(runs)}] {label}: 개정 {amended}개 법률 / 처리 {processed}개 법률 "
+            f"({report['wall_seconds']:.1f}초){'' if complete else ' - 일부 법률 누락, 다시 실행 필요'}"
+        )
+    return incomplete
+
+def main(argv=None):
+    """명령행 인자를 해석하여 개정문 일괄 생성을 실행하는 함수"""
+    parser = argparse.ArgumentParser(description="타법개정문 일괄 생성 도구")
+    parser.add_argument("pairs", help="(찾을 문자열, 바꿀 문자열, 배제할 법률) 행이 담긴 CSV 또는 JSONL 파일")
+    parser.add_argument("--output", required=True, help="결과 파일 경로 (확장자가 .html이면 HTML, 그 밖에는 JSONL)")
+    parser.add_argument("--exclude", default="", help="모든 행에 공통으로 배제할 법률 (쉼표로 구분)")
+    parser.add_argument("--combine", action="store_true",
+                        help="배제할 법률이 같은 행들을 묶어 법률마다 모든 쌍의 개정 규칙을 합친 개정문 하나를 생성")
+    parser.add_argument("--ignore-spacing", action="store_true",
+                        help="찾을 문자열과 띄어쓰기만 다른 표기도 찾기 (개정문에는 원문 표기 그대로 인용)")
+    parser.add_argument("--workers", type=int, default=None, help="동시에 진행할 최대 요청 수")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="법률별 파싱과 개정 규칙 생성을 나눠 맡을 작업 프로세스 수 (0이면 스레드에서 처리, "
+                             f"대상 법률이 {law_processor.PARSE_PROCESS_MIN_LAWS}개 미만인 실행도 스레드에서 처리)")
+    parser.add_argument("--resume", action="store_true", help="JSONL 출력에서 이미 끝난 행은 건너뛰고 이어서 처리")
+    parser.add_argument("--verbose", action="store_true", help="법률별 디버깅 메시지 출력")
+    args = parser.parse_args(argv)
+
+    law_processor.DEBUG_LOG = args.verbose
+    if args.processes is not None:
+        law_processor.PARSE_PROCESSES = args.processes
+
+    rows = read_pair_rows(args.pairs)
+    if not rows:
+        raise SystemExit(f"{args.pairs}: 처리할 행이 없습니다.")
+    runs = plan_runs(rows, split_exclude_laws(args.exclude), args.combine)
+
+    writer_class = HtmlWriter if args.output.lower().endswith((".html", ".htm")) else JsonlWriter
+    writer = writer_class(args.output, args.resume)
+    start = time.perf_counter()
+    try:
+        incomplete = run_batch(runs, writer, args.workers, args.ignore_spacing)
+    finally:
+        writer.close()
+        law_processor.shutdown_process_pool()
+    print(f"일괄 생성 완료: {len(rows)}개 행, {len(runs)}개 실행 단위 ({time.perf_counter() - start:.1f}초) → {args.output}")
+    if incomplete:
+        raise SystemExit(f"{incomplete}개 실행 단위에서 일부 법률을 가져오지 못했습니다. --resume으로 다시 실행하면 해당 행만 다시 처리합니다.")
+
+if __name__ == "__main__":
+    main()
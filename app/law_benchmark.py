@@ -0,0 +1,324 @@
+# 검색/개정문 생성 성능 측정 도구.
+# 법제처 API(lawSearch.do, lawService.do) 응답을 미리 녹화해 두고, 로컬 가짜 HTTP 서버로 지연 시간을 주어 재생하면서
+# run_search_logic, run_amendment_logic을 대표 시나리오별로 실행하여 실행 시간, 요청 수, 파싱한 바이트 수,
+# 최대 메모리 사용량(RSS), 단계별 소요 시간을 측정합니다. 네트워크 없이 성능 회귀를 검사하는 데 사용합니다.
+# tests/fixtures/benchmark에는 법률 3개로 녹화한 작은 예시 녹화가 있으며, 테스트(tests/test_law_benchmark.py)에서 재생합니다.
+# 사용법: python law_benchmark.py record --fixtures DIR [--scenarios FILE] [--upstream URL]
+#         python law_benchmark.py run --fixtures DIR [--latency 초] [--repeat N] [--processes N] [--output FILE]
+#                                     [--baseline FILE] [--tolerance 비율]
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import get_context
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import law_processor
+
+# 시나리오 파일을 주지 않았을 때 사용하는 대표 시나리오
+DEFAULT_SCENARIOS = [
+    {"name": "search-word", "kind": "search", "query": "지방법원"},
+    {"name": "search-phrase", "kind": "search", "query": '"특정범죄 가중처벌"'},
+    {"name": "search-spacing", "kind": "search", "query": "특정범죄 가중처벌"},
+    {"name": "search-boolean", "kind": "search", "query": "법원 AND NOT 지방법원"},
+    {"name": "amend-word", "kind": "amendment", "find": "지방법원", "replace": "지방재판소"},
+    {"name": "amend-phrase", "kind": "amendment", "find": '"특정범죄 가중처벌 등에 관한 법률"', "replace": "특정범죄처벌법"},
+    {"name": "amend-middle-dot", "kind": "amendment", "find": "시#도지사", "replace": "시#도의 장"},
+    {"name": "amend-spacing", "kind": "amendment", "find": "특정범죄가중처벌", "replace": "특정범죄처벌", "spacing": True},
+]
+
+# 녹화 파일 목록과 시나리오를 기록하는 파일 이름
+MANIFEST_NAME = "manifest.json"
+
+# 성능 회귀로 판단하지 않는 측정값 증가 비율의 기본값 (실행 시간, 메모리)
+DEFAULT_TOLERANCE = 0.2
+
+def fixture_key(path):
+    """
+    요청 경로를 녹화 파일 조회용 키로 변환하는 함수.
+    API 이름과 정렬된 쿼리 인자로 구성하며, 인증키(OC)는 녹화 파일에 남지 않도록 제외합니다.
+    """
+    parsed = urlparse(path)
+    params = sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k != "OC")
+    return f"{parsed.path.rsplit('/', 1)[-1]}?{urlencode(params)}"
+
+def load_manifest(fixtures_dir):
+    """녹화 디렉터리의 manifest.json을 읽어 반환하는 함수. 없으면 빈 manifest를 반환합니다."""
+    path = os.path.join(fixtures_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"responses": {}, "scenarios": []}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+class FixtureServer(ThreadingHTTPServer):
+    """
+    녹화된 API 응답을 재생하는 로컬 HTTP 서버.
+    upstream이 주어지면 녹화 모드로 동작하여, 처음 보는 요청은 실제 API로 전달하고 응답을 녹화 디렉터리에 저장합니다.
+    API별 요청 수와 응답 바이트 수를 집계합니다.
+    """
+    daemon_threads = True
+
+    def __init__(self, fixtures_dir, latency=0.0, upstream=None):
+        super().__init__(("127.0.0.1", 0), FixtureRequestHandler)
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.upstream = upstream
+        self.manifest = load_manifest(fixtures_dir)
+        self.stats_lock = threading.Lock()
+        self.stats = {}
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def snapshot(self):
+        """API별 집계 값을 복사하여 반환하는 함수"""
+        with self.stats_lock:
+            return {api: dict(counts) for api, counts in self.stats.items()}
+
+    def count(self, api, size, missing=False):
+        with self.stats_lock:
+            counts = self.stats.setdefault(api, {"requests": 0, "bytes": 0, "missing": 0})
+            counts["requests"] += 1
+            counts["bytes"] += size
+            counts["missing"] += int(missing)
+
+    def lookup(self, path):
+        """요청에 해당하는 녹화 응답을 반환하는 함수. 녹화 모드에서는 없는 응답을 실제 API에서 받아 저장합니다."""
+        key = fixture_key(path)
+        file_name = self.manifest["responses"].get(key)
+        if file_name is not None:
+            with open(os.path.join(self.fixtures_dir, file_name), "rb") as f:
+                return f.read()
+        if self.upstream is None:
+            return None
+        res = law_processor.http_get(self.upstream + path)
+        if res.status_code != 200:
+            return None
+        file_name = os.path.join("responses", hashlib.sha1(key.encode("utf-8")).hexdigest() + ".xml")
+        os.makedirs(os.path.join(self.fixtures_dir, "responses"), exist_ok=True)
+        with open(os.path.join(self.fixtures_dir, file_name), "wb") as f:
+            f.write(res.content)
+        with self.stats_lock:
+            self.manifest["responses"][key] = file_name
+        return res.content
+
+    def save_manifest(self, scenarios):
+        self.manifest["scenarios"] = scenarios
+        with open(os.path.join(self.fixtures_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass # 요청마다 로그를 출력하지 않음
+
+    def do_GET(self):
+        api = urlparse(self.path).path.rsplit("/", 1)[-1]
+        if self.server.latency > 0:
+            time.sleep(self.server.latency)
+        body = self.server.lookup(self.path)
+        self.server.count(api, len(body or b""), missing=body is None)
+        if body is None:
+            self.send_error(404, "녹화된 응답 없음")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def result_digest(result):
+    """결과가 바뀌지 않았는지 비교할 수 있도록 결과의 SHA-1 요약값을 계산하는 함수"""
+    return hashlib.sha1(json.dumps(result, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+def run_scenario(scenario, base_url, max_workers=None, rate_limit=0.0, processes=0):
+    """
+    빈 캐시로 시나리오 하나를 실행하고 측정값을 반환하는 함수 (별도 프로세스에서 실행).
+    프로세스마다 따로 실행하므로 최대 RSS가 시나리오별로 측정되고, 모듈 전역 상태가 다른 시나리오에 영향을 주지 않습니다.
+    """
+    cache_dir = tempfile.mkdtemp(prefix="law_benchmark_")
+    law_processor.BASE = base_url
+    law_processor.HTTP_RATE_LIMIT = rate_limit
+    law_processor.CACHE_DIR = cache_dir
+    law_processor.INDEX_PATH = os.path.join(cache_dir, "law_index.sqlite3")
+    law_processor.SYNC_MANIFEST_PATH = os.path.join(cache_dir, "law_sync_manifest.json")
+    law_processor.DEBUG_LOG = False # 디버깅 출력은 측정에서 제외
+    law_processor.PARSE_PROCESSES = processes
+    metrics = law_processor.RunMetrics()
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): # 오류 안내 출력도 보고서에 섞이지 않도록 버림
+            if scenario["kind"] == "search":
+                result = law_processor.run_search_logic(scenario["query"], scenario.get("unit", "법률"), max_workers, metrics)
+            else:
+                result = law_processor.run_amendment_logic(
+                    scenario["find"], scenario["replace"], scenario.get("exclude", []), max_workers, metrics,
+                    spacing_insensitive=scenario.get("spacing", False)
+                )
+        wall = time.perf_counter() - start
+    finally:
+        law_processor.shutdown_process_pool() # 작업 프로세스가 남아 있으면 이 프로세스가 종료되지 않음
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    run_report = metrics.report()
+    return {
+        "wall_seconds": round(wall, 4),
+        "bytes_parsed": run_report["counters"].get("xml_bytes", 0), # 빈 캐시로 실행하므로 내려받은 XML을 모두 파싱함
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "baseline_rss_kb": rss_before,
+        # 프로세스 풀 모드에서 작업 프로세스 중 가장 큰 최대 RSS (종료된 자식 프로세스 기준)
+        "peak_worker_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        "stages": run_report["stages"],
+        "run_report": run_report,
+        "results": len(result),
+        "result_sha1": result_digest(result),
+    }
+
+def run_benchmark(server, scenarios, repeat=1, max_workers=None, rate_limit=0.0, processes=0):
+    """
+    시나리오를 차례로 repeat회씩 실행하여 시나리오별 측정값을 담은 보고서를 반환하는 함수.
+    실행 시간과 최대 RSS는 반복 중 가장 작은 값을 사용합니다.
+    """
+    report = {
+        "latency_seconds": server.latency,
+        "repeat": repeat,
+        "max_workers": max_workers or law_processor.MAX_WORKERS,
+        "processes": processes,
+        "scenarios": {},
+    }
+    context = get_context("spawn")
+    for scenario in scenarios:
+        runs = []
+        for _ in range(repeat):
+            before = server.snapshot()
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                measured = executor.submit(run_scenario, scenario, server.base_url, max_workers, rate_limit, processes).result()
+            after = server.snapshot()
+            measured["requests"] = {
+                api: {key: value - before.get(api, {}).get(key, 0) for key, value in counts.items()}
+                for api, counts in sorted(after.items())
+            }
+            runs.append(measured)
+        best = min(runs, key=lambda measured: measured["wall_seconds"])
+        best["peak_rss_kb"] = min(measured["peak_rss_kb"] for measured in runs)
+        best["wall_seconds_all"] = [measured["wall_seconds"] for measured in runs]
+        report["scenarios"][scenario["name"]] = best
+        total_requests = sum(counts["requests"] for counts in best["requests"].values())
+        print(
+            f"{scenario['name']}: {best['wall_seconds']:.3f}초, 요청 {total_requests}회, "
+            f"파싱 {best['bytes_parsed']:,}바이트, 최대 RSS {best['peak_rss_kb']:,}KB, 결과 {best['results']}개"
+        )
+    return report
+
+def compare_reports(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    기준 보고서와 비교하여 성능 회귀 목록을 반환하는 함수.
+    요청 수, 파싱한 바이트 수, 결과 요약값은 기준보다 늘거나 바뀌면 안 되고,
+    실행 시간과 최대 RSS는 기준의 (1 + tolerance)배를 넘으면 회귀로 판단합니다.
+    """
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        current = report["scenarios"].get(name)
+        if current is None:
+            continue # 이번 실행에 포함되지 않은 시나리오
+        if current["result_sha1"] != base["result_sha1"]:
+            regressions.append(f"{name}: 결과가 기준과 다릅니다.")
+        for api, counts in base["requests"].items():
+            requests_now = current["requests"].get(api, {}).get("requests", 0)
+            if requests_now > counts["requests"]:
+                regressions.append(f"{name}: {api} 요청 수 {counts['requests']} → {requests_now}")
+        if current["bytes_parsed"] > base["bytes_parsed"]:
+            regressions.append(f"{name}: 파싱한 바이트 수 {base['bytes_parsed']:,} → {current['bytes_parsed']:,}")
+        for key, label in [("wall_seconds", "실행 시간(초)"), ("peak_rss_kb", "최대 RSS(KB)")]:
+            if current[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{name}: {label} {base[key]} → {current[key]}")
+    return regressions
+
+def load_scenarios(path):
+    """시나리오 JSON 파일(시나리오 목록)을 읽어 반환하는 함수"""
+    with open(path, encoding="utf-8") as f:
+        scenarios = json.load(f)
+    for scenario in scenarios:
+        if scenario.get("kind") not in ("search", "amendment") or "name" not in scenario:
+            raise SystemExit(f"잘못된 시나리오: {scenario}")
+    return scenarios
+
+def main(argv=None):
+    """명령행 인자를 해석하여 녹화 또는 성능 측정을 실행하는 함수"""
+    parser = argparse.ArgumentParser(description="검색/개정문 생성 성능 측정 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="실제 API 응답을 녹화 디렉터리에 저장")
+    record_parser.add_argument("--fixtures", required=True, help="녹화 디렉터리")
+    record_parser.add_argument("--scenarios", default=None, help="시나리오 JSON 파일 (기본값: 대표 시나리오)")
+    record_parser.add_argument("--workers", type=int, default=None, help="동시에 진행할 최대 요청 수")
+    record_parser.add_argument("--upstream", default=law_processor.BASE, help="녹화할 API 서버 주소")
+
+    run_parser = subparsers.add_parser("run", help="녹화된 응답을 재생하며 성능 측정")
+    run_parser.add_argument("--fixtures", required=True, help="녹화 디렉터리")
+    run_parser.add_argument("--scenarios", default=None, help="시나리오 JSON 파일 (기본값: 녹화 시 사용한 시나리오)")
+    run_parser.add_argument("--latency", type=float, default=0.0, help="응답마다 추가할 지연 시간(초)")
+    run_parser.add_argument("--repeat", type=int, default=1, help="시나리오별 반복 횟수")
+    run_parser.add_argument("--workers", type=int, default=None, help="동시에 진행할 최대 요청 수")
+    run_parser.add_argument("--rate-limit", type=float, default=0.0, help="초당 최대 요청 수 (0이면 제한 없음)")
+    run_parser.add_argument("--processes", type=int, default=0,
+                            help="파싱/검색어 찾기 작업 프로세스 수 (0이면 스레드 풀, "
+                                 f"대상 법률이 {law_processor.PARSE_PROCESS_MIN_LAWS}개 미만인 시나리오도 스레드 풀)")
+    run_parser.add_argument("--output", default=None, help="측정 보고서(JSON)를 저장할 파일")
+    run_parser.add_argument("--baseline", default=None, help="비교할 기준 보고서(JSON) 파일")
+    run_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="허용할 실행 시간/메모리 증가 비율")
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        scenarios = load_scenarios(args.scenarios) if args.scenarios else DEFAULT_SCENARIOS
+        os.makedirs(args.fixtures, exist_ok=True)
+        server = FixtureServer(args.fixtures, upstream=args.upstream).start()
+        try:
+            # 녹화 시에도 실제 API 요청 제한(HTTP_RATE_LIMIT)을 지키도록 재생 서버가 대신 제한함
+            run_benchmark(server, scenarios, max_workers=args.workers)
+            server.save_manifest(scenarios)
+        finally:
+            server.shutdown()
+        print(f"녹화 완료: 응답 {len(server.manifest['responses'])}개 → {args.fixtures}")
+        return
+
+    server = FixtureServer(args.fixtures, latency=args.latency).start()
+    scenarios = load_scenarios(args.scenarios) if args.scenarios else server.manifest["scenarios"]
+    if not scenarios:
+        raise SystemExit(f"시나리오 없음: {args.fixtures}에 녹화된 응답이 없습니다.")
+    try:
+        report = run_benchmark(server, scenarios, args.repeat, args.workers, args.rate_limit, args.processes)
+    finally:
+        server.shutdown()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"성능 회귀: {regression}", file=sys.stderr)
+        if regressions:
+            raise SystemExit(1)
+        print("기준 대비 성능 회귀 없음")
+
+if __name__ == "__main__":
+    main()
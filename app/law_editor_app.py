@@ -1,6 +1,6 @@
 import streamlit as st
 import os
-import importlib.util
+import sys
 
 # Streamlit 페이지 설정
 st.set_page_config(
@@ -12,36 +12,44 @@ st.set_page_config(
 # 애플리케이션 제목 표시
 st.markdown("<h1 style='font-size:20px;'>📘 부칙개정 도우미 (v.1.1.001)</h1>", unsafe_allow_html=True)
 
-# law_processor.py 모듈을 동적으로 로드
-# 현재 스크립트의 디렉토리를 기준으로 law_processor.py 파일의 경로를 계산합니다.
-# 일반적으로 'app' 디렉토리에 law_editor_app.py와 law_processor.py가 함께 있다고 가정합니다.
-# 따라서 law_processor.py는 현재 파일과 동일한 디렉토리에 있다고 가정합니다.
-processor_path = os.path.join(os.path.dirname(__file__), "law_processor.py") # 수정된 경로
+# law_processor.py 모듈 로드
+# law_editor_app.py와 law_processor.py는 같은 'app' 디렉토리에 있으므로, 이 디렉토리를 모듈 검색 경로에 두고 일반 import로 불러옵니다.
+# Streamlit은 입력이 바뀔 때마다 이 스크립트 전체를 다시 실행하지만, import한 모듈은 서버 프로세스에 한 번만 로드되므로
+# HTTP 세션, 캐시 연결, 조사 규칙표, 결과 캐시 등 모듈 전역 자원이 재실행 사이에 그대로 유지됩니다.
+app_dir = os.path.dirname(os.path.abspath(__file__))
+if app_dir not in sys.path:
+    sys.path.insert(0, app_dir)
 
-# importlib.util을 사용하여 모듈을 동적으로 로드
-spec = importlib.util.spec_from_file_location("law_processor", processor_path)
-law_processor = importlib.util.module_from_spec(spec)
-# 로드된 모듈을 실행 (이 부분이 IndentationError의 원인이 될 수 있으므로, law_processor.py의 들여쓰기가 중요합니다.)
-spec.loader.exec_module(law_processor)
+import law_processor
+import law_jobs
 
 # law_processor 모듈의 함수를 현재 스크립트에서 직접 사용할 수 있도록 참조 설정
 run_amendment_logic = law_processor.run_amendment_logic
 run_search_logic = law_processor.run_search_logic
 
+@st.cache_resource
+def get_job_manager():
+    """검색/개정문 생성을 백그라운드에서 실행하는 작업 관리자 (서버 프로세스당 하나, 결과 캐시 law_processor.RESULT_CACHE를 함께 사용)"""
+    return law_jobs.JobManager()
+
+# 검색과 개정문 생성은 백그라운드 작업으로 실행 (같은 요청은 결과 캐시를 거쳐 한 번만 계산)
+jobs = get_job_manager()
+
 # 사용법 안내 섹션 (확장 가능)
 with st.expander("ℹ️ 사용법 안내"):
     st.markdown(      
              "- 이 앱은 다음 두 가지 기능을 제공합니다:\n"
         "  1. **검색 기능**: 검색어가 포함된 법률 조항을 반환합니다.\n"
         "     - 공백을 포함한 문자열을 검색할 수 있습니다. 큰따옴표로 묶지 않아도 됩니다. \n"
-        "     - 다중검색어 및 논리연산자(AND, OR, NOT 등)는 지원하지 않습니다. (언젠가 개선예정🥺) \n\n" 
+        "     - 논리연산자 AND, OR, NOT과 괄호를 사용할 수 있습니다. 연산자는 대문자로, 앞뒤를 띄어 입력해주세요. (예. (법원 OR 검찰청) AND NOT \"군사법원\") \n"
+        "     - 논리연산자와 함께 쓰는 경우 공백을 그대로 찾아야 하는 구문은 큰따옴표로 묶어주세요. 연산자 없이 띄어 쓴 낱말들은 공백을 무시하는 하나의 검색어로 봅니다. \n\n" 
         "  2. **개정문 생성**: 특정 문자열을 다른 문자열로 교체하는 부칙 개정문을 자동 생성합니다.\n"
         "     - 21번째 결과물부터는 원문자가 아닌 괄호숫자로 항목 번호가 표기됩니다. 오류가 아닙니다.\n" 
         "     - 공백이 포함된 문자열을 개정하려는 경우에는 <찾을 문자열> 박스에 문자열 전체를 큰따옴표로 감싸서 입력주세요. (예. \"특정범죄 가중처벌 등에 관한 법률\")  \n" 
         "     - 공백있는 문자열을 큰따옴표로 묶는 것은 오직 개정문 생성기능의 <찾을 문자열>박스에서만 필요합니다. \n" 
         "     - <배제할 법률>에 입력된 법률은 개정문 생성 대상 법률에서 배제합니다. 빈칸으로 두면 찾을 문자열이 포함된 모든 법률에 대해 개정문을 작성합니다. \n" 
         "     - <배제할 법률> 박스에서는 문자열의 공백을 무시합니다. (예. \"특정범죄 가중처벌 등에 관한 법률\"을 \"특정범죄가중처벌등에관한법률\"로 입력가능)  \n" 
-        "     - 공백배제 기능은 <배제할 법률> 입력에만 적용됩니다. \n\n" 
+        "     - <띄어쓰기가 다른 표기도 찾기>를 선택하면 <찾을 문자열>도 공백을 무시하고 찾습니다. (예. \"특정범죄가중처벌\"을 입력하면 \"특정범죄 가중처벌\"도 찾음) 개정문에는 법률에 적힌 표기가 그대로 인용됩니다. \n\n" 
         "- 이 앱은 현행 법률의 본문만을 검색 대상으로 합니다. 헌법, 폐지법률, 시행령, 시행규칙, 행정규칙, 제목, 부칙 등은 검색하지 않습니다. \n"
         "- 이 앱은 업무망에서는 작동하지 않습니다. 인터넷망에서 사용해주세요. \n"
         "- 가운뎃점을 입력해야 하는 경우 샵(#)으로 대체할 수 있습니다. (예. \"법률상#사실상의 주장\"을 입력하면 \"법률상ㆍ사실상의 주장\"으로 인식) \n"
@@ -53,19 +61,7 @@ with st.expander("ℹ️ 사용법 안내"):
 st.header("🔍 검색 기능")
 search_query = st.text_input("검색어 입력", key="search_query")
 do_search = st.button("검색 시작")
-
-if do_search and search_query:
-    with st.spinner("🔍 검색 중..."):
-        # law_processor 모듈의 run_search_logic 함수 호출
-        result = law_processor.run_search_logic(search_query, unit="법률")
-        st.success(f"{len(result)}개의 법률을 찾았습니다")
-        if result:
-            for law_name, sections in result.items():
-                with st.expander(f"📄 {law_name}"):
-                    for html in sections:
-                        st.markdown(html, unsafe_allow_html=True)
-        else:
-            st.info("검색 결과가 없습니다.")
+search_area = st.container() # 검색 작업의 진행 상황과 결과를 표시할 자리
 
 # 타법개정문 생성 섹션
 st.header("✏️ 타법개정문 생성")
@@ -73,30 +69,156 @@ find_word = st.text_input("찾을 문자열")
 replace_word = st.text_input("바꿀 문자열")
 exclude_laws = st.text_input("배제할 법률 (쉼표로 구분)", 
                                help="결과에서 제외할 법률 이름을 쉼표(,)로 구분하여 입력하세요.")
+ignore_spacing = st.checkbox("띄어쓰기가 다른 표기도 찾기",
+                             help="예: '특정범죄가중처벌'을 찾을 때 '특정범죄 가중처벌'도 찾습니다. 개정문에는 법률에 적힌 표기 그대로 인용됩니다.")
 do_amend = st.button("개정문 생성")
+amend_area = st.container() # 개정문 생성 작업의 진행 상황과 결과를 표시할 자리
 
-if do_amend and find_word and replace_word:
-    with st.spinner("🛠 개정문 생성 중..."):
-        # 입력된 배제 법률을 리스트로 변환
-        exclude_law_list = [law.strip() for law in exclude_laws.split(',')] if exclude_laws else []
-        # law_processor 모듈의 run_amendment_logic 함수 호출
-        result = run_amendment_logic(find_word, replace_word, exclude_law_list)
-        st.success("개정문 생성 완료")
-        if result:
-            for amend in result:
-                st.markdown(amend, unsafe_allow_html=True)
-        else:
-            st.info("개정 대상 조문이 없습니다.")
-
-
-
-
-
-
-
-
-
+# 이전 작업 다시 불러오기 섹션
+with st.expander("🗂 작업 다시 불러오기"):
+    reload_job_id = st.text_input("작업 ID", help="검색/개정문 생성 결과 위에 표시된 작업 ID를 입력하세요.")
+    do_reload = st.button("불러오기")
 
+def progress_text(label, processed, total):
+    """진행률 표시줄에 보여줄 문구 생성 (전체 법률 수를 아직 모르면 처리된 수만 표시)"""
+    return f"{label} {processed}/{total}개 법률 처리됨" if total else f"{label} {processed}개 법률 처리됨"
 
+def set_job(slot, job_id):
+    """화면에 표시할 작업을 지정 (주소에도 남겨 새로 고침 후에도 같은 작업을 다시 표시)"""
+    st.session_state[slot] = job_id
+    st.query_params[slot] = job_id
 
+# 버튼을 누르면 작업을 백그라운드 작업으로 등록 (화면이 다시 실행되어도 작업은 계속 진행됨)
+if do_search and search_query:
+    set_job("search_job", jobs.submit("search", {"query": search_query}))
+if do_amend and find_word and replace_word:
+    # 입력된 배제 법률을 리스트로 변환
+    exclude_law_list = [law.strip() for law in exclude_laws.split(',')] if exclude_laws else []
+    set_job("amend_job", jobs.submit("amendment", {"find": find_word, "replace": replace_word, "exclude": exclude_law_list,
+                                                  "spacing": ignore_spacing}))
+if do_reload and reload_job_id.strip():
+    reload_job = jobs.get_job(reload_job_id.strip())
+    if reload_job is None:
+        st.warning(f"작업을 찾을 수 없습니다: {reload_job_id.strip()}")
+    else:
+        set_job("search_job" if reload_job["kind"] == "search" else "amend_job", reload_job["id"])
+
+# 결과는 서버(작업 저장소)에 두고 한 쪽씩만 화면에 보냄 (결과가 많아도 화면이 멈추지 않도록)
+RESULTS_PAGE_SIZE = 20
+
+def render_search_results(job_id, rows):
+    """검색 결과 법률 목록을 표시 (법률의 조문 HTML은 펼쳤을 때만 불러와 화면에 보냄)"""
+    for seq, law_name, hits in rows:
+        if st.toggle(f"📄 {law_name} ({hits}개 조문)", key=f"{job_id}_{seq}"):
+            _, sections = jobs.get_item(job_id, seq)
+            st.markdown("\n\n".join(sections), unsafe_allow_html=True)
+
+def render_amend_results(job_id, rows):
+    """개정문 목록을 표시 (법률 하나의 개정문 HTML씩)"""
+    if rows:
+        for amendment in jobs.get_items(job_id, rows[0][0], len(rows)):
+            st.markdown(amendment, unsafe_allow_html=True)
+
+def show_search_summary(status, job):
+    if job["state"] == "failed":
+        status.error(job["error"])
+    elif job["found"]:
+        status.success(f"{job['found']}개의 법률을 찾았습니다")
+    elif job["state"] == "done":
+        status.info("검색 결과가 없습니다.")
+
+def show_amend_summary(status, job):
+    if job["state"] == "failed":
+        status.error(job["error"])
+    elif job["state"] == "done":
+        if job["found"]:
+            status.success("개정문 생성 완료")
+        else:
+            status.info("개정 대상 조문이 없습니다.")
+
+JOB_STATE_MESSAGES = {
+    "cancelled": "작업이 취소되었습니다. 취소 전까지의 결과만 표시합니다.",
+    "interrupted": "서버가 다시 시작되어 작업이 중단되었습니다. 중단 전까지의 결과만 표시합니다. 다시 실행해주세요.",
+}
+
+# 작업 종류별 표시 방법: (진행 중 문구, 요약표의 건수 열 이름, 결과 표시 함수, 결과 요약 표시 함수)
+JOB_VIEWS = {
+    "search": ("🔍 검색 중...", "조문 수", render_search_results, show_search_summary),
+    "amendment": ("🛠 개정문 생성 중...", "개정 규칙 수", render_amend_results, show_amend_summary),
+}
+
+def summary_table(placeholder, rows, hits_label):
+    """결과 법률별 요약표 (번호, 법률명, 건수)를 표시"""
+    placeholder.dataframe(
+        {"번호": [seq + 1 for seq, _, _ in rows], "법률": [label for _, label, _ in rows],
+         hits_label: [hits for _, _, hits in rows]},
+        hide_index=True,
+    )
 
+# 진행 중인 작업의 진행 상황을 다시 읽어 오는 간격(초)
+JOB_POLL_SECONDS = 1.0
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def watch_job(job_id):
+    """
+    진행 중인 작업의 진행률, 지금까지의 요약표와 첫 쪽 결과, 취소 버튼을 표시하는 함수.
+    이 부분만 JOB_POLL_SECONDS마다 다시 실행되므로 작업을 기다리는 동안에도 화면의 다른 입력을 쓸 수 있으며,
+    작업이 끝나면 화면 전체를 다시 실행하여 요약표와 쪽 단위 결과로 표시합니다.
+    """
+    job = jobs.get_job(job_id)
+    if job["state"] not in ("queued", "running"):
+        st.rerun()
+    label, hits_label, render_results, _ = JOB_VIEWS[job["kind"]]
+    if job["state"] == "queued":
+        label = "⏳ 다른 작업이 끝나기를 기다리는 중..."
+    total = job["total"]
+    st.progress(min(job["processed"] / total, 1.0) if total else 0.0,
+                text=progress_text(label, job["processed"], total))
+    if st.button("작업 취소", key=f"{job_id}_cancel"):
+        jobs.cancel(job_id)
+    if jobs.is_cancelling(job_id):
+        st.caption("취소를 요청했습니다. 처리 중인 법률이 끝나면 멈춥니다.")
+    rows = jobs.get_summary(job_id)
+    if rows:
+        summary_table(st.empty(), rows, hits_label)
+        render_results(job_id, [row for row in rows if row[0] < RESULTS_PAGE_SIZE])
+
+def show_job(area, job_id):
+    """
+    작업 하나의 진행 상황과 결과를 표시하는 함수.
+    끝난 작업은 요약표와 함께 결과를 한 쪽씩 표시하고, 진행 중인 작업은 watch_job으로 진행 상황을 갱신하며 표시합니다.
+    """
+    job = jobs.get_job(job_id)
+    if job is None:
+        area.warning(f"작업을 찾을 수 없습니다: {job_id}")
+        return
+    _, hits_label, render_results, show_summary = JOB_VIEWS[job["kind"]]
+    with area:
+        status = st.empty() # 작업 완료 후 결과 요약을 결과 목록 위에 표시하기 위한 자리
+        st.caption(f"작업 ID: {job_id} (페이지를 새로 고치거나 나중에 다시 접속해도 이 작업의 결과를 다시 볼 수 있습니다)")
+        if job["state"] in ("queued", "running"):
+            watch_job(job_id)
+            return
+        
+        show_summary(status, job)
+        if job["state"] in JOB_STATE_MESSAGES:
+            status.warning(JOB_STATE_MESSAGES[job["state"]])
+        rows = jobs.get_summary(job_id)
+        if not rows:
+            return
+        summary_table(st.empty(), rows, hits_label)
+        pages = (len(rows) + RESULTS_PAGE_SIZE - 1) // RESULTS_PAGE_SIZE
+        page = 1
+        if pages > 1:
+            page = st.number_input(f"쪽 (전체 {pages}쪽, 쪽당 {RESULTS_PAGE_SIZE}개 법률)",
+                                   min_value=1, max_value=pages, value=1, key=f"{job_id}_page")
+        render_results(job_id, rows[(page - 1) * RESULTS_PAGE_SIZE:page * RESULTS_PAGE_SIZE])
+
+# 표시할 작업의 결과를 보여주며, 진행 중인 작업은 끝날 때까지 진행 상황을 주기적으로 갱신
+# (그사이 다른 입력을 하면 화면만 다시 실행되고 작업은 백그라운드에서 계속 진행됨)
+search_job = st.session_state.get("search_job") or st.query_params.get("search_job")
+if search_job:
+    show_job(search_area, search_job)
+amend_job = st.session_state.get("amend_job") or st.query_params.get("amend_job")
+if amend_job:
+    show_job(amend_area, amend_job)
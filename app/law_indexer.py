@@ -0,0 +1,36 @@
+# 법령 전문 색인 도구.
+# 현행 법률 전체의 본문을 내려받아 검색 기능이 사용하는 로컬 전문 색인(bigram 역색인)을 구축하거나,
+# 개정(MST 변경)되거나 새로 생기거나 폐지된 법률만 반영하여 색인을 동기화합니다. 색인은 24시간이 지나거나 현행 법률과 달라지면 검색에 쓰이지 않으므로 sync를 매일 실행하기를 권장합니다.
+# 사용법: python law_indexer.py build [--workers N]
+#         python law_indexer.py sync [--workers N]
+
+import argparse
+
+import law_processor
+
+def main(argv=None):
+    """명령행 인자를 해석하여 색인 작업을 실행하는 함수"""
+    parser = argparse.ArgumentParser(description="현행 법률 로컬 전문 색인 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    build_parser = subparsers.add_parser("build", help="현행 법률 전체를 내려받아 색인을 새로 구축")
+    build_parser.add_argument("--workers", type=int, default=None, help="동시에 진행할 최대 요청 수")
+    
+    sync_parser = subparsers.add_parser("sync", help="개정되거나 새로 생기거나 폐지된 법률만 색인에 반영")
+    sync_parser.add_argument("--workers", type=int, default=None, help="동시에 진행할 최대 요청 수")
+    
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        count = law_processor.build_law_index(args.workers)
+        print(f"색인 완료: {count}개 법률")
+    elif args.command == "sync":
+        summary = law_processor.sync_law_index(args.workers)
+        if summary is None:
+            raise SystemExit("동기화 실패: 법률 목록을 가져오지 못했습니다.")
+        print(
+            f"동기화 완료: 추가 {summary['added']}개, 갱신 {summary['updated']}개, 삭제 {summary['removed']}개, "
+            f"유지 {summary['unchanged']}개, 실패 {summary['failed']}개"
+        )
+
+if __name__ == "__main__":
+    main()
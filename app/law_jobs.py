@@ -0,0 +1,218 @@
+# 검색/개정문 생성 백그라운드 작업 관리.
+# 오래 걸리는 검색과 개정문 생성을 화면(Streamlit 스크립트)과 분리된 작업 스레드에서 실행하고,
+# 진행 상황과 법률별 결과를 SQLite에 저장합니다. 화면이 다시 실행되거나 브라우저 탭을 새로 고쳐도
+# 작업 ID로 진행 중이거나 끝난 작업의 결과를 다시 불러올 수 있습니다.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import law_processor
+
+# 작업 저장 파일 경로 (기본값: 법령 XML 캐시 디렉터리)
+JOB_DB_PATH = os.getenv("LAW_JOB_DB", os.path.join(law_processor.CACHE_DIR, "law_jobs.sqlite3"))
+# 동시에 실행할 최대 작업 수 (나머지는 대기)
+JOB_MAX_RUNNING = int(os.getenv("LAW_JOB_WORKERS", "2"))
+# 끝난 작업을 보관하는 기간(시간)
+JOB_RETENTION = float(os.getenv("LAW_JOB_RETENTION_HOURS", "72")) * 3600
+
+JOB_KINDS = ("search", "amendment")
+# 작업 상태: queued(대기), running(실행 중), done(완료), failed(실패), cancelled(취소), interrupted(서버 재시작으로 중단)
+FINISHED_STATES = ("done", "failed", "cancelled", "interrupted")
+
+class JobManager:
+    """
+    검색/개정문 생성 작업을 받아 백그라운드 작업 스레드에서 실행하고, 진행 상황과 결과를 SQLite에 저장하는 클래스.
+    최대 max_running개의 작업이 동시에 실행되며 나머지는 순서대로 기다립니다.
+    작업은 결과 캐시(cache, 기본값 law_processor.RESULT_CACHE)를 거쳐 실행하므로 같은 요청은 한 번만 계산합니다.
+    서버 프로세스당 하나를 만들어 여러 세션이 함께 사용합니다.
+    """
+
+    def __init__(self, db_path=None, max_running=None, cache=None):
+        self.db_path = db_path or JOB_DB_PATH
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._cancelled = set() # 취소 요청된 작업 ID
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS job (
+                id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, state TEXT NOT NULL,
+                processed INTEGER NOT NULL DEFAULT 0, total INTEGER NOT NULL DEFAULT 0, found INTEGER NOT NULL DEFAULT 0,
+                error TEXT, created REAL NOT NULL, started REAL, finished REAL
+            );
+            CREATE TABLE IF NOT EXISTS job_item (
+                job_id TEXT NOT NULL, seq INTEGER NOT NULL, payload TEXT NOT NULL, label TEXT, hits INTEGER,
+                PRIMARY KEY (job_id, seq)
+            ) WITHOUT ROWID;
+            """
+        )
+        # 요약 열(label: 법률명, hits: 검색된 조문 수 또는 개정 규칙 수)이 없던 이전 저장 파일에 열 추가
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(job_item)")}
+        for column, column_type in (("label", "TEXT"), ("hits", "INTEGER")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE job_item ADD COLUMN {column} {column_type}")
+        with self._lock:
+            # 이전 서버 프로세스에서 끝나지 못한 작업은 중단된 것으로 표시
+            self._conn.execute(
+                "UPDATE job SET state = 'interrupted', finished = ? WHERE state IN ('queued', 'running')", (time.time(),)
+            )
+            self._purge_expired()
+            self._conn.commit()
+        self._executor = ThreadPoolExecutor(max_workers=max_running or JOB_MAX_RUNNING, thread_name_prefix="law-job")
+
+    def _purge_expired(self):
+        """보관 기간이 지난 작업과 결과를 삭제 (_lock을 잡은 상태에서 호출)"""
+        expired = [row[0] for row in self._conn.execute(
+            "SELECT id FROM job WHERE finished IS NOT NULL AND finished < ?", (time.time() - JOB_RETENTION,)
+        )]
+        for job_id in expired:
+            self._conn.execute("DELETE FROM job_item WHERE job_id = ?", (job_id,))
+            self._conn.execute("DELETE FROM job WHERE id = ?", (job_id,))
+
+    def submit(self, kind, params):
+        """
+        작업을 등록하고 작업 ID를 반환하는 함수.
+        kind가 "search"이면 params는 {"query": 검색어}, "amendment"이면 {"find": 찾을 문자열, "replace": 바꿀 문자열,
+        "exclude": 배제할 법률 목록, "spacing": 띄어쓰기만 다른 표기도 찾을지 여부(생략 가능)}입니다.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"알 수 없는 작업 종류: {kind}")
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO job (id, kind, params, state, created) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, kind, json.dumps(params, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+        self._executor.submit(self._run, job_id, kind, params)
+        return job_id
+
+    def cancel(self, job_id):
+        """작업 취소를 요청하는 함수. 대기 중인 작업은 바로 취소되고, 실행 중인 작업은 처리 중인 법률이 끝난 뒤 멈춥니다."""
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM job WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row[0] in FINISHED_STATES:
+                return
+            self._cancelled.add(job_id)
+            self._conn.execute(
+                "UPDATE job SET state = 'cancelled', finished = ? WHERE id = ? AND state = 'queued'", (time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def is_cancelling(self, job_id):
+        """취소를 요청했지만 아직 멈추지 않은 작업인지 확인하는 함수"""
+        with self._lock:
+            return job_id in self._cancelled
+
+    def get_job(self, job_id):
+        """작업 정보(상태, 진행 상황 등)를 사전으로 반환하는 함수. 없는 작업이면 None을 반환합니다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, params, state, processed, total, found, error, created, started, finished "
+                "FROM job WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "kind", "params", "state", "processed", "total", "found", "error", "created", "started", "finished")
+        job = dict(zip(keys, row))
+        job["params"] = json.loads(job["params"])
+        return job
+
+    def get_items(self, job_id, start=0, limit=None):
+        """
+        작업 결과 중 start번째부터 지금까지 저장된 항목 목록을 반환하는 함수 (진행 중인 작업은 나온 데까지).
+        limit을 주면 최대 limit개만 반환합니다 (페이지 단위 표시용).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM job_item WHERE job_id = ? AND seq >= ? ORDER BY seq LIMIT ?",
+                (job_id, start, -1 if limit is None else limit)
+            ).fetchall()
+        return [json.loads(payload) for payload, in rows]
+
+    def get_item(self, job_id, seq):
+        """작업 결과 중 seq번째 항목 하나를 반환하는 함수 (없으면 None)"""
+        items = self.get_items(job_id, seq, 1)
+        return items[0] if items else None
+
+    def get_summary(self, job_id, start=0):
+        """
+        작업 결과 중 start번째부터의 요약 (순번, 법률명, 검색된 조문 수 또는 개정 규칙 수) 목록을 반환하는 함수.
+        결과 본문(HTML)은 읽지 않으므로 결과가 많아도 가볍습니다.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT seq, label, hits FROM job_item WHERE job_id = ? AND seq >= ? ORDER BY seq", (job_id, start)
+            ).fetchall()
+
+    def list_jobs(self, limit=20):
+        """최근 작업 목록을 최신순으로 반환하는 함수"""
+        with self._lock:
+            job_ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM job ORDER BY created DESC LIMIT ?", (limit,)
+            )]
+        return [job for job in map(self.get_job, job_ids) if job]
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            assignments = ", ".join(f"{name} = ?" for name in fields)
+            self._conn.execute(f"UPDATE job SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def _iter_results(self, kind, params):
+        """
+        작업 종류에 맞는 결과 제너레이터를 만들고,
+        (처리된 법률 수, 전체 법률 수, 저장할 항목 또는 None, 법률명, 검색된 조문 수 또는 개정 규칙 수)를 반환
+        """
+        if kind == "search":
+            results = law_processor.iter_search_logic_cached(params["query"], unit="법률", cache=self.cache)
+            for processed, total, law_name, sections in results:
+                yield processed, total, [law_name, sections] if sections else None, law_name, len(sections)
+        else:
+            results = law_processor.iter_amendment_logic_cached(params["find"], params["replace"],
+                                                                params.get("exclude") or [], cache=self.cache,
+                                                                with_law_name=True,
+                                                                spacing_insensitive=params.get("spacing", False))
+            for processed, total, law_name, amendment, rule_count in results:
+                yield processed, total, amendment, law_name, rule_count
+
+    def _run(self, job_id, kind, params):
+        """작업 스레드에서 작업 하나를 실행하고 진행 상황과 결과를 저장하는 함수"""
+        with self._lock:
+            if job_id in self._cancelled: # 대기 중에 취소된 작업 (cancel에서 이미 취소로 표시함)
+                self._cancelled.discard(job_id)
+                return
+        self._update(job_id, state="running", started=time.time())
+        found = 0
+        results = self._iter_results(kind, params)
+        try:
+            for processed, total, item, label, hits in results:
+                with self._lock:
+                    if item is not None:
+                        self._conn.execute("INSERT INTO job_item (job_id, seq, payload, label, hits) VALUES (?, ?, ?, ?, ?)",
+                                           (job_id, found, json.dumps(item, ensure_ascii=False), label, hits))
+                        found += 1
+                    self._conn.execute("UPDATE job SET processed = ?, total = ?, found = ? WHERE id = ?",
+                                       (processed, total, found, job_id))
+                    self._conn.commit()
+                    cancelled = job_id in self._cancelled
+                if cancelled:
+                    self._update(job_id, state="cancelled", finished=time.time())
+                    return
+            self._update(job_id, state="done", finished=time.time())
+        except ValueError as e: # 잘못된 논리 검색식 등 입력 오류
+            self._update(job_id, state="failed", error=str(e), finished=time.time())
+        except Exception as e:
+            traceback.print_exc()
+            self._update(job_id, state="failed", error=f"{type(e).__name__}: {e}", finished=time.time())
+        finally:
+            results.close()
+            with self._lock:
+                self._cancelled.discard(job_id)
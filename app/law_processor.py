@@ -6,47 +6,311 @@
 # 낫표를 중괄호로 입력할 수 있음. <- 이 부분에 대한 수정이 적용되었습니다.
 
 import requests
+from requests.adapters import HTTPAdapter
 import xml.etree.ElementTree as ET
-from urllib.parse import quote
+from urllib.parse import quote, urlparse
 import re
 import os
+import atexit
+import contextlib
+import functools
+import itertools
+import json
+import multiprocessing
+import random
+import sqlite3
+import sys
+import threading
+import time
 import unicodedata
-from collections import defaultdict
+import zlib
+from bisect import bisect_right
+from collections import Counter, OrderedDict, defaultdict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # API 호출을 위한 환경 변수 설정. 실제 배포 시에는 보안에 유의해야 합니다.
 OC = os.getenv("OC", "chetera")
 BASE = "http://www.law.go.kr"
 
+# 법령 본문을 동시에 가져올 때 동시에 진행할 최대 요청 수 (환경 변수 LAW_MAX_WORKERS로 조정 가능)
+MAX_WORKERS = int(os.getenv("LAW_MAX_WORKERS", "8"))
+
+# 법률별 XML 파싱과 검색어 찾기를 실행할 작업 프로세스 수 (0이면 스레드 풀에서 처리, 환경 변수 LAW_PARSE_PROCESSES로 조정 가능)
+# 전체 법률을 대상으로 하는 큰 검색이나 여러 쌍의 개정문 생성처럼 CPU를 많이 쓰는 작업에서 여러 코어를 사용합니다.
+PARSE_PROCESSES = int(os.getenv("LAW_PARSE_PROCESSES", "0"))
+# 대상 법률이 이 수보다 적으면 PARSE_PROCESSES와 관계없이 스레드 풀에서 처리 (환경 변수 LAW_PARSE_PROCESS_MIN_LAWS로 조정 가능)
+# 작은 작업은 프로세스 풀을 시작하고 XML을 주고받는 비용이 파싱 시간보다 커서 오히려 느려집니다.
+PARSE_PROCESS_MIN_LAWS = int(os.getenv("LAW_PARSE_PROCESS_MIN_LAWS", "100"))
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+# HTTP 요청 설정: 요청 제한 시간(초), 재시도 횟수, 백오프 기본 대기 시간(초), 호스트별 초당 최대 요청 수(0이면 제한 없음)
+HTTP_TIMEOUT = 10
+HTTP_MAX_RETRIES = int(os.getenv("LAW_HTTP_RETRIES", "3"))
+HTTP_BACKOFF_BASE = 0.5
+HTTP_RATE_LIMIT = float(os.getenv("LAW_RATE_LIMIT", "10"))
+
+_session = None # 연결을 재사용(keep-alive)하기 위해 모든 요청이 공유하는 세션
+_session_lock = threading.Lock()
+_rate_lock = threading.Lock()
+_next_request_time = defaultdict(float) # 호스트별 다음 요청 허용 시각
+
+# 법령 XML 디스크 캐시 설정. 법령일련번호(MST)는 하나의 고정된 연혁(개정본)을 가리키므로
+# 같은 MST의 본문은 바뀌지 않습니다. 법령이 개정되면 새 MST가 발급되어 자연히 새 항목으로 저장되고,
+# 더 이상 조회되지 않는 옛 항목은 용량 한도(LAW_CACHE_MAX_MB)를 넘을 때 가장 오래 쓰이지 않은 것부터 제거됩니다.
+CACHE_DIR = os.getenv("LAW_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".law_cache"))
+CACHE_MAX_BYTES = int(os.getenv("LAW_CACHE_MAX_MB", "512")) * 1024 * 1024 # 0이면 캐시 사용 안 함
+# 캐시 항목의 최근 사용 시각은 저장된 시각이 이 시간(초)보다 오래된 경우에만 갱신합니다.
+# LRU 제거 순서에는 이 정도 오차로 충분하고, 캐시를 읽을 때마다 디스크에 쓰지 않아도 됩니다.
+CACHE_TOUCH_INTERVAL = 3600
+
+_cache_lock = threading.Lock() # 여러 스레드가 하나의 SQLite 연결을 공유하므로 잠금으로 보호
+_cache_conn = None
+
+# 로컬 전문 색인 설정. 현행 법률 전체의 조문 제목/조문/항/호/목 텍스트를 공백을 제거한 두 글자 단위(bigram)로 색인합니다.
+# 색인이 LAW_INDEX_MAX_AGE_HOURS(기본 24시간)보다 오래되었거나 없으면 검색 시 법제처 API를 사용합니다.
+# 색인이 최신이어도 색인된 법률(MST)이 현행 법률 목록과 하나라도 다르면(개정, 신설, 폐지) 법제처 API를 사용하며,
+# 비교에 쓰는 현행 법률 목록은 LAW_INDEX_VERIFY_SECONDS(기본 600초) 동안 재사용합니다.
+INDEX_PATH = os.getenv("LAW_INDEX_PATH", os.path.join(CACHE_DIR, "law_index.sqlite3"))
+INDEX_MAX_AGE = float(os.getenv("LAW_INDEX_MAX_AGE_HOURS", "24")) * 3600
+INDEX_VERIFY_INTERVAL = float(os.getenv("LAW_INDEX_VERIFY_SECONDS", "600"))
+# 색인 동기화 상태(법률별로 색인된 MST)를 기록하는 매니페스트 파일
+SYNC_MANIFEST_PATH = os.getenv("LAW_SYNC_MANIFEST", os.path.join(CACHE_DIR, "law_sync_manifest.json"))
+
+_index_lock = threading.Lock()
+_index_conn = None
+_current_msts_lock = threading.RLock() # 현행 법률 목록을 여러 검색이 동시에 요청하지 않도록 보호
+_current_msts = None # (조회 시각, 현행 법률 MST 집합)
+
+# 개정문 생성 1회 실행 동안 덩어리 추출/규칙 문장 결과를 기억할 종류별 최대 항목 수 (0이면 메모 사용 안 함)
+AMENDMENT_MEMO_SIZE = int(os.getenv("LAW_AMENDMENT_MEMO_SIZE", "50000"))
+
+# 검색/개정문 생성 결과 캐시 설정: 보관할 최대 결과 수(0이면 보관하지 않음), 결과 유효 시간(분)
+RESULT_CACHE_SIZE = int(os.getenv("LAW_RESULT_CACHE_SIZE", "32"))
+RESULT_CACHE_TTL = float(os.getenv("LAW_RESULT_CACHE_TTL_MINUTES", "60")) * 60
+
+# 법률별 진행 상황, 토큰별 덩어리 분석 등 디버깅 출력 여부 (LAW_DEBUG_LOG=0이면 출력하지 않음)
+# 오류와 재시도 안내는 이 설정과 관계없이 출력합니다.
+DEBUG_LOG = os.getenv("LAW_DEBUG_LOG", "1") != "0"
+
+# 법률별 소요 시간 분포를 집계하는 구간의 상한 (밀리초, 마지막 구간은 그 이상 전부)
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class RunMetrics:
+    """
+    검색/개정문 생성 1회 실행의 단계별 소요 시간, 카운터, 누락 사유, 법률별 소요 시간 분포를 집계하는 클래스.
+    단계(stage)는 list_search(법률 목록 검색), fetch(본문 수신), parse(XML 파싱), scan(검색어 찾기),
+    render(개정 규칙/결과 HTML 작성), group(위치 묶기)이며, 스레드 풀에서 동시에 실행되는 단계의 시간은 누적 합계입니다.
+    report()는 JSON으로 저장할 수 있는 사전을 반환합니다. 여러 스레드에서 동시에 기록해도 됩니다.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.finished = None
+        self.stages = defaultdict(lambda: [0, 0.0]) # 단계 → [횟수, 누적 초]
+        self.counters = defaultdict(int)
+        self.skipped = defaultdict(int) # 누락 사유 → 법률 수
+        self.histograms = {} # 이름 → [구간별 법률 수, 합계 초, 최대 초]
+        self.extra = {} # 보고서에 함께 담을 부가 정보 (메모 적중률 등)
+    
+    def add_time(self, stage, seconds, calls=1):
+        with self._lock:
+            entry = self.stages[stage]
+            entry[0] += calls
+            entry[1] += seconds
+    
+    @contextlib.contextmanager
+    def stage(self, name):
+        """with 블록의 소요 시간을 단계 name에 더하는 컨텍스트 관리자"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+    
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+    
+    def skip(self, reason):
+        with self._lock:
+            self.skipped[reason] += 1
+    
+    def observe(self, name, seconds):
+        """법률 하나의 소요 시간을 분포 name에 기록"""
+        bucket = bisect_right(LATENCY_BUCKETS_MS, seconds * 1000)
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = [[0] * (len(LATENCY_BUCKETS_MS) + 1), 0.0, 0.0]
+            histogram[0][bucket] += 1
+            histogram[1] += seconds
+            histogram[2] = max(histogram[2], seconds)
+    
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.perf_counter()
+    
+    def report(self):
+        """실행 보고서를 JSON으로 저장할 수 있는 사전으로 반환"""
+        with self._lock:
+            end = self.finished if self.finished is not None else time.perf_counter()
+            histograms = {}
+            for name, (buckets, total, longest) in self.histograms.items():
+                count = sum(buckets)
+                labels = [f"<{bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">={LATENCY_BUCKETS_MS[-1]}ms"]
+                histograms[name] = {
+                    "count": count,
+                    "mean_seconds": round(total / count, 4) if count else 0.0,
+                    "max_seconds": round(longest, 4),
+                    "buckets": {label: n for label, n in zip(labels, buckets) if n},
+                }
+            return {
+                "wall_seconds": round(end - self.started, 4),
+                "stages": {name: {"calls": calls, "seconds": round(seconds, 4)}
+                           for name, (calls, seconds) in sorted(self.stages.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "skipped_laws": dict(sorted(self.skipped.items())),
+                "latency": histograms,
+                **self.extra,
+            }
+    
+    def write_report(self, path):
+        """실행 보고서를 JSON 파일로 저장"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=1)
+
 def highlight(text, query):
     """
     검색어를 HTML로 하이라이트 처리해주는 함수.
-    검색어 전처리 및 정규식 특수 문자 이스케이프를 포함합니다.
+    검색어 전처리는 검색어별로 한 번만 하며(get_query_highlighter), 큰따옴표로 감싸지 않은 검색어는 공백을 무시하고 표시합니다.
     """
     if not query or not text:
         return text
-    
-    # 중간점을 가운뎃점으로 정규화 (하이라이트에서도 일관성 유지)
-    # 이제 중괄호도 낫표로 정규화됩니다.
-    normalized_query = normalize_special_chars(query)
-    
-    # 검색어 전처리: 큰따옴표로 감싸진 경우 제거
-    processed_query, _ = preprocess_search_term(normalized_query)
-    
-    # 정규식 특수문자 이스케이프
-    escaped_query = re.escape(processed_query)
-    
-    # 유니코드를 고려한 정규식 패턴 (re.UNICODE 플래그 추가)
-    # 대소문자 무시 (re.IGNORECASE) 및 유니코드 문자열 처리 (re.UNICODE)
-    pattern = re.compile(f'({escaped_query})', re.IGNORECASE | re.UNICODE)
-    
-    # 찾은 검색어를 <mark> 태그로 감싸 하이라이트
-    return pattern.sub(r'<mark>\1</mark>', text)
+    return get_query_highlighter(query).mark(text)
 
-def get_law_list_from_api(query):
+def get_http_session():
     """
-    법제처 API를 통해 검색어에 해당하는 법령 목록을 가져오는 함수.
-    페이지네이션을 지원하여 모든 검색 결과를 가져옵니다.
+    law.go.kr 요청에 공유하는 requests 세션을 (필요 시 생성하여) 반환하는 함수.
+    연결 풀을 동시 요청 수만큼 확보하여 스레드 간에 keep-alive 연결을 재사용합니다.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(MAX_WORKERS, 10))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+def _wait_for_rate_limit(url):
+    """호스트별 초당 요청 수(HTTP_RATE_LIMIT)를 넘지 않도록 필요한 만큼 대기하는 함수"""
+    if HTTP_RATE_LIMIT <= 0:
+        return
+    host = urlparse(url).netloc
+    with _rate_lock:
+        now = time.monotonic()
+        # 요청마다 일정 간격의 시간 슬롯을 예약하고, 예약된 시각까지 대기
+        slot = max(now, _next_request_time[host])
+        _next_request_time[host] = slot + 1.0 / HTTP_RATE_LIMIT
+    if slot > now:
+        time.sleep(slot - now)
+
+def http_get(url, metrics=None, **kwargs):
+    """
+    공유 세션으로 GET 요청을 보내는 함수.
+    타임아웃, 연결 오류, 5xx 응답은 지터를 준 지수 백오프로 HTTP_MAX_RETRIES회까지 재시도합니다.
+    재시도 후에도 실패하면 마지막 예외를 다시 발생시키거나 마지막 응답을 그대로 반환합니다.
+    metrics(RunMetrics)가 주어지면 요청 수와 재시도 횟수를 기록합니다.
+    """
+    kwargs.setdefault("timeout", HTTP_TIMEOUT)
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        _wait_for_rate_limit(url)
+        if metrics is not None:
+            metrics.count("http_requests")
+            if attempt:
+                metrics.count("retries")
+        try:
+            res = get_http_session().get(url, **kwargs)
+            if res.status_code < 500 or attempt == HTTP_MAX_RETRIES:
+                return res
+            res.close()
+            print(f"서버 오류(상태 코드 {res.status_code}) - 재시도 {attempt+1}/{HTTP_MAX_RETRIES}: {url}")
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            if attempt == HTTP_MAX_RETRIES:
+                raise
+            print(f"요청 실패({type(e).__name__}) - 재시도 {attempt+1}/{HTTP_MAX_RETRIES}: {url}")
+        # 지수 백오프에 무작위 지터를 적용하여 동시에 실패한 요청들이 한꺼번에 재시도하지 않도록 함
+        time.sleep(random.uniform(0, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+# 법률 검색 API 한 페이지당 결과 수 (API 최대값)
+LIST_PAGE_SIZE = 100
+
+def _fetch_law_list_page(encoded_query, page, metrics=None):
     """
+    법률 검색 API의 한 페이지를 가져오는 함수.
+    (법령 정보 목록, 전체 검색 결과 수) 튜플을 반환하며, 전체 결과 수를 알 수 없으면 None입니다.
+    요청 또는 파싱에 실패하면 (None, None)을 반환합니다. metrics가 주어지면 소요 시간을 list_search 단계로 기록합니다.
+    """
+    if metrics is None:
+        return _request_law_list_page(encoded_query, page)
+    with metrics.stage("list_search"):
+        laws, total = _request_law_list_page(encoded_query, page, metrics)
+    metrics.count("list_pages" if laws is not None else "list_page_errors")
+    return laws, total
+
+def _request_law_list_page(encoded_query, page, metrics=None):
+    """_fetch_law_list_page의 실제 요청/파싱 부분"""
+    # 법제처 법률 검색 API URL
+    url = f"{BASE}/DRF/lawSearch.do?OC={OC}&target=law&type=XML&display={LIST_PAGE_SIZE}&page={page}&search=2&knd=A0002"
+    if encoded_query:
+        url += f"&query={encoded_query}"
+    try:
+        res = http_get(url, metrics) # 공유 세션으로 요청 (타임아웃/5xx 시 재시도)
+        res.encoding = 'utf-8' # 응답 인코딩을 UTF-8로 설정하여 한글 깨짐 방지
+        if res.status_code != 200:
+            # HTTP 상태 코드가 200이 아니면 오류로 간주
+            print(f"API 요청 실패: 상태 코드 {res.status_code} (page {page})")
+            return None, None
+        
+        root = ET.fromstring(res.content) # XML 응답 파싱
+        
+        # 모든 <law> 태그를 찾아 법령 정보 추출
+        laws = [
+            {
+                "법령명": law.findtext("법령명한글", "").strip(), # 법령명 추출
+                "MST": law.findtext("법령일련번호", ""), # 법령일련번호 (Master Serial Number) 추출
+                "법령ID": law.findtext("법령ID", "") # 법령ID (개정되어도 바뀌지 않는 법령 식별자) 추출
+            }
+            for law in root.findall("law")
+        ]
+        
+        # 전체 검색 결과 수 (페이지 수 계산에 사용)
+        total_text = (root.findtext("totalCnt") or "").strip()
+        total = int(total_text) if total_text.isdigit() else None
+        return laws, total
+    except requests.exceptions.Timeout:
+        print(f"법률 검색 중 타임아웃 발생: {url}")
+    except requests.exceptions.RequestException as e:
+        print(f"법률 검색 중 요청 오류 발생: {e}")
+    except ET.ParseError as e:
+        print(f"법률 검색 결과 XML 파싱 오류: {e}")
+    except Exception as e:
+        print(f"법률 검색 중 알 수 없는 오류 발생: {e}")
+    return None, None
+
+def iter_law_list_from_api(query, max_workers=None, on_total=None, metrics=None):
+    """
+    법제처 API를 통해 검색어에 해당하는 법령 목록을 스트리밍으로 반환하는 제너레이터. 검색어가 비어 있으면 아무것도 반환하지 않습니다.
+    첫 페이지의 전체 결과 수(totalCnt)로 나머지 페이지 수를 계산하여 동시에 요청하며,
+    첫 페이지의 법령은 나머지 페이지를 기다리지 않고 바로 반환합니다. 반환 순서는 페이지 순서와 같습니다.
+    on_total이 주어지면 첫 페이지를 받은 직후 전체 결과 수를 인자로 호출합니다.
+    metrics(RunMetrics)가 주어지면 페이지 요청마다 소요 시간과 요청 수를 기록합니다.
+    """
+    if not query:
+        return
     # 이미 큰따옴표로 감싸져 있는지 확인
     if query.startswith('"') and query.endswith('"'):
         exact_query = query  # 이미 큰따옴표가 있으면 그대로 사용
@@ -62,84 +326,573 @@ def get_law_list_from_api(query):
         # 이미 바이트인 경우 그대로 quote 적용
         encoded_query = quote(exact_query, safe='')
     
-    page = 1
-    laws = []
-    
     # 디버깅을 위해 실제 검색 쿼리 출력
-    print(f"API 검색 쿼리: {exact_query}")
+    if DEBUG_LOG:
+        print(f"API 검색 쿼리: {exact_query}")
     
-    while True:
-        # 법제처 법률 검색 API URL
-        url = f"{BASE}/DRF/lawSearch.do?OC={OC}&target=law&type=XML&display=100&page={page}&search=2&knd=A0002&query={encoded_query}"
-        try:
-            res = requests.get(url, timeout=10) # 10초 타임아웃 설정
-            res.encoding = 'utf-8' # 응답 인코딩을 UTF-8로 설정하여 한글 깨짐 방지
-            if res.status_code != 200:
-                # HTTP 상태 코드가 200이 아니면 오류로 간주하고 반복 중단
-                print(f"API 요청 실패: 상태 코드 {res.status_code}")
-                break
-            
-            root = ET.fromstring(res.content) # XML 응답 파싱
-            
-            # 모든 <law> 태그를 찾아 법령 정보 추출
-            for law in root.findall("law"):
-                laws.append({
-                    "법령명": law.findtext("법령명한글", "").strip(), # 법령명 추출
-                    "MST": law.findtext("법령일련번호", "") # 법령일련번호 (Master Serial Number) 추출
-                })
-            
-            # 현재 페이지의 결과 수가 display 값(100)보다 적으면 마지막 페이지로 간주
-            if len(root.findall("law")) < 100:
+    yield from _iter_law_list_pages(encoded_query, max_workers, on_total, metrics)
+
+def iter_all_laws_from_api(max_workers=None, on_total=None, metrics=None):
+    """
+    법제처 API에서 현행 법률 전체 목록을 스트리밍으로 반환하는 제너레이터 (색인 구축/동기화와 색인 검증용).
+    인자와 반환 순서는 iter_law_list_from_api와 같습니다.
+    """
+    yield from _iter_law_list_pages("", max_workers, on_total, metrics)
+
+def _iter_law_list_pages(encoded_query, max_workers=None, on_total=None, metrics=None):
+    """인코딩된 검색어의 법률 검색 결과 전체 페이지를 페이지 순서대로 반환하는 제너레이터"""
+    laws, total = _fetch_law_list_page(encoded_query, 1, metrics)
+    if laws is None:
+        return
+    if total is None and len(laws) < LIST_PAGE_SIZE:
+        total = len(laws) # 한 페이지로 끝나는 경우 전체 결과 수가 곧 첫 페이지 결과 수
+    if DEBUG_LOG:
+        print(f"검색된 법률 수: {total if total is not None else '알 수 없음'}")
+    if on_total and total is not None:
+        on_total(total)
+    yield from laws
+    
+    if total is None:
+        # 전체 결과 수를 알 수 없으면 기존처럼 결과가 display 값(100)보다 적은 페이지가 나올 때까지 순차 요청
+        page = 1
+        while len(laws) == LIST_PAGE_SIZE:
+            page += 1
+            laws, _ = _fetch_law_list_page(encoded_query, page, metrics)
+            if laws is None:
                 break
-            
-            page += 1 # 다음 페이지로 이동
-        except requests.exceptions.Timeout:
-            print(f"법률 검색 중 타임아웃 발생: {url}")
-            break
-        except requests.exceptions.RequestException as e:
-            print(f"법률 검색 중 요청 오류 발생: {e}")
-            break
-        except ET.ParseError as e:
-            print(f"법률 검색 결과 XML 파싱 오류: {e}")
-            break
-        except Exception as e:
-            print(f"법률 검색 중 알 수 없는 오류 발생: {e}")
-            break
+            yield from laws
+        return
+    
+    last_page = (total + LIST_PAGE_SIZE - 1) // LIST_PAGE_SIZE
+    if last_page <= 1:
+        return
+    
+    # 나머지 페이지를 동시에 요청하고, 페이지 순서대로 결과 반환
+    executor = ThreadPoolExecutor(max_workers=min(max_workers or MAX_WORKERS, last_page - 1))
+    try:
+        futures = [executor.submit(_fetch_law_list_page, encoded_query, page, metrics) for page in range(2, last_page + 1)]
+        for future in futures:
+            page_laws, _ = future.result()
+            if page_laws:
+                yield from page_laws # 실패한 페이지는 건너뛰고 나머지 페이지 결과는 유지
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def get_law_list_from_api(query, max_workers=None, metrics=None):
+    """
+    법제처 API를 통해 검색어에 해당하는 법령 목록을 가져오는 함수.
+    페이지네이션을 지원하여 모든 검색 결과를 목록으로 반환합니다.
+    """
+    laws = list(iter_law_list_from_api(query, max_workers, metrics=metrics))
     
     # 디버깅을 위해 검색된 법률 목록 출력
-    print(f"검색된 법률 수: {len(laws)}")
-    for idx, law in enumerate(laws[:3]):  # 처음 3개만 출력
-        print(f"{idx+1}. {law['법령명']}")
+    if DEBUG_LOG:
+        for idx, law in enumerate(laws[:3]):  # 처음 3개만 출력
+            print(f"{idx+1}. {law['법령명']}")
     
     return laws
 
-def get_law_text_by_mst(mst):
+def get_all_laws_from_api(max_workers=None):
     """
-    법령일련번호(MST)를 사용하여 특정 법령의 전체 XML 데이터를 가져오는 함수.
+    법제처 API에서 현행 법률 전체 목록을 가져오는 함수 (색인 구축/동기화용).
+    일부 페이지를 가져오지 못해 목록이 전체 결과 수보다 적으면 None을 반환합니다.
     """
-    url = f"{BASE}/DRF/lawService.do?OC={OC}&target=law&MST={mst}&type=XML"
+    진행 = {}
+    laws = list(iter_all_laws_from_api(max_workers, on_total=lambda total: 진행.update(total=total)))
+    if not laws or len(laws) < 진행.get("total", 0):
+        return None
+    return laws
+
+def _get_cache_conn():
+    """법령 XML 캐시용 SQLite 연결을 (필요 시 생성하여) 반환하는 함수. _cache_lock을 잡은 상태에서 호출합니다."""
+    global _cache_conn
+    if _cache_conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(CACHE_DIR, "law_text.sqlite3"), check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS law_text ("
+            "mst TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS law_text_last_access ON law_text (last_access)")
+        conn.commit()
+        _cache_conn = conn
+    return _cache_conn
+
+def _get_cached_compressed(mst):
+    """
+    디스크 캐시에서 MST에 해당하는 압축된 법령 XML을 찾아 반환하는 함수.
+    캐시에 없거나 캐시를 사용할 수 없으면 None을 반환합니다.
+    """
+    if CACHE_MAX_BYTES <= 0 or not mst:
+        return None
     try:
-        res = requests.get(url, timeout=10) # 10초 타임아웃 설정
-        res.encoding = 'utf-8' # 응답 인코딩을 UTF-8로 설정
-        if res.status_code == 200:
-            return res.content
-        else:
-            print(f"법령 XML 가져오기 실패: 상태 코드 {res.status_code} for MST {mst}")
-            return None
-    except requests.exceptions.Timeout:
-        print(f"법령 XML 가져오기 중 타임아웃 발생: MST {mst}")
+        with _cache_lock:
+            conn = _get_cache_conn()
+            row = conn.execute("SELECT data, last_access FROM law_text WHERE mst = ?", (mst,)).fetchone()
+            if row is None:
+                return None
+            # 최근 사용 시각 갱신 (LRU 제거 순서 결정에 사용). 최근에 갱신한 항목은 다시 쓰지 않음
+            now = time.time()
+            if now - row[1] >= CACHE_TOUCH_INTERVAL:
+                conn.execute("UPDATE law_text SET last_access = ? WHERE mst = ?", (now, mst))
+                conn.commit()
+        return row[0]
+    except (sqlite3.Error, OSError) as e:
+        print(f"법령 XML 캐시 읽기 오류: {e} for MST {mst}")
+        return None
+
+def get_cached_law_text(mst):
+    """
+    디스크 캐시에서 MST에 해당하는 법령 XML을 찾아 반환하는 함수.
+    캐시에 없거나 캐시를 사용할 수 없으면 None을 반환합니다.
+    """
+    compressed = _get_cached_compressed(mst)
+    if compressed is None:
         return None
+    try:
+        return zlib.decompress(compressed)
+    except zlib.error as e:
+        print(f"법령 XML 캐시 읽기 오류: {e} for MST {mst}")
+        return None
+
+def _store_compressed_law_text(mst, compressed):
+    """
+    압축된 법령 XML을 디스크 캐시에 저장하는 함수.
+    저장 후 전체 용량이 CACHE_MAX_BYTES를 넘으면 가장 오래 쓰이지 않은 항목부터 제거합니다.
+    """
+    if CACHE_MAX_BYTES <= 0 or not mst or not compressed:
+        return
+    try:
+        with _cache_lock:
+            conn = _get_cache_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO law_text (mst, data, size, last_access) VALUES (?, ?, ?, ?)",
+                (mst, compressed, len(compressed), time.time()),
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM law_text").fetchone()[0]
+            if total > CACHE_MAX_BYTES:
+                # 가장 오래 쓰이지 않은 항목부터 한도 이하가 될 때까지 제거
+                for old_mst, size in conn.execute(
+                    "SELECT mst, size FROM law_text ORDER BY last_access"
+                ).fetchall():
+                    if total <= CACHE_MAX_BYTES:
+                        break
+                    conn.execute("DELETE FROM law_text WHERE mst = ?", (old_mst,))
+                    total -= size
+            conn.commit()
+    except (sqlite3.Error, OSError) as e:
+        print(f"법령 XML 캐시 저장 오류: {e} for MST {mst}")
+
+def store_cached_law_text(mst, xml_data):
+    """법령 XML을 압축하여 디스크 캐시에 저장하는 함수"""
+    if xml_data:
+        _store_compressed_law_text(mst, zlib.compress(xml_data))
+
+# 스트리밍으로 법령 XML을 받거나 캐시에서 풀 때 한 번에 파서에 넣는 바이트 수
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def iter_article_elements(chunks):
+    """
+    XML 바이트 조각을 차례로 파서에 넣으면서 완성된 조문단위 요소를 문서 순서대로 반환하는 제너레이터.
+    반환한 조문단위와 처리가 끝난 상위 구획(기본정보, 부칙 등)은 바로 트리에서 떼어 내므로,
+    문서 전체가 아니라 처리 중인 조문 하나 정도만 메모리에 남습니다. XML이 잘못되면 ET.ParseError가 발생합니다.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack = [] # 현재 열려 있는 요소들 (루트부터 순서대로)
+    
+    def drain():
+        for event, elem in parser.read_events():
+            if event == "start":
+                stack.append(elem)
+                continue
+            stack.pop()
+            if elem.tag == "조문단위":
+                yield elem
+            elif len(stack) > 2:
+                continue # 조문단위 안쪽 요소는 조문단위와 함께 제거됨
+            if stack:
+                stack[-1].remove(elem)
+    
+    for chunk in chunks:
+        if chunk:
+            parser.feed(chunk)
+            yield from drain()
+    parser.close()
+    yield from drain()
+
+def _iter_decompressed(compressed):
+    """압축된 캐시 데이터를 STREAM_CHUNK_SIZE 단위로 풀어서 반환하는 제너레이터"""
+    decompressor = zlib.decompressobj()
+    for start in range(0, len(compressed), STREAM_CHUNK_SIZE):
+        yield decompressor.decompress(compressed[start:start + STREAM_CHUNK_SIZE])
+    yield decompressor.flush()
+
+def _parse_streaming_response(res, metrics):
+    """
+    스트리밍 응답을 받는 대로 파싱하여 (텍스트 단위 목록, 압축된 XML) 튜플을 반환하는 함수.
+    받은 XML은 원문 전체를 모아 두지 않고 조각마다 바로 압축합니다.
+    조각을 기다린 시간은 fetch 단계, 나머지(파싱과 압축)는 parse 단계로 metrics에 기록합니다.
+    """
+    compressor = zlib.compressobj()
+    compressed_parts = []
+    waited = [0.0, 0] # 조각을 기다린 누적 시간, 받은 바이트 수
+    
+    def chunks():
+        content = res.iter_content(STREAM_CHUNK_SIZE)
+        while True:
+            start = time.perf_counter()
+            chunk = next(content, None)
+            waited[0] += time.perf_counter() - start
+            if chunk is None:
+                return
+            waited[1] += len(chunk)
+            compressed_parts.append(compressor.compress(chunk))
+            yield chunk
+    
+    start = time.perf_counter()
+    try:
+        units = parse_law_units(iter_article_elements(chunks()))
+        compressed_parts.append(compressor.flush())
+    finally:
+        metrics.add_time("fetch", waited[0], calls=0) # 요청 횟수는 응답 헤더를 받을 때 이미 기록함
+        metrics.add_time("parse", time.perf_counter() - start - waited[0])
+        metrics.count("xml_bytes", waited[1])
+    return units, b"".join(compressed_parts)
+
+def _fetch_and_parse_law(mst, metrics=None):
+    """
+    MST로 법령 XML을 가져와 텍스트 단위 목록으로 변환하는 함수 (스레드 풀 작업 단위).
+    디스크 캐시에 있으면 캐시에서, 없으면 응답을 스트리밍으로 받으면서 받은 만큼 바로 파싱하고 캐시에 저장합니다.
+    (텍스트 단위 목록, 오류 메시지) 튜플을 반환하며, 성공 시 오류 메시지는 None입니다.
+    metrics(RunMetrics)가 주어지면 캐시 적중 여부, 단계별 소요 시간, 법률별 소요 시간(law_fetch 분포)을 기록합니다.
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    start = time.perf_counter()
+    try:
+        return _load_law_units(mst, metrics)
+    finally:
+        metrics.observe("law_fetch", time.perf_counter() - start)
+
+def _load_law_units(mst, metrics):
+    """_fetch_and_parse_law의 캐시 조회/요청/파싱 부분"""
+    compressed = _get_cached_compressed(mst)
+    if compressed is not None:
+        metrics.count("cache_hits")
+        try:
+            with metrics.stage("parse"):
+                return parse_law_units(iter_article_elements(_iter_decompressed(compressed))), None
+        except (ET.ParseError, zlib.error) as e:
+            print(f"법령 XML 캐시 데이터 오류: {e} for MST {mst} - 다시 내려받습니다.")
+    metrics.count("cache_misses")
+    
+    url = f"{BASE}/DRF/lawService.do?OC={OC}&target=law&MST={mst}&type=XML"
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        try:
+            with metrics.stage("fetch"):
+                res = http_get(url, metrics, stream=True) # 공유 세션으로 요청 (타임아웃/5xx 시 재시도)
+        except requests.exceptions.RequestException as e:
+            print(f"법령 XML 가져오기 중 요청 오류 발생: {e} for MST {mst}")
+            return None, "XML 데이터 없음"
+        with res:
+            if res.status_code != 200:
+                print(f"법령 XML 가져오기 실패: 상태 코드 {res.status_code} for MST {mst}")
+                return None, "XML 데이터 없음"
+            try:
+                units, compressed = _parse_streaming_response(res, metrics)
+            except ET.ParseError as e:
+                return None, f"XML 파싱 오류 - {str(e)}"
+            except requests.exceptions.RequestException as e:
+                # 본문 수신 도중 연결이 끊긴 경우 처음부터 다시 요청
+                if attempt == HTTP_MAX_RETRIES:
+                    print(f"법령 XML 수신 중 오류 발생: {e} for MST {mst}")
+                    return None, "XML 데이터 없음"
+                print(f"법령 XML 수신 중 오류({type(e).__name__}) - 재시도 {attempt+1}/{HTTP_MAX_RETRIES}: MST {mst}")
+                metrics.count("retries")
+                time.sleep(random.uniform(0, HTTP_BACKOFF_BASE * (2 ** attempt)))
+                continue
+        # 조문이 있는 정상 응답만 캐시 (오류 안내 XML 등이 저장되지 않도록)
+        metrics.count("laws_fetched")
+        if units:
+            _store_compressed_law_text(mst, compressed)
+        return units, None
+
+def fetch_law_units(laws, max_workers=None, metrics=None):
+    """
+    법령 목록의 본문 XML을 스레드 풀로 동시에 가져와 텍스트 단위 목록으로 변환하는 제너레이터.
+    동시에 진행되는 요청 수는 max_workers(기본값 MAX_WORKERS)로 제한되며,
+    결과는 입력 목록과 같은 순서로 (법령 정보, 텍스트 단위 목록, 오류 메시지) 튜플을 반환합니다.
+    metrics(RunMetrics)가 주어지면 법률별 수신/파싱 측정값을 기록합니다.
+    """
+    for law, (units, error) in _iter_in_order(laws, lambda law: _fetch_and_parse_law(law["MST"], metrics), max_workers):
+        yield law, units, error
+
+def _iter_in_order(laws, work, max_workers=None):
+    """
+    법령마다 work(법령 정보)를 스레드 풀에서 실행하고 (법령 정보, 결과) 튜플을 입력 순서대로 반환하는 제너레이터.
+    앞선 결과가 소비되지 않은 채 쌓이지 않도록 선행 작업 수를 max_workers의 2배로 제한합니다.
+    """
+    max_workers = max_workers or MAX_WORKERS
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = deque() # 작업이 제출된 (법령 정보, Future) 목록 (입력 순서 유지)
+    try:
+        for law in laws:
+            pending.append((law, executor.submit(work, law)))
+            # 앞선 결과가 소비되지 않은 채 너무 많이 쌓이지 않도록 선행 요청 수를 제한
+            if len(pending) >= max_workers * 2:
+                done_law, future = pending.popleft()
+                yield done_law, future.result()
+        while pending:
+            done_law, future = pending.popleft()
+            yield done_law, future.result()
+    finally:
+        # 소비가 중단된 경우 아직 시작되지 않은 요청은 취소
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _fetch_law_xml(mst, metrics):
+    """
+    MST로 압축된 법령 XML을 가져오는 함수 (프로세스 풀 모드의 수신 단계).
+    디스크 캐시에 있으면 캐시에서, 없으면 응답 전체를 받아 압축하고, 조문이 있는 응답이면 캐시에 저장합니다.
+    (압축된 XML, 오류 메시지) 튜플을 반환하며, 성공 시 오류 메시지는 None입니다.
+    """
+    compressed = _get_cached_compressed(mst)
+    if compressed is not None:
+        metrics.count("cache_hits")
+        return compressed, None
+    metrics.count("cache_misses")
+    
+    url = f"{BASE}/DRF/lawService.do?OC={OC}&target=law&MST={mst}&type=XML"
+    try:
+        with metrics.stage("fetch"):
+            res = http_get(url, metrics) # 공유 세션으로 요청 (타임아웃/5xx 시 재시도)
+            data = res.content
     except requests.exceptions.RequestException as e:
         print(f"법령 XML 가져오기 중 요청 오류 발생: {e} for MST {mst}")
+        return None, "XML 데이터 없음"
+    if res.status_code != 200:
+        print(f"법령 XML 가져오기 실패: 상태 코드 {res.status_code} for MST {mst}")
+        return None, "XML 데이터 없음"
+    metrics.count("laws_fetched")
+    metrics.count("xml_bytes", len(data))
+    compressed = zlib.compress(data)
+    # 조문이 있는 정상 응답만 캐시 (오류 안내 XML 등이 저장되지 않도록)
+    if "조문단위".encode("utf-8") in data:
+        _store_compressed_law_text(mst, compressed)
+    return compressed, None
+
+def _get_process_pool():
+    """
+    법률별 파싱/검색어 찾기를 실행할 프로세스 풀을 (필요 시 생성하여) 반환하는 함수.
+    프로세스 풀 모드를 쓰지 않거나 이 모듈을 작업 프로세스에서 다시 불러올 수 없으면 None을 반환합니다.
+    """
+    global _process_pool
+    if PARSE_PROCESSES <= 0:
         return None
-    except Exception as e:
-        print(f"법령 XML 가져오기 중 알 수 없는 오류 발생: {e} for MST {mst}")
+    # 작업 함수는 모듈 이름으로 전달되므로, 파일 경로로 직접 실행한 모듈 등은 스레드 풀 모드로 처리
+    if getattr(sys.modules.get(__name__), "_run_law_task", None) is not _run_law_task:
         return None
+    with _process_pool_lock:
+        if _process_pool is None:
+            # 스레드가 도는 중에 fork하지 않도록 spawn으로 작업 프로세스를 시작
+            _process_pool = ProcessPoolExecutor(max_workers=PARSE_PROCESSES, mp_context=multiprocessing.get_context("spawn"),
+                                                initializer=_init_worker, initargs=(DEBUG_LOG,))
+    return _process_pool
+
+def shutdown_process_pool():
+    """프로세스 풀을 쓰고 있으면 작업 프로세스를 모두 종료하는 함수 (다음 사용 시 다시 생성)"""
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+atexit.register(shutdown_process_pool)
+
+def _init_worker(debug_log):
+    """작업 프로세스 초기화: 디버깅 출력 설정을 부모 프로세스와 맞춤"""
+    global DEBUG_LOG
+    DEBUG_LOG = debug_log
+
+def _make_law_handler(task, memo=None):
+    """
+    작업 설명(task)으로 법률 하나를 처리하는 함수 handler(법률명, 텍스트 단위 목록, metrics)를 만드는 함수.
+    task는 프로세스 사이에 전달할 수 있는 튜플입니다.
+    - ("amendment", 전처리된 쌍 튜플, 띄어쓰기 무시 여부): (개정 규칙 문장 목록 또는 None, (법률명, 누락 사유) 목록)을 반환
+    - ("search", 처리된 검색어, 구문 여부): 조문 HTML 목록을 반환
+    - ("boolean", 정규화된 검색식): 조문 HTML 목록을 반환
+    """
+    kind = task[0]
+    if kind == "amendment":
+        pairs = list(task[1])
+        matcher = LawMatcher([(find_word, is_phrase) for find_word, _, is_phrase in pairs], memo=memo,
+                             spacing_variants=task[2])
+        
+        def handler(law_name, units, metrics):
+            skipped_laws = []
+            consolidated_rules = _build_law_amendment_rules(law_name, units, pairs, matcher, skipped_laws,
+                                                            matcher.memo, metrics)
+            return consolidated_rules, skipped_laws
+        return handler
+    if kind == "search":
+        _, processed_query, is_phrase = task
+        matcher = LawMatcher([(processed_query, is_phrase)], spacing_insensitive=True)
+        highlighter = Highlighter(matcher.terms)
+        return lambda law_name, units, metrics: _search_law_units(law_name, units, matcher, highlighter, metrics)
+    node, terms, positive = parse_search_query(task[1])
+    matcher = LawMatcher(terms, spacing_insensitive=True)
+    highlighter = Highlighter([terms[idx] for idx in sorted(positive)]) # 긍정 검색어만 표시
+    return lambda law_name, units, metrics: _search_law_units_boolean(law_name, units, matcher, node, positive,
+                                                                      highlighter, metrics)
+
+_worker_handlers = OrderedDict() # 작업 프로세스에서 (실행 번호, 작업 설명)별로 만들어 둔 handler (최근 것만 보관)
+_pool_run_ids = itertools.count(1) # 프로세스 풀 실행마다 붙이는 번호 (작업 프로세스의 handler와 메모를 실행 단위로 구분)
+
+def _run_law_task(run_id, task, law_name, compressed):
+    """
+    프로세스 풀 작업 단위: 압축된 법령 XML을 파싱하고 task의 handler로 처리하는 함수.
+    handler와 그 메모는 실행 번호(run_id)별로 만들어 같은 실행 안에서만 재사용합니다.
+    (결과, 오류 메시지, 단계별 [횟수, 누적 초] 사전, 소요 초) 튜플을 반환합니다.
+    """
+    start = time.perf_counter()
+    metrics = RunMetrics()
+    key = (run_id, task)
+    handler = _worker_handlers.get(key)
+    if handler is None:
+        handler = _worker_handlers[key] = _make_law_handler(task)
+        if len(_worker_handlers) > 8:
+            _worker_handlers.popitem(last=False)
+    try:
+        with metrics.stage("parse"):
+            units = parse_law_units(iter_article_elements(_iter_decompressed(compressed)))
+    except (ET.ParseError, zlib.error) as e:
+        return None, f"XML 파싱 오류 - {str(e)}", dict(metrics.stages), time.perf_counter() - start
+    process_start = time.perf_counter()
+    result = handler(law_name, units, metrics)
+    return result, None, dict(metrics.stages), time.perf_counter() - process_start
+
+def iter_law_results(laws, task, max_workers=None, metrics=None, memo=None):
+    """
+    법령 목록의 본문을 동시에 가져와 법률마다 task의 handler(_make_law_handler 참고)를 실행하는 제너레이터.
+    결과는 입력 목록과 같은 순서로 (법령 정보, handler 결과, 오류 메시지) 튜플을 반환하며, 오류가 있으면 결과는 None입니다.
+    PARSE_PROCESSES가 1 이상이면 수신은 스레드 풀에서, XML 파싱과 handler 실행은 프로세스 풀에서 하여
+    CPU를 많이 쓰는 큰 작업이 여러 코어를 사용합니다. 이때 작업 프로세스에는 압축된 XML만 보내고 결과만 돌려받으며,
+    memo는 작업 프로세스마다 이번 실행용으로 따로 만든 것을 사용합니다.
+    대상 법률이 PARSE_PROCESS_MIN_LAWS개보다 적으면 프로세스 풀을 쓰지 않고 스레드 풀에서 처리합니다.
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    pool = None
+    if PARSE_PROCESSES > 0:
+        # 목록 앞부분만 미리 읽어 법률 수가 기준 이상인지 확인 (읽은 법률은 그대로 앞에 다시 붙임)
+        laws = iter(laws)
+        head = list(itertools.islice(laws, PARSE_PROCESS_MIN_LAWS))
+        if len(head) >= PARSE_PROCESS_MIN_LAWS:
+            pool = _get_process_pool()
+        laws = itertools.chain(head, laws)
+    if pool is None:
+        handler = _make_law_handler(task, memo)
+        for law, units, error in fetch_law_units(laws, max_workers, metrics):
+            if error:
+                yield law, None, error
+                continue
+            start = time.perf_counter()
+            result = handler(law["법령명"], units, metrics)
+            metrics.observe("law_process", time.perf_counter() - start)
+            yield law, result, None
+        return
+    
+    run_id = next(_pool_run_ids)
+    
+    def work(law):
+        start = time.perf_counter()
+        try:
+            compressed, error = _fetch_law_xml(law["MST"], metrics)
+        finally:
+            metrics.observe("law_fetch", time.perf_counter() - start)
+        if error:
+            return None, error
+        result, error, stages, elapsed = pool.submit(_run_law_task, run_id, task, law["법령명"], compressed).result()
+        for stage, (calls, seconds) in stages.items():
+            metrics.add_time(stage, seconds, calls)
+        if error is None:
+            metrics.observe("law_process", elapsed)
+        return result, error
+    
+    for law, (result, error) in _iter_in_order(laws, work, max_workers):
+        yield law, result, error
 
 def clean(text):
     """텍스트에서 모든 공백을 제거하는 함수 (검색 매칭 시 사용)"""
     return re.sub(r"\s+", "", text or "")
 
+NON_SPACE_PATTERN = re.compile(r"\S") # clean()이 남기는 글자
+
+def clean_with_offsets(text):
+    """
+    텍스트에서 모든 공백을 제거한 문자열과, 그 문자열의 각 글자가 원문에서 차지하는 위치 목록을 반환하는 함수.
+    공백을 제거한 텍스트에서 찾은 구간 [start, end)는 원문의 [offsets[start], offsets[end - 1] + 1)에 해당합니다.
+    """
+    offsets = [match.start() for match in NON_SPACE_PATTERN.finditer(text or "")]
+    return "".join(text[i] for i in offsets), offsets
+
+def _fold_case(text):
+    """대소문자를 무시하고 찾기 위해 소문자로 바꾼 텍스트 (글자 수가 달라지는 드문 경우에는 원문 그대로)"""
+    folded = text.lower()
+    return folded if len(folded) == len(text) else text
+
+class Highlighter:
+    """
+    검색어((검색어, 구문 여부) 목록)의 출현을 HTML <mark> 태그로 표시하는 하이라이터. 검색어마다 한 번 만들어 재사용합니다.
+    구문은 원문에서 그대로, 낱말은 공백을 제거한 텍스트에서 찾아 원문 위치로 되돌리므로 띄어쓰기가 달라도 표시됩니다.
+    대소문자는 무시하며, 텍스트 하나의 모든 출현을 한 번에 찾아 겹치는 표시는 하나로 합칩니다.
+    """
+    __slots__ = ("_phrase_matcher", "_word_matcher")
+    
+    def __init__(self, terms):
+        phrases = {_fold_case(text) for text, is_phrase in terms if is_phrase and text}
+        words = {_fold_case(clean(text)) for text, is_phrase in terms if not is_phrase and clean(text)}
+        self._phrase_matcher = MultiPatternMatcher(sorted(phrases)) if phrases else None
+        self._word_matcher = MultiPatternMatcher(sorted(words)) if words else None
+    
+    def spans(self, text):
+        """텍스트에서 표시할 원문 구간 (시작, 끝) 목록을 겹치는 구간을 합쳐 순서대로 반환"""
+        spans = []
+        if self._phrase_matcher is not None:
+            spans.extend((start, end) for start, end, _ in self._phrase_matcher.finditer(_fold_case(text)))
+        if self._word_matcher is not None:
+            cleaned, offsets = clean_with_offsets(text)
+            spans.extend((offsets[start], offsets[end - 1] + 1)
+                         for start, end, _ in self._word_matcher.finditer(_fold_case(cleaned)))
+        merged = []
+        for start, end in sorted(spans):
+            if merged and start < merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
+    
+    def mark(self, text):
+        """텍스트의 검색어 출현을 <mark> 태그로 감싼 HTML을 반환"""
+        if not text:
+            return text
+        spans = self.spans(text)
+        if not spans:
+            return text
+        parts = []
+        position = 0
+        for start, end in spans:
+            parts.append(text[position:start])
+            parts.append(f"<mark>{text[start:end]}</mark>")
+            position = end
+        parts.append(text[position:])
+        return "".join(parts)
+
+@functools.lru_cache(maxsize=64)
+def get_query_highlighter(query):
+    """검색어(사용자 입력) 하나의 하이라이터를 만들어 반환하는 함수 (같은 검색어는 만들어 둔 것을 재사용)"""
+    processed_query, is_phrase = preprocess_search_term(normalize_special_chars(query))
+    return Highlighter([(processed_query, is_phrase)])
+
 def normalize_special_chars(text):
     """
     특수문자를 정규화하는 함수: 중간점, 마침표, 중괄호, 샵(#)을 적절한 문자로 변환.
@@ -168,114 +921,130 @@ def make_article_number(조문번호, 조문가지번호):
     """조문 번호와 가지 번호를 조합하여 표준 형식 문자열을 생성"""
     return f"제{조문번호}조의{조문가지번호}" if 조문가지번호 and 조문가지번호 != "0" else f"제{조문번호}조"
 
-def has_batchim(word):
-    """단어의 마지막 글자에 받침이 있는지 확인하는 함수 (한국어 조사 규칙 적용 위함)"""
-    if not word:
-        return False
-    
-    last_char = word[-1]
-    # 한글 유니코드 범위: AC00-D7A3
-    if '가' <= last_char <= '힣':
-        # 한글 유니코드 계산식: [(초성 * 21) + 중성] * 28 + 종성 + 0xAC00
-        char_code = ord(last_char)
-        # 종성 값 추출 (0은 받침 없음, 1-27은 받침 있음)
-        jongseong = (char_code - 0xAC00) % 28
-        return jongseong != 0
-    return False
+# 단어 단위 개정문 생성 시 토큰을 나누는 패턴 (한글, 영문, 숫자, 낫표)
+TOKEN_PATTERN = re.compile(r'[가-힣A-Za-z0-9「」]+')
 
-def has_rieul_batchim(word):
-    """단어의 마지막 글자에 'ㄹ' 받침이 있는지 확인하는 함수 (한국어 조사 규칙 적용 위함)"""
-    if not word:
-        return False
-    
-    last_char = word[-1]
-    if '가' <= last_char <= '힣':
-        char_code = ord(last_char)
-        # 종성 값 추출 (8은 'ㄹ' 받침)
-        jongseong = (char_code - 0xAC00) % 28
-        return jongseong == 8
-    return False
-    
-def extract_article_num(loc):
-    """조번호를 추출하여 정수로 변환하는 함수 (정렬에 사용)"""
-    article_match = re.search(r'제(\d+)조(?:의(\d+))?', loc)
-    if not article_match:
-        return (0, 0)
-    
-    # 조번호를 정수로 변환 (37 < 357 정렬을 위해)
-    article_num = int(article_match.group(1))
-    # 조 가지 번호는 보조 정렬 키로 사용 (없으면 0)
-    article_sub = int(article_match.group(2)) if article_match.group(2) else 0
-    
-    return (article_num, article_sub)
+class LawTextUnit:
+    """
+    법령 본문의 텍스트 단위(조문 제목, 조문내용, 항, 호, 목내용) 하나를 나타내는 클래스.
+    kind는 "제목", "조문", "항", "호", "목" 중 하나이며, 위치 정보(조문식별자, 항번호, 호번호, 호가지번호, 목번호)와
+    원문(raw), 공백을 제거한 텍스트(stripped)를 함께 보관합니다. parent는 상위 항/호 단위의 목록 내 위치입니다.
+    """
+    __slots__ = ("kind", "조문식별자", "부칙", "항번호", "각목외의부분", "호번호", "호가지번호", "목번호",
+                 "parent", "raw", "stripped", "_offsets")
+    
+    def __init__(self, kind, 조문식별자, 부칙, raw, parent=None, 항번호="", 각목외의부분=False,
+                 호번호=None, 호가지번호=None, 목번호=None):
+        self.kind = kind
+        self.조문식별자 = 조문식별자
+        self.부칙 = 부칙
+        self.항번호 = 항번호
+        self.각목외의부분 = 각목외의부분
+        self.호번호 = 호번호
+        self.호가지번호 = 호가지번호
+        self.목번호 = 목번호
+        self.parent = parent
+        self.raw = raw
+        self.stripped = clean(raw)
+        self._offsets = None
+    
+    @property
+    def offsets(self):
+        """stripped의 각 글자가 원문(raw)에서 차지하는 위치 목록 (처음 필요할 때 한 번 계산하여 보관)"""
+        if self._offsets is None:
+            self._offsets = [match.start() for match in NON_SPACE_PATTERN.finditer(self.raw)]
+        return self._offsets
+
+def parse_law_units(articles):
+    """
+    조문단위 요소들을 텍스트 단위(LawTextUnit)의 평면 목록으로 변환하는 함수.
+    articles에는 파싱된 트리의 조문단위 목록이나 iter_article_elements의 스트리밍 결과를 넘길 수 있으며, 각 요소를 한 번만 읽습니다.
+    조문마다 제목 단위와 조문내용 단위가 먼저 오고, 그 뒤에 항, 호, 목 단위가 문서 순서대로 이어집니다.
+    내용이 비어 있는 제목/조문/항/호 단위도 위치 정보를 위해 포함합니다.
+    """
+    units = []
+    for article in articles:
+        # 조문 정보 추출
+        조문식별자 = make_article_number(article.findtext("조문번호", "").strip(), article.findtext("조문가지번호", "").strip())
+        # 조문의 부칙 여부 확인 (부칙은 개정문 대상에서 제외)
+        부칙 = "부칙" in article.findtext("조문명", "").strip()
+        units.append(LawTextUnit("제목", 조문식별자, 부칙, article.findtext("조문제목", "") or ""))
+        units.append(LawTextUnit("조문", 조문식별자, 부칙, article.findtext("조문내용", "") or ""))
+        
+        for 항 in article.findall("항"):
+            항번호 = normalize_number(항.findtext("항번호", "").strip())
+            호들 = 항.findall("호")
+            # 각 목 외의 부분 확인 (호의 구분 속성으로 표시됨)
+            각목외의부분 = any(호.attrib.get("구분") == "각목외의부분" for 호 in 호들)
+            항_위치 = len(units)
+            units.append(LawTextUnit("항", 조문식별자, 부칙, 항.findtext("항내용", "") or "",
+                                     항번호=항번호, 각목외의부분=각목외의부분))
+            
+            for 호 in 호들:
+                호번호 = 호.findtext("호번호")
+                # 가지번호 확인 (예: 제14호의3) - 호가지번호는 XML 태그로 존재할 수 있음
+                호가지번호 = 호.findtext("호가지번호", "").strip() if 호.find("호가지번호") is not None else None
+                호_위치 = len(units)
+                units.append(LawTextUnit("호", 조문식별자, 부칙, 호.findtext("호내용", "") or "", parent=항_위치,
+                                         항번호=항번호, 호번호=호번호, 호가지번호=호가지번호))
+                
+                for 목 in 호.findall("목"):
+                    목번호 = 목.findtext("목번호")
+                    for m in 목.findall("목내용"):
+                        units.append(LawTextUnit("목", 조문식별자, 부칙, m.text or "", parent=호_위치,
+                                                 항번호=항번호, 호번호=호번호, 호가지번호=호가지번호, 목번호=목번호))
+    return units
+
+# 덩어리에 포함시키지 않을 접미사 (예를 들어 '등'은 본 단어가 아님)
+SUFFIX_EXCLUDE = frozenset(["의", "에", "에서", "에게",
+                            "등", "등의", "등인", "등만", "등에", "만", "만을", "만이", "만은", "만에", "만으로"])
+
+# 처리할 조사 (규칙에 따른 18가지 조사 및 따옴표 포함 변형, 예: "이라는") → 따옴표를 뗀 기본 조사
+JOSA_SUFFIXES = {josa: josa.lstrip('"') for josa in [
+    "을", "를", "과", "와", "이", "가", "이나", "나", "으로", "로", "은", "는",
+    "란", "이란", "라", "이라", "로서", "으로서", "로써", "으로써",
+    "\"란", "\"이란", "\"라", "\"이라"]}
 
 def extract_chunk_and_josa(token, searchword):
     """
     검색어를 포함하는 덩어리(단어/구문)와 뒤에 붙는 조사 또는 접미사를 추출하는 함수.
     이 함수는 단어 단위 검색 결과에 대한 조사를 처리합니다.
+    토큰에서 검색어 뒤에 남는 부분이 접미사나 조사와 정확히 같은지를 미리 만든 집합/사전에서 한 번에 찾습니다.
     """
     # 검색어의 앞뒤 공백 제거 (trim)
     searchword = searchword.strip()
     
-    # 제외할 접미사 리스트 (덩어리에 포함시키지 않을 것들, 예를 들어 '등'은 본 단어가 아님)
-    suffix_exclude = ["의", "에", "에서", "에게", 
-                      "등", "등의", "등인", "등만", "등에", "만", "만을", "만이", "만은", "만에", "만으로"]
-    
-    # 처리할 조사 리스트 (규칙에 따른 18가지 조사 및 따옴표 포함 변형)
-    josa_list = ["을", "를", "과", "와", "이", "가", "이나", "나", "으로", "로", "은", "는", 
-                 "란", "이란", "라", "이라", "로서", "으로서", "로써", "으로써",
-                 "\"란", "\"이란", "\"라", "\"이라"] # 따옴표가 있는 경우 추가 (예: "이라는")
-    
-    # 원본 토큰 저장
-    original_token = token
-    suffix = None # 추출된 접미사를 저장할 변수
-    
     # 검색어 자체가 토큰인 경우 (조사나 접미사가 없는 경우)
     if token == searchword:
         return token, None, None
     
-    # 토큰에 검색어가 포함되어 있지 않으면 바로 반환
-    # 이 조건은 searchword가 token의 일부인 경우를 먼저 거르기 위함
-    if searchword not in token:
-        return token, None, None
-    
-    # 토큰이 검색어로 시작하는지 확인 (접두사로 붙는 경우 제외)
+    # 토큰이 검색어로 시작하지 않으면 (검색어가 없거나 다른 단어의 일부인 경우) 전체 토큰을 반환
+    # 예: "대한민국법원"에서 "민국법원"을 찾을 때, "대한"은 "대한민국법원"의 일부이므로 전체 토큰을 반환
     if not token.startswith(searchword):
-        # 검색어가 토큰 중간에 있는 경우 (다른 단어의 일부)
-        # 예: "대한민국법원"에서 "민국법원"을 찾을 때, "대한"은 "대한민국법원"의 일부이므로 전체 토큰을 반환
         return token, None, None
     
-    # 1. 접미사 제거 시도 (덩어리에 포함시키지 않음)
-    # 가장 긴 접미사부터 확인하여 정확한 매칭을 유도
-    for s in sorted(suffix_exclude, key=len, reverse=True):
-        if token == searchword + s:
-            # 정확히 "검색어+접미사"인 경우 (예: "지방법원에"에서 검색어 "지방법원"에 "에"가 붙은 경우)
-            print(f"접미사 처리: '{token}' = '{searchword}' + '{s}'") # 디버깅
-            return searchword, None, s # 검색어와 접미사 분리하여 반환
-    
-    # 2. 조사 확인 (조사는 규칙에 따라 처리)
-    # 가장 긴 조사부터 확인하여 정확한 매칭을 유도
-    for j in sorted(josa_list, key=len, reverse=True):
-        if token == searchword + j:
-            # 정확히 "검색어+조사"인 경우 (예: "지방법원을"에서 검색어 "지방법원"에 "을"이 붙은 경우)
-            print(f"조사 처리: '{token}' = '{searchword}' + '{j}'") # 디버깅
-            
-            # 특수 케이스: 따옴표가 있는 조사 처리 (예: "\"란")
-            if j.startswith("\""):
-                # 따옴표를 제거한 기본 조사 부분만 반환
-                base_josa = j[1:]
-                return searchword, base_josa, None
-            
-            return searchword, j, None # 검색어와 조사 분리하여 반환
+    rest = token[len(searchword):]
+    
+    # 1. 접미사 분리 (덩어리에 포함시키지 않음)
+    if rest in SUFFIX_EXCLUDE:
+        # 정확히 "검색어+접미사"인 경우 (예: "지방법원에"에서 검색어 "지방법원"에 "에"가 붙은 경우)
+        if DEBUG_LOG:
+            print(f"접미사 처리: '{token}' = '{searchword}' + '{rest}'") # 디버깅
+        return searchword, None, rest # 검색어와 접미사 분리하여 반환
+    
+    # 2. 조사 분리 (조사는 규칙에 따라 처리, 따옴표가 있는 조사는 따옴표를 뗀 기본 조사만 반환)
+    base_josa = JOSA_SUFFIXES.get(rest)
+    if base_josa is not None:
+        # 정확히 "검색어+조사"인 경우 (예: "지방법원을"에서 검색어 "지방법원"에 "을"이 붙은 경우)
+        if DEBUG_LOG:
+            print(f"조사 처리: '{token}' = '{searchword}' + '{rest}'") # 디버깅
+        return searchword, base_josa, None # 검색어와 조사 분리하여 반환
     
     # 3. 덩어리 처리 (검색어 뒤에 다른 문자가 있는 경우, 조사나 접미사가 아닌 경우)
-    if token.startswith(searchword) and len(token) > len(searchword):
-        # 예: "지방법원판사", "지방법원장" 등 (검색어 뒤에 다른 단어가 붙어 하나의 단어를 이루는 경우)
+    # 예: "지방법원판사", "지방법원장" 등 (검색어 뒤에 다른 단어가 붙어 하나의 단어를 이루는 경우)
+    if DEBUG_LOG:
         print(f"덩어리 전체 처리: '{token}' (검색어: '{searchword}')") # 디버깅
-        return token, None, None # 토큰 전체를 덩어리로 반환
-    
-    # 기본 반환 - 위에 해당하지 않는 경우 토큰 전체를 덩어리로 간주
-    return token, None, None
+    return token, None, None # 토큰 전체를 덩어리로 반환
 
 def preprocess_search_term(search_term):
     """
@@ -290,1038 +1059,1774 @@ def preprocess_search_term(search_term):
         # 일반 단어로 처리하도록 False 반환
         return search_term, False
 
-def find_phrase_with_josa(text, phrase):
+# 구문 뒤에 올 수 있는 조사 후보 (가장 긴 것부터 매칭)
+PHRASE_JOSA_CANDIDATES = sorted(["을", "를", "과", "와", "이", "가", "은", "는",
+                                 "이나", "나", "으로", "로", "로서", "으로서", "로써", "으로써"], key=len, reverse=True)
+
+def phrase_josa_at(text, end_pos):
+    """텍스트의 end_pos 위치(구문 끝)부터 시작하는 조사를 찾아 반환하는 함수 (없으면 None)"""
+    # 조사가 있는지 확인 (구문 뒤 1-4글자 내에서)
+    potential_josa = text[end_pos:end_pos + 4]
+    for josa in PHRASE_JOSA_CANDIDATES:
+        if potential_josa.startswith(josa):
+            return josa
+    return None
+
+def batchim_class(word):
     """
-    공백 포함 문자열(구문)과 그 뒤에 올 수 있는 조사를 찾아 반환하는 함수.
-    개정문 생성 시 구문 단위 처리를 위해 사용됩니다.
+    단어의 마지막 글자 받침 종류를 반환하는 함수 (조사 규칙표 조회용).
+    0 = 받침 없음(한글이 아닌 경우 포함), 1 = ㄹ 외의 받침, 2 = ㄹ 받침
     """
-    # 검색 구문에서 앞뒤 공백 제거 (trim)
-    phrase = phrase.strip()
-    
-    matches = []
-    start_pos = 0
-    
-    while True:
-        # 구문 위치 찾기
-        pos = text.find(phrase, start_pos)
-        if pos == -1:
-            break # 더 이상 찾을 수 없으면 반복 종료
-        
-        # 구문 끝 위치
-        end_pos = pos + len(phrase)
-        
-        # 조사가 있는지 확인 (구문 뒤 1-4글자 내에서)
-        max_josa_len = min(4, len(text) - end_pos) # 최대 4글자까지 조사로 간주
-        potential_josa = text[end_pos:end_pos + max_josa_len]
-        
-        # 조사 후보 리스트 (자주 사용되는 조사를 길이에 따라 정렬하여 가장 긴 것부터 매칭)
-        josa_candidates = ["을", "를", "과", "와", "이", "가", "은", "는", 
-                           "이나", "나", "으로", "로", "로서", "으로서", "로써", "으로써"]
-        
-        found_josa = None
-        
-        # 가장 긴 조사부터 확인하여 매칭되는 조사 찾기
-        for josa in sorted(josa_candidates, key=len, reverse=True):
-            if potential_josa.startswith(josa):
-                found_josa = josa
-                break # 가장 긴 매칭을 찾으면 중단
-        
-        # 구문과 조사 정보 추가
-        matches.append((pos, phrase, found_josa))
-        
-        # 다음 검색 시작 위치 (현재 찾은 구문 다음 글자부터)
-        start_pos = pos + 1
-    
-    return matches
+    if not word:
+        return 0
+    code = ord(word[-1]) - 0xAC00
+    if not 0 <= code < 11172: # 한글 음절(가~힣)이 아님
+        return 0
+    jongseong = code % 28 # 종성 값 0은 받침 없음, 8은 'ㄹ' 받침
+    return 0 if jongseong == 0 else 2 if jongseong == 8 else 1
+
+# 조사별 개정문 형식 명세: (조사, A(원본) 받침 여부, B(바꿀 단어) 받침 종류, 형식)
+# A 받침 여부가 None이면 A와 무관한 규칙이고, B 받침 종류는 0/1/2 (batchim_class 참고)입니다.
+# 형식의 {A}, {B}는 원본/바꿀 단어, {J}는 입력된 조사, {C}는 따옴표를 뗀 조사,
+# {Q}는 조사 앞 따옴표(있는 경우), {T}는 "으로서/으로써"의 "서/써"입니다.
+_JOSA_RULE_SPEC = [
+    # 규칙 0: 조사가 없는 경우
+    (None, False, 0, '"{A}"를 "{B}"로 한다.'),  # 규칙 0-1-1
+    (None, False, 2, '"{A}"를 "{B}"로 한다.'),  # 규칙 0-1-2-1
+    (None, False, 1, '"{A}"를 "{B}"으로 한다.'),  # 규칙 0-1-2-2
+    (None, True, 0, '"{A}"을 "{B}"로 한다.'),  # 규칙 0-2-1
+    (None, True, 2, '"{A}"을 "{B}"로 한다.'),  # 규칙 0-2-2-1
+    (None, True, 1, '"{A}"을 "{B}"으로 한다.'),  # 규칙 0-2-2-2
+    # 규칙 1: A을 -> B을/를/으로/로
+    ("을", None, 2, '"{A}"을 "{B}"로 한다.'),
+    ("을", None, 1, '"{A}"을 "{B}"으로 한다.'),
+    ("을", None, 0, '"{A}을"을 "{B}를"로 한다.'),
+    # 규칙 2: A를 -> B을/를
+    ("를", None, 2, '"{A}를"을 "{B}을"로 한다.'),
+    ("를", None, 1, '"{A}를"을 "{B}을"로 한다.'),
+    ("를", None, 0, '"{A}"를 "{B}"로 한다.'),
+    # 규칙 3: A과 -> B과/와/으로/로
+    ("과", None, 2, '"{A}"을 "{B}"로 한다.'),
+    ("과", None, 1, '"{A}"을 "{B}"으로 한다.'),
+    ("과", None, 0, '"{A}과"를 "{B}와"로 한다.'),
+    # 규칙 4: A와 -> B과/와
+    ("와", None, 2, '"{A}와"를 "{B}과"로 한다.'),
+    ("와", None, 1, '"{A}와"를 "{B}과"로 한다.'),
+    ("와", None, 0, '"{A}"를 "{B}"로 한다.'),
+    # 규칙 5: A이 -> B이/가/으로/로
+    ("이", None, 2, '"{A}"을 "{B}"로 한다.'),
+    ("이", None, 1, '"{A}"을 "{B}"으로 한다.'),
+    ("이", None, 0, '"{A}이"를 "{B}가"로 한다.'),
+    # 규칙 6: A가 -> B이/가
+    ("가", None, 2, '"{A}가"를 "{B}이"로 한다.'),
+    ("가", None, 1, '"{A}가"를 "{B}이"로 한다.'),
+    ("가", None, 0, '"{A}"를 "{B}"로 한다.'),
+    # 규칙 7: A이나 -> B이나/나/으로/로
+    ("이나", None, 2, '"{A}"을 "{B}"로 한다.'),
+    ("이나", None, 1, '"{A}"을 "{B}"으로 한다.'),
+    ("이나", None, 0, '"{A}이나"를 "{B}나"로 한다.'),
+    # 규칙 8: A나 -> B이나/나
+    ("나", None, 2, '"{A}나"를 "{B}이나"로 한다.'),
+    ("나", None, 1, '"{A}나"를 "{B}이나"로 한다.'),
+    ("나", None, 0, '"{A}"를 "{B}"로 한다.'),
+    # 규칙 9: A으로 -> B으로/로
+    ("으로", None, 2, '"{A}으로"를 "{B}로"로 한다.'),
+    ("으로", None, 1, '"{A}"을 "{B}"으로 한다.'),
+    ("으로", None, 0, '"{A}으로"를 "{B}로"로 한다.'),
+    # 규칙 10: A로 -> B으로/로
+    ("로", True, 2, '"{A}"을 "{B}"로 한다.'),  # 규칙 10-1-1-1
+    ("로", True, 1, '"{A}로"를 "{B}으로"로 한다.'),  # 규칙 10-1-1-2
+    ("로", True, 0, '"{A}"을 "{B}"로 한다.'),  # 규칙 10-1-2
+    ("로", False, 2, '"{A}"를 "{B}"로 한다.'),  # 규칙 10-2-1-1
+    ("로", False, 1, '"{A}로"를 "{B}으로"로 한다.'),  # 규칙 10-2-1-2
+    ("로", False, 0, '"{A}"를 "{B}"로 한다.'),  # 규칙 10-2-2
+    # 규칙 11: A는 -> B은/는
+    ("는", None, 2, '"{A}는"을 "{B}은"으로 한다.'),
+    ("는", None, 1, '"{A}는"을 "{B}은"으로 한다.'),
+    ("는", None, 0, '"{A}"를 "{B}"로 한다.'),
+    # 규칙 12: A은 -> B은/는/으로/로
+    ("은", None, 2, '"{A}"을 "{B}"로 한다.'),
+    ("은", None, 1, '"{A}"을 "{B}"으로 한다.'),
+    ("은", None, 0, '"{A}은"을 "{B}는"으로 한다.'),
+    # 규칙 13: A란 -> B이란/란
+    ("란", None, 2, '"{A}{J}"을 "{B}이{Q}란"으로 한다.'),
+    ("란", None, 1, '"{A}{J}"을 "{B}이{Q}란"으로 한다.'),
+    ("란", None, 0, '"{A}"를 "{B}"로 한다.'),
+    # 규칙 14: A이란 -> B이란/란
+    ("이란", None, 2, '"{A}"을 "{B}"로 한다.'),
+    ("이란", None, 1, '"{A}"을 "{B}"으로 한다.'),
+    ("이란", None, 0, '"{A}{J}"을 "{B}{Q}라"로 한다.'),
+    # 규칙 17: A라 -> B이라/라
+    ("라", None, 2, '"{A}{J}"를 "{B}이{Q}라"로 한다.'),
+    ("라", None, 1, '"{A}{J}"를 "{B}이{Q}라"로 한다.'),
+    ("라", None, 0, '"{A}"를 "{B}"로 한다.'),
+    # 규칙 18: A이라 -> B이라/라
+    ("이라", None, 2, '"{A}"을 "{B}"로 한다.'),
+    ("이라", None, 1, '"{A}"을 "{B}"으로 한다.'),
+    ("이라", None, 0, '"{A}{J}"을 "{B}{Q}라"로 한다.'),
+]
+for _josa in ("로서", "로써"):
+    # 규칙 15: A로서/로써 -> B으로서/으로써/로서/로써
+    _JOSA_RULE_SPEC += [
+        (_josa, True, 2, '"{A}"을 "{B}"로 한다.'),  # 규칙 15-1-1-1
+        (_josa, True, 1, '"{A}{J}"를 "{B}으{C}"로 한다.'),  # 규칙 15-1-1-2
+        (_josa, True, 0, '"{A}"을 "{B}"로 한다.'),  # 규칙 15-1-2
+        (_josa, False, 2, '"{A}"를 "{B}"로 한다.'),  # 규칙 15-2-1-1
+        (_josa, False, 1, '"{A}{J}"를 "{B}으{C}"로 한다.'),  # 규칙 15-2-1-2
+        (_josa, False, 0, '"{A}"를 "{B}"로 한다.'),  # 규칙 15-2-2
+    ]
+for _josa in ("으로서", "으로써"):
+    # 규칙 16: A으로서/으로써 -> B으로서/으로써/로서/로써
+    _JOSA_RULE_SPEC += [
+        (_josa, None, 2, '"{A}{J}"를 "{B}로{T}"로 한다.'),
+        (_josa, None, 1, '"{A}"을 "{B}"으로 한다.'),
+        (_josa, None, 0, '"{A}{J}"를 "{B}로{T}"로 한다.'),
+    ]
+
+def _compile_josa_template(template, josa):
+    """
+    형식 문자열에 조사 관련 값을 미리 채우고, {A}/{B} 자리로 나눈 (앞, 가운데, 뒤) 문자열 조각을 반환하는 함수.
+    모든 형식은 {A} 하나 뒤에 {B} 하나가 오므로, 출력은 앞 + A + 가운데 + B + 뒤로 이어 붙이면 됩니다.
+    """
+    clean_josa = josa.lstrip('"') if josa else josa
+    filled = template.replace("{J}", josa or "").replace("{C}", clean_josa or "")
+    filled = filled.replace("{Q}", '"' if josa and josa.startswith('"') else "").replace("{T}", (clean_josa or "")[2:])
+    prefix, rest = filled.split("{A}")
+    middle, suffix = rest.split("{B}")
+    return prefix, middle, suffix
+
+def _compile_josa_rules(spec):
+    """
+    조사 규칙 명세를 (조사, A 받침 종류, B 받침 종류) → 형식 조각 (앞, 가운데, 뒤) 조회표로 펼치는 함수.
+    따옴표가 붙은 조사(예: "\"란")도 같은 규칙으로 미리 펼쳐 둡니다.
+    명세에 없는 조사는 기본 형식(A 받침 여부에 따라 을/를, B는 로)을 사용합니다.
+    """
+    table = {}
+    for josa, orig_has_batchim, replaced_class, template in spec:
+        for variant in ([None] if josa is None else [josa, '"' + josa]):
+            rule = _compile_josa_template(template, variant)
+            for orig_class in (0, 1, 2):
+                if orig_has_batchim is None or orig_has_batchim == (orig_class != 0):
+                    table[(variant, orig_class, replaced_class)] = rule
+    return table
+
+# 조사 규칙표 (형식 조각만 만들므로 import 시점에 바로 펼쳐 둡니다)
+JOSA_RULE_TABLE = _compile_josa_rules(_JOSA_RULE_SPEC)
+# 규칙표에 없는 조사의 기본 출력 형식 (A 받침 종류별)
+_DEFAULT_JOSA_RULES = {
+    0: _compile_josa_template('"{A}"를 "{B}"로 한다.', None),
+    1: _compile_josa_template('"{A}"을 "{B}"로 한다.', None),
+    2: _compile_josa_template('"{A}"을 "{B}"로 한다.', None),
+}
 
 def apply_josa_rule(orig, replaced, josa):
     """
     개정문 생성 시 한국어 조사 규칙에 따라 적절한 출력 형식을 반환하는 함수.
-    원본 단어(orig)와 대체될 단어(replaced)의 받침 유무, 조사(josa)에 따라 18가지 규칙을 적용합니다.
+    원본 단어(orig)와 대체될 단어(replaced)의 받침 종류, 조사(josa)로 미리 만든 규칙표(JOSA_RULE_TABLE)를 조회합니다.
     """
     # 동일한 단어면 변경할 필요 없음
     if orig == replaced:
         return f'"{orig}"를 "{replaced}"로 한다.'
-        
-    # 받침 여부 확인
-    orig_has_batchim = has_batchim(orig)
-    replaced_has_batchim = has_batchim(replaced)
-    replaced_has_rieul = has_rieul_batchim(replaced)
-    
-    # 조사가 없는 경우 (규칙 0)
-    if josa is None:
-        if not orig_has_batchim:  # 규칙 0-1: A(원본)가 받침 없는 경우
-            if not replaced_has_batchim or replaced_has_rieul:  # 규칙 0-1-1, 0-1-2-1
-                return f'"{orig}"를 "{replaced}"로 한다.'
-            else:  # 규칙 0-1-2-2: B(바꿀 단어)의 받침이 ㄹ이 아닌 경우
-                return f'"{orig}"를 "{replaced}"으로 한다.'
-        else:  # 규칙 0-2: A(원본)가 받침 있는 경우
-            if not replaced_has_batchim or replaced_has_rieul:  # 규칙 0-2-1, 0-2-2-1
-                return f'"{orig}"을 "{replaced}"로 한다.'
-            else:  # 규칙 0-2-2-2: B(바꿀 단어)의 받침이 ㄹ이 아닌 경우
-                return f'"{orig}"을 "{replaced}"으로 한다.'
-    
-    # 따옴표가 있는 경우 조사에서 따옴표 제거 (예: "\"란" -> "란")
-    clean_josa = josa
-    if josa and josa.startswith('"'):
-        clean_josa = josa[1:]
-    
-    # 조사별 규칙 처리
-    if clean_josa == "을":  # 규칙 1: A을 -> B을/를/으로/로
-        if replaced_has_batchim: # B에 받침이 있는 경우
-            if replaced_has_rieul:  # 규칙 1-1-1: B의 받침이 ㄹ인 경우
-                return f'"{orig}"을 "{replaced}"로 한다.'
-            else:  # 규칙 1-1-2: B의 받침이 ㄹ이 아닌 경우
-                return f'"{orig}"을 "{replaced}"으로 한다.'
-        else:  # 규칙 1-2: B에 받침이 없는 경우
-            return f'"{orig}을"을 "{replaced}를"로 한다.'
-    
-    elif clean_josa == "를":  # 규칙 2: A를 -> B을/를
-        if replaced_has_batchim:  # 규칙 2-1: B에 받침이 있는 경우
-            return f'"{orig}를"을 "{replaced}을"로 한다.'
-        else:  # 규칙 2-2: B에 받침이 없는 경우
-            return f'"{orig}"를 "{replaced}"로 한다.'
-    
-    elif clean_josa == "과":  # 규칙 3: A과 -> B과/와/으로/로
-        if replaced_has_batchim: # B에 받침이 있는 경우
-            if replaced_has_rieul:  # 규칙 3-1-1: B의 받침이 ㄹ인 경우
-                return f'"{orig}"을 "{replaced}"로 한다.'
-            else:  # 규칙 3-1-2: B의 받침이 ㄹ이 아닌 경우
-                return f'"{orig}"을 "{replaced}"으로 한다.'
-        else:  # 규칙 3-2: B에 받침이 없는 경우
-            return f'"{orig}과"를 "{replaced}와"로 한다.'
-    
-    elif clean_josa == "와":  # 규칙 4: A와 -> B과/와
-        if replaced_has_batchim:  # 규칙 4-1: B에 받침이 있는 경우
-            return f'"{orig}와"를 "{replaced}과"로 한다.'
-        else:  # 규칙 4-2: B에 받침이 없는 경우
-            return f'"{orig}"를 "{replaced}"로 한다.'
-    
-    elif clean_josa == "이":  # 규칙 5: A이 -> B이/가/으로/로
-        if replaced_has_batchim: # B에 받침이 있는 경우
-            if replaced_has_rieul:  # 규칙 5-1-1: B의 받침이 ㄹ인 경우
-                return f'"{orig}"을 "{replaced}"로 한다.'
-            else:  # 규칙 5-1-2: B의 받침이 ㄹ이 아닌 경우
-                return f'"{orig}"을 "{replaced}"으로 한다.'
-        else:  # 규칙 5-2: B에 받침이 없는 경우
-            return f'"{orig}이"를 "{replaced}가"로 한다.'
-    
-    elif clean_josa == "가":  # 규칙 6: A가 -> B이/가
-        if replaced_has_batchim:  # 규칙 6-1: B에 받침이 있는 경우
-            return f'"{orig}가"를 "{replaced}이"로 한다.'
-        else:  # 규칙 6-2: B에 받침이 없는 경우
-            return f'"{orig}"를 "{replaced}"로 한다.'
-    
-    elif clean_josa == "이나":  # 규칙 7: A이나 -> B이나/나/으로/로
-        if replaced_has_batchim: # B에 받침이 있는 경우
-            if replaced_has_rieul:  # 규칙 7-1-1: B의 받침이 ㄹ인 경우
-                return f'"{orig}"을 "{replaced}"로 한다.'
-            else:  # 규칙 7-1-2: B의 받침이 ㄹ이 아닌 경우
-                return f'"{orig}"을 "{replaced}"으로 한다.'
-        else:  # 규칙 7-2: B에 받침이 없는 경우
-            return f'"{orig}이나"를 "{replaced}나"로 한다.'
-    
-    elif clean_josa == "나":  # 규칙 8: 아나 -> B이나/나
-        if replaced_has_batchim:  # 규칙 8-1: B에 받침이 있는 경우
-            return f'"{orig}나"를 "{replaced}이나"로 한다.'
-        else:  # 규칙 8-2: B에 받침이 없는 경우
-            return f'"{orig}"를 "{replaced}"로 한다.'
-    
-    elif clean_josa == "으로":  # 규칙 9: A으로 -> B으로/로
-        if replaced_has_batchim: # B에 받침이 있는 경우
-            if replaced_has_rieul:  # 규칙 9-1-1: B의 받침이 ㄹ인 경우
-                return f'"{orig}으로"를 "{replaced}로"로 한다.'
-            else:  # 규칙 9-1-2: B의 받침이 ㄹ이 아닌 경우
-                return f'"{orig}"을 "{replaced}"으로 한다.'
-        else:  # 규칙 9-2: B에 받침이 없는 경우
-            return f'"{orig}으로"를 "{replaced}로"로 한다.'
-    
-    elif clean_josa == "로":  # 규칙 10: A로 -> B으로/로
-        if orig_has_batchim:  # 규칙 10-1: A(원본)에 받침이 있는 경우
-            if replaced_has_batchim: # B에 받침이 있는 경우
-                if replaced_has_rieul:  # 규칙 10-1-1-1: B의 받침이 ㄹ인 경우
-                    return f'"{orig}"을 "{replaced}"로 한다.'
-                else:  # 규칙 10-1-1-2: B의 받침이 ㄹ이 아닌 경우
-                    return f'"{orig}로"를 "{replaced}으로"로 한다.'
-            else:  # 규칙 10-1-2: B에 받침이 없는 경우
-                return f'"{orig}"을 "{replaced}"로 한다.'
-        else:  # 규칙 10-2: A(원본)에 받침이 없는 경우
-            if replaced_has_batchim: # B에 받침이 있는 경우
-                if replaced_has_rieul:  # 규칙 10-2-1-1: B의 받침이 ㄹ인 경우
-                    return f'"{orig}"를 "{replaced}"로 한다.'
-                else:  # 규칙 10-2-1-2: B의 받침이 ㄹ이 아닌 경우
-                    return f'"{orig}로"를 "{replaced}으로"로 한다.'
-            else:  # 규칙 10-2-2: B에 받침이 없는 경우
-                return f'"{orig}"를 "{replaced}"로 한다.'
-    
-    elif clean_josa == "는":  # 규칙 11: A는 -> B은/는
-        if replaced_has_batchim:  # 규칙 11-1: B에 받침이 있는 경우
-            return f'"{orig}는"을 "{replaced}은"으로 한다.'
-        else:  # 규칙 11-2: B에 받침이 없는 경우
-            return f'"{orig}"를 "{replaced}"로 한다.'
-    
-    elif clean_josa == "은":  # 규칙 12: A은 -> B은/는/으로/로
-        if replaced_has_batchim: # B에 받침이 있는 경우
-            if replaced_has_rieul:  # 규칙 12-1-1: B의 받침이 ㄹ인 경우
-                return f'"{orig}"을 "{replaced}"로 한다.'
-            else:  # 규칙 12-1-2: B의 받침이 ㄹ이 아닌 경우
-                return f'"{orig}"을 "{replaced}"으로 한다.'
-        else:  # 규칙 12-2: B에 받침이 없는 경우
-            return f'"{orig}은"을 "{replaced}는"으로 한다.'
-    
-    elif clean_josa == "란":  # 규칙 13: A란 -> B이란/란
-        if replaced_has_batchim:  # 규칙 13-1: B에 받침이 있는 경우
-            quote_prefix = '"' if josa and josa.startswith('"') else ""
-            return f'"{orig}{josa}"을 "{replaced}이{quote_prefix}란"으로 한다.'
-        else:  # 규칙 13-2: B에 받침이 없는 경우
-            return f'"{orig}"를 "{replaced}"로 한다.'
-    
-    elif clean_josa == "이란":  # 규칙 14: A이란 -> B이란/란
-        if replaced_has_batchim: # B에 받침이 있는 경우
-            if replaced_has_rieul:  # 규칙 14-1-1: B의 받침이 ㄹ인 경우
-                return f'"{orig}"을 "{replaced}"로 한다.'
-            else:  # 규칙 14-1-2: B의 받침이 ㄹ이 아닌 경우
-                return f'"{orig}"을 "{replaced}"으로 한다.'
-        else:  # 규칙 14-2: B에 받침이 없는 경우
-            quote_prefix = '"' if josa and josa.startswith('"') else ""
-            return f'"{orig}{josa}"을 "{replaced}{quote_prefix}라"로 한다.'
-    
-    elif clean_josa == "로서" or clean_josa == "로써":  # 규칙 15: A로서/로써 -> B으로서/으로써/로서/로써
-        if orig_has_batchim:  # 규칙 15-1: A에 받침이 있는 경우
-            if replaced_has_batchim: # B에 받침이 있는 경우
-                if replaced_has_rieul:  # 규칙 15-1-1-1: B의 받침이 ㄹ인 경우
-                    return f'"{orig}"을 "{replaced}"로 한다.'
-                else:  # 규칙 15-1-1-2: B의 받침이 ㄹ이 아닌 경우
-                    return f'"{orig}{josa}"를 "{replaced}으{clean_josa}"로 한다.'
-            else:  # 규칙 15-1-2: B에 받침이 없는 경우
-                return f'"{orig}"을 "{replaced}"로 한다.'
-        else:  # 규칙 15-2: A에 받침이 없는 경우
-            if replaced_has_batchim: # B에 받침이 있는 경우
-                if replaced_has_rieul:  # 규칙 15-2-1-1: B의 받침이 ㄹ인 경우
-                    return f'"{orig}"를 "{replaced}"로 한다.'
-                else:  # 규칙 15-2-1-2: B의 받침이 ㄹ이 아닌 경우
-                    return f'"{orig}{josa}"를 "{replaced}으{clean_josa}"로 한다.'
-            else:  # 규칙 15-2-2: B에 받침이 없는 경우
-                return f'"{orig}"를 "{replaced}"로 한다.'
-    
-    elif clean_josa == "으로서" or clean_josa == "으로써":  # 규칙 16: A으로서/으로써 -> B으로서/으로써/로서/로써
-        if replaced_has_batchim: # B에 받침이 있는 경우
-            if replaced_has_rieul:  # 규칙 16-1-1: B의 받침이 ㄹ인 경우
-                return f'"{orig}{josa}"를 "{replaced}로{clean_josa[2:]}"로 한다.'
-            else:  # 규칙 16-1-2: B의 받침이 ㄹ이 아닌 경우
-                return f'"{orig}"을 "{replaced}"으로 한다.'
-        else:  # 규칙 16-2: B에 받침이 없는 경우
-            return f'"{orig}{josa}"를 "{replaced}로{clean_josa[2:]}"로 한다.'
-    
-    elif clean_josa == "라":  # 규칙 17: A라 -> B이라/라
-        if replaced_has_batchim:  # 규칙 17-1: B에 받침이 있는 경우
-            quote_prefix = '"' if josa and josa.startswith('"') else ""
-            return f'"{orig}{josa}"를 "{replaced}이{quote_prefix}라"로 한다.'
-        else:  # 규칙 17-2: B에 받침이 없는 경우
-            return f'"{orig}"를 "{replaced}"로 한다.'
-    
-    elif clean_josa == "이라":  # 규칙 18: A이라 -> B이라/라
-        if replaced_has_batchim: # B에 받침이 있는 경우
-            if replaced_has_rieul:  # 규칙 18-1-1: B의 받침이 ㄹ인 경우
-                return f'"{orig}"을 "{replaced}"로 한다.'
-            else:  # 규칙 18-1-2: B의 받침이 ㄹ이 아닌 경우
-                return f'"{orig}"을 "{replaced}"으로 한다.'
-        else:  # 규칙 18-2: B에 받침이 없는 경우
-            quote_prefix = '"' if josa and josa.startswith('"') else ""
-            return f'"{orig}{josa}"을 "{replaced}{quote_prefix}라"로 한다.'
-    
-    # 기본 출력 형식 (위에 정의된 규칙에 해당하지 않는 경우)
-    if orig_has_batchim:
-        return f'"{orig}"을 "{replaced}"로 한다.'
-    else:
-        return f'"{orig}"를 "{replaced}"로 한다.'
+    
+    orig_class = batchim_class(orig)
+    rule = JOSA_RULE_TABLE.get((josa, orig_class, batchim_class(replaced)))
+    if rule is None:
+        rule = _DEFAULT_JOSA_RULES[orig_class] # 위에 정의된 규칙에 해당하지 않는 경우
+    prefix, middle, suffix = rule
+    return prefix + orig + middle + replaced + suffix
 
-def format_location(loc):
+class AmendmentLocation(namedtuple("AmendmentLocation", ["조문식별자", "항번호", "호번호", "호가지번호", "목번호", "부분"])):
     """
-    위치 정보 문자열의 형식을 수정하는 함수.
-    항번호가 비어있는 경우 '제항' 제거 및 호번호, 목번호 뒤의 '.' 제거 등을 처리합니다.
+    개정문에 인용할 위치 하나를 나타내는 튜플.
+    항번호는 항이 없으면 "", 호번호/목번호는 호/목 단위가 아니면 None이며 원문 표기(예: "1.", "가.")를 그대로 보관합니다.
+    부분은 "", "제목", "제목 및 본문", "각 목 외의 부분" 중 하나입니다.
+    str()로 바꾸면 위치 하나의 인용 문자열(예: "제3조제1항제2호")이 됩니다 (디버깅 출력용).
     """
-    # '제항'이라는 불필요한 문자열 제거 (예: '제1조제항' -> '제1조')
-    loc = re.sub(r'제(?=항)', '', loc)
-    
-    # 호번호와 목번호 뒤의 period(.) 제거 (예: '1.호' -> '1호')
-    loc = re.sub(r'(\d+)\.호', r'\1호', loc)
-    # '가.목' -> '가목'
-    loc = re.sub(r'([가-힣])\.목', r'\1목', loc)
+    __slots__ = ()
+    
+    def __str__(self):
+        location = self.조문식별자
+        if self.부분 in ("제목", "제목 및 본문"):
+            return f"{location} {self.부분}"
+        if self.항번호:
+            location += f"제{self.항번호}항"
+        if self.부분:
+            location += f" {self.부분}"
+        if self.호번호 is not None:
+            location += f"제{self.호번호}호의{self.호가지번호}" if self.호가지번호 else f"제{self.호번호}호"
+        if self.목번호 is not None:
+            location += f"{self.목번호}목"
+        return location
+
+# 조문식별자(예: "제10조의2")에서 조번호와 가지번호를 읽는 패턴
+ARTICLE_NUMBER_PATTERN = re.compile(r'제(\d+)조(?:의(\d+))?$')
+
+def _leading_digits(text):
+    """문자열 앞부분의 숫자 부분을 반환 (숫자로 시작하지 않으면 빈 문자열)"""
+    for position, ch in enumerate(text):
+        if not ch.isdecimal():
+            return text[:position]
+    return text
+
+def _location_citation(location):
+    """
+    위치 하나를 묶어 쓰기 위한 정보를 한 번에 계산하는 함수.
+    (정렬 키, 조 문자열, 항 문자열, 호목 문자열, 호목 정렬 키) 튜플을 반환하며,
+    호/목 번호가 없는 위치(조문 제목/본문, 항 본문)와 번호 형식을 해석할 수 없는 위치는 인용 대상이 아니므로 None을 반환합니다.
+    """
+    if location.호번호 is None:
+        return None
+    article_match = ARTICLE_NUMBER_PATTERN.match(location.조문식별자)
+    if not article_match:
+        return None
+    article_num = int(article_match.group(1))
+    article_sub = int(article_match.group(2)) if article_match.group(2) else 0
     
-    return loc
+    # 항번호 (없으면 0)
+    if location.항번호 and not location.항번호.isdecimal():
+        return None
+    clause_num = int(location.항번호) if location.항번호 else 0
+    clause_part = f"제{location.항번호}항" if location.항번호 else ""
+    
+    # 호번호 뒤의 '.' 제거 (예: '1.' -> '1')
+    호번호 = str(location.호번호)
+    if len(호번호) > 1 and 호번호.endswith(".") and 호번호[-2].isdecimal():
+        호번호 = 호번호[:-1]
+    if not 호번호.isdecimal():
+        return None
+    item_num = int(호번호)
+    item_part = f"제{호번호}호"
+    
+    # 가지번호 (예: 제14호의3)
+    if location.호가지번호:
+        item_part += f"의{location.호가지번호}"
+    
+    # 목번호 뒤의 '.' 제거 (예: '가.' -> '가'), 목번호는 가나다 순서로 '가'부터 1로 변환
+    subitem_num = 0
+    if location.목번호 is not None:
+        목번호 = str(location.목번호)
+        if len(목번호) > 1 and 목번호.endswith(".") and '가' <= 목번호[-2] <= '힣':
+            목번호 = 목번호[:-1]
+        item_part += 목번호
+        if '가' <= item_part[-1] <= '힣':
+            subitem_num = ord(item_part[-1]) - ord('가') + 1
+        item_part += "목"
+    
+    # '의' 뒤에 이어지는 숫자 전체를 가지번호로 봄
+    가지번호 = _leading_digits(item_part[len(f"제{호번호}호의"):]) if location.호가지번호 else ""
+    item_sub = int(가지번호) if 가지번호 else 0
+    
+    sort_key = (article_num, article_sub, clause_num, item_num, item_sub, subitem_num)
+    if 가지번호:
+        # 가지번호가 있는 호의 목은 호 단위(예: 제14호의3)로만 인용
+        item_goal = f"제{호번호}호의{가지번호}"
+        item_key = (article_num, article_sub, clause_num, item_num, item_sub, 0)
+    else:
+        item_goal = item_part.strip()
+        item_key = sort_key
+    return sort_key, article_match.group(0), clause_part, item_goal, item_key
 
-def group_locations(loc_list):
+def group_locations(locations):
     """
-    위치 정보 목록을 조 > 항 > 호 > 목 순서로 정렬하고 그룹화하여 가독성 있는 문자열로 반환.
-    - 조 또는 항이 바뀌면 콤마(,)로 연결
+    위치(AmendmentLocation) 목록을 조 > 항 > 호 > 목 순서로 정렬하고 그룹화하여 가독성 있는 문자열로 반환.
+    - 위치마다 정렬 키와 조/항/호목 문자열을 한 번만 계산하고, 정렬과 그룹화는 튜플 비교로 처리
     - 같은 조항 내 호목은 가운뎃점(ㆍ)으로 연결
-    - 마지막은 '및'으로 연결
+    - 조 안에서 항이 여러 개면 콤마(,)로 연결하고 마지막은 '및'으로 연결
     """
-    if not loc_list:
+    citations = []
+    for location in set(locations):
+        citation = _location_citation(location)
+        if citation is not None:
+            # 정렬 키가 같으면 위치 문자열 순서로 정렬
+            citations.append((citation[0], str(location), citation))
+    if not citations:
         return ""
+    citations.sort(key=lambda item: (item[0], item[1]))
     
-    # 각 위치 문자열에 형식 수정 적용
-    formatted_locs = [format_location(loc) for loc in loc_list]
+    # 조별 > 항별로 호목 문자열 모으기 (정렬된 순서이므로 조/항은 번호 순으로 등장)
+    article_groups = {} # 조 문자열 → {항 문자열: [(호목 정렬 키, 호목 문자열), ...]}
+    for _, _, (_, article, clause, item_goal, item_key) in citations:
+        article_groups.setdefault(article, {}).setdefault(clause, []).append((item_key, item_goal))
     
-    # 조항호목 파싱 함수 (모든 정렬 기준 추출)
-    def parse_location(loc):
-        # 조번호 (정수로 변환)
-        article_match = re.search(r'제(\d+)조(?:의(\d+))?', loc)
-        article_num = int(article_match.group(1)) if article_match else 0
-        article_sub = int(article_match.group(2)) if article_match and article_match.group(2) else 0
-        
-        # 항번호 (정수로 변환)
-        clause_match = re.search(r'제(\d+)항', loc)
-        clause_num = int(clause_match.group(1)) if clause_match else 0
-        
-        # 호번호 (정수로 변환)
-        item_match = re.search(r'제(\d+)호(?:의(\d+))?', loc)
-        item_num = int(item_match.group(1)) if item_match else 0
-        item_sub = int(item_match.group(2)) if item_match and item_match.group(2) else 0
-        
-        # 목번호 (가나다 순서, '가'부터 시작하여 숫자로 변환)
-        subitem_match = re.search(r'([가-힣])목', loc)
-        subitem_num = ord(subitem_match.group(1)) - ord('가') + 1 if subitem_match else 0
-        
-        # 제목 여부 (제목이 포함된 위치인지)
-        title_match = re.search(r'제목', loc)
-        is_title = 1 if title_match else 0
+    result_parts = []
+    for article, clause_groups in article_groups.items():
+        article_clause_parts = []
+        for clause, items in clause_groups.items():
+            # 호목 정렬 후 중복 제거하고 가운뎃점(ㆍ)으로 연결
+            unique_items = []
+            for _, item in sorted(items, key=lambda x: x[0]):
+                if item not in unique_items:
+                    unique_items.append(item)
+            article_clause_parts.append(f"{article}{clause}" + "ㆍ".join(unique_items))
         
-        # "각 목 외의 부분" 확인
-        outside_parts = 0
-        if "외의 부분" in loc: # "각 목 외의 부분" 또는 "외의 부분"
-            outside_parts = 1
-            
-        return (article_num, article_sub, clause_num, item_num, item_sub, outside_parts, subitem_num, is_title)
+        # 마지막 항목 앞에만 '및'을 사용하고 나머지는 쉼표로 연결
+        if len(article_clause_parts) == 1:
+            result_parts.append(article_clause_parts[0])
+        else:
+            result_parts.append(", ".join(article_clause_parts[:-1]) + f" 및 {article_clause_parts[-1]}")
     
-    # 위치 정보 정렬 (사전식으로 조, 항, 호, 목 순서로 정렬)
-    sorted_locs = sorted(formatted_locs, key=parse_location)
+    # 각 조별 문자열을 합쳐서 반환
+    return "".join(result_parts)
+        
+def _open_index_db(path):
+    """전문 색인 DB 파일을 열고 (없으면) 테이블을 만들어 연결을 반환하는 함수"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS indexed_law (mst TEXT PRIMARY KEY, name TEXT NOT NULL, seq INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS text_unit (id INTEGER PRIMARY KEY, mst TEXT NOT NULL, text TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS text_unit_mst ON text_unit (mst);
+        CREATE TABLE IF NOT EXISTS posting (
+            gram TEXT NOT NULL, unit_id INTEGER NOT NULL, PRIMARY KEY (gram, unit_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS gram_count (gram TEXT PRIMARY KEY, n INTEGER NOT NULL) WITHOUT ROWID;
+        """
+    )
+    return conn
+
+def _get_index_conn():
+    """전문 색인용 SQLite 연결을 (필요 시 생성하여) 반환하는 함수. _index_lock을 잡은 상태에서 호출합니다."""
+    global _index_conn
+    if _index_conn is None:
+        _index_conn = _open_index_db(INDEX_PATH)
+    return _index_conn
+
+def _text_bigrams(text):
+    """공백을 제거한 텍스트의 두 글자 단위(bigram) 집합을 반환하는 함수 (띄어쓰기와 무관한 한국어 색인용)"""
+    cleaned = clean(text)
+    return {cleaned[i:i + 2] for i in range(len(cleaned) - 1)}
+
+def _index_law(conn, law, seq, units):
+    """법률 하나의 텍스트 단위와 bigram 색인 목록을 색인 DB에 추가하고 bigram별 텍스트 단위 수를 늘리는 함수"""
+    conn.execute("INSERT OR REPLACE INTO indexed_law (mst, name, seq) VALUES (?, ?, ?)", (law["MST"], law["법령명"], seq))
+    gram_counts = Counter()
+    for unit in units:
+        if not unit.raw:
+            continue
+        unit_id = conn.execute("INSERT INTO text_unit (mst, text) VALUES (?, ?)", (law["MST"], unit.raw)).lastrowid
+        grams = _text_bigrams(unit.raw)
+        conn.executemany("INSERT OR IGNORE INTO posting (gram, unit_id) VALUES (?, ?)", ((gram, unit_id) for gram in grams))
+        gram_counts.update(grams)
+    conn.executemany(
+        "INSERT INTO gram_count (gram, n) VALUES (?, ?) ON CONFLICT (gram) DO UPDATE SET n = n + excluded.n",
+        gram_counts.items(),
+    )
+
+def _remove_indexed_law(conn, mst):
+    """색인에서 MST에 해당하는 법률의 텍스트 단위와 bigram 색인 목록을 삭제하고 bigram별 텍스트 단위 수를 줄이는 함수"""
+    gram_counts = Counter()
+    for unit_id, text in conn.execute("SELECT id, text FROM text_unit WHERE mst = ?", (mst,)).fetchall():
+        grams = _text_bigrams(text)
+        conn.executemany("DELETE FROM posting WHERE gram = ? AND unit_id = ?", ((gram, unit_id) for gram in grams))
+        gram_counts.update(grams)
+    conn.executemany("UPDATE gram_count SET n = n - ? WHERE gram = ?", ((n, gram) for gram, n in gram_counts.items()))
+    conn.executemany("DELETE FROM gram_count WHERE gram = ? AND n <= 0", ((gram,) for gram in gram_counts))
+    conn.execute("DELETE FROM text_unit WHERE mst = ?", (mst,))
+    conn.execute("DELETE FROM indexed_law WHERE mst = ?", (mst,))
+
+def _law_sync_key(law):
+    """동기화 시 법률을 식별하는 키 (개정되어도 바뀌지 않는 법령ID, 없으면 법령명)"""
+    return law.get("법령ID") or law["법령명"]
+
+def load_sync_manifest():
+    """색인 동기화 매니페스트를 읽어 반환하는 함수 (없거나 읽을 수 없으면 빈 매니페스트)"""
+    try:
+        with open(SYNC_MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"laws": {}}
+
+def _write_sync_manifest(manifest):
+    """색인 동기화 매니페스트를 임시 파일에 쓴 뒤 교체하여 중간에 중단되어도 깨지지 않도록 저장하는 함수"""
+    os.makedirs(os.path.dirname(SYNC_MANIFEST_PATH) or ".", exist_ok=True)
+    tmp_path = SYNC_MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, SYNC_MANIFEST_PATH)
+
+def _remember_current_msts(laws):
+    """방금 가져온 현행 법률 전체 목록의 MST 집합을 색인 검증용으로 기억하는 함수"""
+    global _current_msts
+    with _current_msts_lock:
+        _current_msts = (time.time(), frozenset(law["MST"] for law in laws))
+
+def build_law_index(max_workers=None):
+    """
+    현행 법률 전체의 본문을 내려받아 로컬 전문 색인을 새로 구축하는 함수.
+    내려받은 법령 XML은 디스크 캐시에도 저장되므로, 이후 색인 검색 결과를 표시할 때 네트워크 요청이 필요 없습니다.
+    색인된 법률 수를 반환하며, 색인 상태는 동기화 매니페스트에 기록합니다.
+    """
+    global _index_conn
+    laws = get_all_laws_from_api(max_workers)
+    if not laws:
+        print("색인할 법률 목록을 가져오지 못했습니다.")
+        return 0
+    _remember_current_msts(laws)
+    
+    indexed = {} # 동기화 키: 색인된 법률 정보
+    # 새 색인은 임시 DB 파일에 구축하고 마지막에 교체하므로, 구축하는 동안에도 기존 색인으로 검색할 수 있음
+    tmp_path = INDEX_PATH + ".building"
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(tmp_path)
+    conn = _open_index_db(tmp_path)
+    try:
+        for seq, (law, units, error) in enumerate(fetch_law_units(laws, max_workers)):
+            if error:
+                print(f"색인 제외: {law['법령명']} ({error})")
+                continue
+            _index_law(conn, law, seq, units)
+            conn.commit()
+            indexed[_law_sync_key(law)] = {"법령명": law["법령명"], "MST": law["MST"]}
+            print(f"색인 중: {seq+1}/{len(laws)} - {law['법령명']}")
+        conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES ('built_at', ?)", (str(time.time()),))
+        conn.commit()
+    except BaseException:
+        conn.close()
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    conn.close()
+    
+    with _index_lock:
+        # 기존 연결을 닫고 구축한 DB 파일로 교체 (다음 조회 때 새 파일로 다시 연결)
+        if _index_conn is not None:
+            _index_conn.close()
+            _index_conn = None
+        os.replace(tmp_path, INDEX_PATH)
+    
+    _write_sync_manifest({
+        "synced_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "mode": "build",
+        "summary": {"indexed": len(indexed), "failed": len(laws) - len(indexed)},
+        "laws": indexed,
+    })
+    return len(indexed)
+
+def sync_law_index(max_workers=None):
+    """
+    로컬 전문 색인을 현행 법률과 동기화하는 함수.
+    현행 법률 목록의 MST를 매니페스트에 기록된 MST와 비교하여, 새로 생기거나 MST가 바뀐(개정된) 법률만
+    본문을 내려받아 색인을 갱신하고, 폐지되어 목록에서 빠진 법률은 색인에서 삭제합니다.
+    본문을 가져오지 못한 법률은 기존 색인과 매니페스트 항목을 유지하여 다음 동기화 때 다시 시도합니다.
+    {"added", "updated", "removed", "unchanged", "failed"} 건수 요약을 반환하며, 목록 조회에 실패하면 None을 반환합니다.
+    """
+    laws = get_all_laws_from_api(max_workers)
+    if not laws:
+        print("동기화할 법률 목록을 가져오지 못했습니다.")
+        return None
+    _remember_current_msts(laws)
+    
+    manifest = load_sync_manifest()
+    stored = manifest.get("laws", {})
+    current = {_law_sync_key(law): law for law in laws}
+    seq_by_key = {_law_sync_key(law): seq for seq, law in enumerate(laws)}
+    changed = [law for key, law in current.items() if stored.get(key, {}).get("MST") != law["MST"]]
+    removed_keys = [key for key in stored if key not in current]
+    summary = {"added": 0, "updated": 0, "removed": len(removed_keys),
+               "unchanged": len(current) - len(changed), "failed": 0}
+    print(f"동기화 대상: 변경 {len(changed)}개, 삭제 {len(removed_keys)}개, 유지 {summary['unchanged']}개")
+    
+    with _index_lock:
+        conn = _get_index_conn()
+        for key in removed_keys:
+            _remove_indexed_law(conn, stored.pop(key)["MST"])
+        conn.commit()
+    
+    # 변경된 법률의 본문만 동시에 가져와 법률 단위로 색인 교체
+    for law, units, error in fetch_law_units(changed, max_workers):
+        key = _law_sync_key(law)
+        if error:
+            print(f"동기화 실패: {law['법령명']} ({error})")
+            summary["failed"] += 1
+            continue
+        with _index_lock:
+            conn = _get_index_conn()
+            if key in stored:
+                _remove_indexed_law(conn, stored[key]["MST"])
+                summary["updated"] += 1
+            else:
+                summary["added"] += 1
+            _index_law(conn, law, seq_by_key[key], units)
+            conn.commit()
+        stored[key] = {"법령명": law["법령명"], "MST": law["MST"]}
+        print(f"동기화: {law['법령명']} (MST: {law['MST']})")
+    
+    with _index_lock:
+        conn = _get_index_conn()
+        # 변경되지 않은 법률도 현행 목록 순서와 법령명을 반영
+        conn.executemany(
+            "UPDATE indexed_law SET seq = ?, name = ? WHERE mst = ?",
+            ((seq_by_key[key], current[key]["법령명"], entry["MST"]) for key, entry in stored.items() if key in current),
+        )
+        conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES ('built_at', ?)", (str(time.time()),))
+        conn.commit()
+    
+    _write_sync_manifest({
+        "synced_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "mode": "sync",
+        "summary": summary,
+        "laws": stored,
+    })
+    return summary
+
+def _index_built_at(conn):
+    """색인을 마지막으로 구축하거나 동기화한 시각 (구축된 적이 없으면 None)"""
+    row = conn.execute("SELECT value FROM index_meta WHERE key = 'built_at'").fetchone()
+    return float(row[0]) if row is not None else None
+
+def _get_current_law_msts(max_workers=None):
+    """
+    현행 법률 전체의 MST 집합을 반환하는 함수 (색인 검증용).
+    한 번 가져온 목록은 INDEX_VERIFY_INTERVAL 동안 재사용하며, 목록을 온전히 가져오지 못하면 None을 반환합니다.
+    """
+    with _current_msts_lock:
+        if _current_msts is None or time.time() - _current_msts[0] > INDEX_VERIFY_INTERVAL:
+            laws = get_all_laws_from_api(max_workers)
+            if laws is None:
+                return None
+            _remember_current_msts(laws)
+        return _current_msts[1]
+
+def search_law_index(processed_query, max_workers=None, metrics=None):
+    """
+    로컬 전문 색인에서 검색어(공백 무시)가 포함된 법률을 찾는 함수.
+    색인은 본문을 가져올 후보 법률을 거르는 데만 쓰므로, 법률 검색 API와 같은 [{"법령명": ..., "MST": ...}, ...] 형식의 목록을 반환합니다.
+    색인이 없거나 INDEX_MAX_AGE보다 오래되었거나 색인된 법률이 현행 법률 목록과 다르거나,
+    검색어가 두 글자 미만이어서 색인으로 답할 수 없으면 None을 반환합니다.
+    색인으로 답하면 metrics(RunMetrics)의 index_searches를 늘리고 보고서에 색인 갱신 시각(index_built_at)을 남깁니다.
+    """
+    grams = _text_bigrams(processed_query)
+    if not grams or not os.path.exists(INDEX_PATH):
+        return None
+    try:
+        with _index_lock:
+            conn = _get_index_conn()
+            built_at = _index_built_at(conn)
+            if built_at is None or time.time() - built_at > INDEX_MAX_AGE:
+                return None
+            indexed_msts = {mst for mst, in conn.execute("SELECT mst FROM indexed_law")}
+            # 색인할 때 미리 세어 둔 bigram별 텍스트 단위 수로 가장 드문 bigram을 골라 그 색인 목록만 읽고,
+            # 나머지 조건은 텍스트를 직접 확인하여 거름 (색인에 없는 bigram이 있으면 찾을 법률도 없음)
+            gram_counts = dict(conn.execute(
+                f"SELECT gram, n FROM gram_count WHERE gram IN ({', '.join('?' * len(grams))})", tuple(grams)
+            ).fetchall())
+            rows = []
+            if len(gram_counts) == len(grams):
+                rows = conn.execute(
+                    "SELECT l.name, u.mst, u.text FROM posting p "
+                    "JOIN text_unit u ON u.id = p.unit_id JOIN indexed_law l ON l.mst = u.mst "
+                    "WHERE p.gram = ? ORDER BY l.seq, u.id",
+                    (min(gram_counts, key=gram_counts.get),),
+                ).fetchall()
+    except (sqlite3.Error, ValueError) as e:
+        print(f"색인 검색 오류: {e}")
+        return None
     
-    # 조항별 그룹화 준비 (defaultdict 사용)
-    article_groups = defaultdict(list) # 조문 식별자 (예: 제1조)를 키로 사용
+    # 색인 이후 개정(MST 변경)되거나 새로 생기거나 폐지된 법률이 있으면 색인 결과를 쓰지 않음
+    current_msts = _get_current_law_msts(max_workers)
+    if current_msts is None:
+        print("현행 법률 목록을 가져오지 못해 로컬 색인을 확인할 수 없습니다. 법제처 API로 검색합니다.")
+        return None
+    if current_msts != indexed_msts:
+        print("로컬 색인이 현행 법률 목록과 다릅니다. 법제처 API로 검색합니다. (law_indexer.py sync로 색인을 동기화하세요)")
+        if metrics is not None:
+            metrics.count("index_mismatches")
+        return None
     
-    # 1. 먼저 조별로 항목 분류 및 세부 정보 파싱
-    for loc in sorted_locs:
-        # 조문 식별자 (예: 제1조, 제10조의2) 추출
-        article_match = re.match(r'(제\d+조(?:의\d+)?)', loc)
-        if not article_match:
-            continue # 조문 정보가 없으면 건너뜀
-            
-        article_num = article_match.group(1)
-        rest_part = loc[len(article_num):] # 조문 식별자를 제외한 나머지 부분
+    built_at_text = time.strftime("%Y-%m-%d %H:%M", time.localtime(built_at))
+    print(f"로컬 색인에서 후보 법률을 찾습니다. (색인 갱신 시각: {built_at_text})")
+    if metrics is not None:
+        metrics.count("index_searches")
+        metrics.extra["index_built_at"] = built_at_text
+    cleaned_query = clean(processed_query)
+    results = {} # MST: 법률별 결과 (색인 순서 유지)
+    for name, mst, text in rows:
+        if mst not in results and cleaned_query in clean(text):
+            results[mst] = {"법령명": name, "MST": mst}
+    return list(results.values())
+
+def normalize_exclude_laws(exclude_laws):
+    """배제할 법률 목록의 공백을 정규화하는 함수 (연속된 공백을 하나로, 앞뒤 공백 제거, 빈 항목 제외)"""
+    return [' '.join(law.split()) for law in (exclude_laws or []) if law.strip()]
+
+def is_excluded_law(law_name, normalized_exclude_laws):
+    """
+    법률명이 배제할 법률 목록에 해당하는지 확인하는 함수.
+    정확히 일치하거나, 공백을 모두 제거하고 일치하거나, 부분 문자열인 경우 배제합니다.
+    """
+    # 공백을 정규화한 법률명 생성 (배제 법률 비교를 위해)
+    normalized_law_name = ' '.join(law_name.split())
+    
+    # 배제할 법률 목록에 있는지 확인 - 다양한 방식으로 비교
+    for exclude_law in normalized_exclude_laws:
+        # 1. 정확히 일치하는 경우
+        if exclude_law == normalized_law_name:
+            return True
+        # 2. 공백을 모두 제거하고 비교
+        if exclude_law.replace(" ", "") == normalized_law_name.replace(" ", ""):
+            return True
+        # 3. 부분 문자열 비교 (기존 로직)
+        if exclude_law in normalized_law_name:
+            return True
+    return False
+
+class MultiPatternMatcher:
+    """
+    여러 찾을 문자열을 텍스트 한 번 순회로 모두 찾는 Aho–Corasick 자동자.
+    finditer는 (시작 위치, 끝 위치, 패턴 번호) 튜플을 끝 위치 순서대로 반환하며, 겹치는 출현도 모두 반환합니다.
+    """
+    __slots__ = ("patterns", "_goto", "_fail", "_output")
+    
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        goto = [{}] # 상태별 다음 글자 → 다음 상태
+        output = [[]] # 상태별로 끝나는 패턴 번호
+        for idx, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    output.append([])
+                state = nxt
+            output[state].append(idx)
         
-        # 가지번호 확인 (예: 제14호의3) - 호번호 뒤에 '의N'이 붙는 경우
-        # 이 정규식은 "제N호의M" 패턴을 정확히 찾기 위함
-        appendix_match = re.search(r'(제\d+호)의(\d+)', rest_part)
-        if appendix_match:
-            # 정확한 호의 가지번호 표시 (예: 제14호의3)
-            # rest_part = rest_part.replace(appendix_match.group(0), f"{appendix_match.group(1)}의{appendix_match.group(2)}")
-            # 호의 가지번호는 원본 문자열을 그대로 사용하여 일관성 유지
-            pass
+        # 너비 우선으로 실패 링크 계산 (실패 상태의 출력도 함께 합침)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                output[nxt] = output[nxt] + output[fail[nxt]]
         
-        # 항번호 확인
-        clause_part = ""
-        clause_match = re.search(r'(제\d+항)', rest_part)
-        if clause_match:
-            clause_part = clause_match.group(1)
-            # 항번호를 제외한 나머지 부분 업데이트
-            rest_part = rest_part[rest_part.find(clause_part) + len(clause_part):]
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+    
+    def finditer(self, text):
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for idx in output[state]:
+                yield i + 1 - len(patterns[idx]), i + 1, idx
+
+class AmendmentMemo:
+    """
+    개정문 생성 1회 실행 동안 extract_chunk_and_josa와 apply_josa_rule 결과를 기억하는 크기 제한 메모.
+    같은 (토큰, 찾을 문자열)과 (원본, 대체, 조사) 조합이 법률 사이에서 반복될 때 다시 계산하지 않습니다.
+    종류별로 max_size개까지 보관하고 넘치면 가장 오래 쓰이지 않은 항목부터 버리며, 적중률은 stats()로 확인합니다.
+    """
+    __slots__ = ("max_size", "_chunks", "_rules", "counters")
+    
+    def __init__(self, max_size=None):
+        self.max_size = AMENDMENT_MEMO_SIZE if max_size is None else max_size
+        self._chunks = OrderedDict() # (토큰, 찾을 문자열) → (덩어리, 조사, 접미사)
+        self._rules = OrderedDict() # (원본, 대체, 조사) → 규칙 문장
+        self.counters = {"chunk": [0, 0], "rule": [0, 0]} # 종류별 [적중, 실패]
+    
+    def _lookup(self, kind, store, key, compute):
+        counter = self.counters[kind]
+        if key in store:
+            counter[0] += 1
+            store.move_to_end(key)
+            return store[key]
+        counter[1] += 1
+        value = compute(*key)
+        if self.max_size > 0:
+            store[key] = value
+            if len(store) > self.max_size:
+                store.popitem(last=False)
+        return value
+    
+    def extract_chunk_and_josa(self, token, searchword):
+        return self._lookup("chunk", self._chunks, (token, searchword), extract_chunk_and_josa)
+    
+    def apply_josa_rule(self, orig, replaced, josa):
+        return self._lookup("rule", self._rules, (orig, replaced, josa), apply_josa_rule)
+    
+    def stats(self):
+        """종류별 적중/실패 횟수, 적중률, 현재 보관 항목 수를 사전으로 반환"""
+        result = {}
+        for kind, store in (("chunk", self._chunks), ("rule", self._rules)):
+            hits, misses = self.counters[kind]
+            total = hits + misses
+            result[kind] = {"hits": hits, "misses": misses,
+                            "hit_rate": hits / total if total else 0.0, "size": len(store)}
+        return result
+
+class MatchRecord(namedtuple("MatchRecord", ["law", "unit", "조", "항", "호", "목", "term", "span", "token",
+                                               "chunk", "josa", "suffix", "matched"], defaults=(None,))):
+    """
+    법률 텍스트에서 찾은 검색어 출현 하나를 나타내는 튜플 (검색 결과 표시와 개정문 생성이 함께 사용).
+    law는 법률명, unit은 텍스트 단위 목록 내 위치, 조/항/호/목은 그 단위의 조문식별자/항번호/호번호/목번호
+    (해당 없으면 ""/None), term은 검색어 번호입니다.
+    span은 원문에서의 (시작, 끝) 위치이며, 공백을 무시해야만 찾을 수 있는 출현이면 None입니다.
+    token은 덩어리 위치(구문이면 span과 같고, 낱말이면 검색어를 포함한 토큰 위치)이고,
+    chunk/josa/suffix는 덩어리와 뒤따르는 조사/접미사입니다 (추출하지 않았거나 토큰이 없으면 None).
+    matched는 검색어와 띄어쓰기가 다른 출현의 원문 표기이며, 검색어 그대로 찾은 출현이면 None입니다.
+    """
+    __slots__ = ()
+
+class LawMatcher:
+    """
+    여러 검색어((검색어, 구문 여부) 목록)의 출현을 법률 텍스트 단위에서 한 번에 찾아 MatchRecord 목록으로 만드는 매처.
+    검색과 개정문 생성이 같은 매처를 사용하며, 텍스트 단위마다 원문을 다중 패턴 자동자로 한 번만 훑습니다.
+    spacing_insensitive가 참이면 낱말 검색어는 조문 제목 외의 단위에서 공백을 제거한 텍스트로도 찾습니다 (검색용).
+    spacing_variants가 참이면 구문을 포함한 모든 검색어를 공백을 제거한 텍스트에서도 찾아, 띄어쓰기만 다른 출현을
+    원문 위치와 원문 표기의 덩어리로 기록합니다 (개정문 생성용, 원문 위치는 텍스트 단위의 offsets로 되돌림).
+    """
+    __slots__ = ("terms", "spacing_insensitive", "spacing_variants", "memo", "_raw_matcher", "_cleaned_matcher",
+                 "_cleaned_terms", "_variant_matcher", "_variant_terms")
+    
+    def __init__(self, terms, spacing_insensitive=False, memo=None, spacing_variants=False):
+        self.terms = list(terms)
+        self.spacing_insensitive = spacing_insensitive
+        self.spacing_variants = spacing_variants
+        self.memo = memo if memo is not None else AmendmentMemo()
+        self._raw_matcher = MultiPatternMatcher(text for text, _ in self.terms)
+        # 공백을 무시하고 찾을 낱말 검색어 (자동자 패턴 번호 → 검색어 번호)
+        self._cleaned_terms = [idx for idx, (text, is_phrase) in enumerate(self.terms) if not is_phrase and clean(text)]
+        self._cleaned_matcher = MultiPatternMatcher(clean(self.terms[idx][0]) for idx in self._cleaned_terms)
+        # 띄어쓰기만 다른 출현을 찾을 검색어 (구문 포함)
+        self._variant_terms = [idx for idx, (text, _) in enumerate(self.terms) if clean(text)] if spacing_variants else []
+        self._variant_matcher = MultiPatternMatcher(clean(self.terms[idx][0]) for idx in self._variant_terms)
+    
+    def match_law(self, law_name, units, include_부칙=True, extract_chunks=True):
+        """
+        법률 하나의 텍스트 단위 목록에서 모든 검색어의 출현을 문서 순서대로 MatchRecord 목록으로 반환합니다.
+        겹치는 출현도 모두 반환하며, 덩어리 분석(extract_chunks)은 필요 없으면 생략할 수 있습니다.
+        """
+        records = []
+        for i, unit in enumerate(units):
+            if unit.부칙 and not include_부칙:
+                continue
+            records.extend(self.match_unit(law_name, i, unit, extract_chunks))
+        return records
+    
+    def match_unit(self, law_name, i, unit, extract_chunks=True):
+        """텍스트 단위 하나에서 모든 검색어의 출현을 MatchRecord 목록으로 반환합니다."""
+        raw = unit.raw
+        records = []
+        location = (law_name, i, unit.조문식별자, unit.항번호,
+                    unit.호번호 if unit.kind in ("호", "목") else None, unit.목번호 if unit.kind == "목" else None)
+        token_starts = tokens = None
+        for start, end, idx in sorted(self._raw_matcher.finditer(raw)) if raw else ():
+            text, is_phrase = self.terms[idx]
+            if is_phrase:
+                # 구문은 구문 자체가 덩어리이고, 바로 뒤의 조사를 함께 추출
+                josa = phrase_josa_at(raw, end) if extract_chunks else None
+                records.append(MatchRecord(*location, idx, (start, end), (start, end),
+                                           text if extract_chunks else None, josa, None))
+                continue
+            # 낱말은 검색어를 포함하는 토큰(낫표 포함)이 덩어리
+            if tokens is None:
+                tokens = [token.span() for token in TOKEN_PATTERN.finditer(raw)]
+                token_starts = [token_start for token_start, _ in tokens]
+            position = bisect_right(token_starts, start) - 1
+            token = tokens[position] if position >= 0 and end <= tokens[position][1] else None
+            chunk = josa = suffix = None
+            if token is not None and extract_chunks:
+                chunk, josa, suffix = self.memo.extract_chunk_and_josa(raw[token[0]:token[1]], text)
+            records.append(MatchRecord(*location, idx, (start, end), token, chunk, josa, suffix))
         
-        # 제목 확인 (법령 제목 또는 조문 제목)
-        title_part = ""
-        if " 제목" in loc: # ' 제목' 또는 ' 제목 및 본문'
-            if " 제목 및 본문" in loc:
-                title_part = " 제목 및 본문"
-            else:
-                title_part = " 제목"
-            
-            # 제목 부분 제거 (나머지 파싱에 영향을 주지 않도록)
-            rest_part = rest_part.replace(title_part, "")
-            
-        # "각 목 외의 부분" 확인
-        outside_part = ""
-        if " 각 목 외의 부분" in loc or " 외의 부분" in loc:
-            outside_part = " 각 목 외의 부분"
-            rest_part = rest_part.replace(" 각 목 외의 부분", "").replace(" 외의 부분", "")
+        if self._variant_terms and raw:
+            records.extend(self._match_spacing_variants(raw, unit, location, records, extract_chunks))
         
-        # 호목 정보 추출 부분
-        item_goal_part = ""
-        # '제'로 시작하고 '호' 또는 '목'이 포함된 경우 호목 정보로 간주
-        if "제" in rest_part and ("호" in rest_part or "목" in rest_part):
-            # 가지번호가 있는 경우를 정확히 처리 (예: 제14호의3)
-            appendix_match = re.search(r'(제\d+호)의(\d+)', rest_part)
-            if appendix_match:
-                item_goal_part = appendix_match.group(0) # 전체 패턴 사용
-            else:
-                # 일반적인 호 또는 목 번호 패턴 찾기
-                item_match = re.match(r'제\d+호|[가-힣]목', rest_part.strip())
-                if item_match:
-                    item_goal_part = rest_part.strip() # 공백 제거 후 호목 부분 저장
+        if self.spacing_insensitive and self._cleaned_terms and unit.kind != "제목":
+            # 원문에서는 못 찾았지만 공백을 제거하면 찾을 수 있는 낱말 검색어
+            found = {record.term for record in records}
+            for idx in sorted({self._cleaned_terms[k] for _, _, k in self._cleaned_matcher.finditer(unit.stripped)} - found):
+                records.append(MatchRecord(*location, idx, None, None, None, None, None))
+        return records
+    
+    def _match_spacing_variants(self, raw, unit, location, records, extract_chunks):
+        """
+        공백을 제거한 텍스트에서 검색어를 찾아, 원문에서 그대로 찾은 출현(records)이 아닌 것을 MatchRecord 목록으로 반환합니다.
+        찾은 구간은 텍스트 단위의 offsets로 원문 위치로 되돌리고, 덩어리는 원문 표기(matched)를 기준으로 추출합니다.
+        구문은 원문 표기 자체와 뒤따르는 조사를, 낱말은 원문 표기가 걸친 토큰들을 합친 구간을 덩어리로 사용합니다.
+        """
+        variants = []
+        found = {(record.span, record.term) for record in records}
+        token_starts = tokens = None
+        for start, end, k in sorted(self._variant_matcher.finditer(unit.stripped)):
+            idx = self._variant_terms[k]
+            offsets = unit.offsets
+            span = (offsets[start], offsets[end - 1] + 1)
+            if (span, idx) in found:
+                continue # 원문에서 그대로 찾은 출현
+            found.add((span, idx))
+            matched = raw[span[0]:span[1]]
+            if self.terms[idx][1]:
+                josa = phrase_josa_at(raw, span[1]) if extract_chunks else None
+                variants.append(MatchRecord(*location, idx, span, span, matched if extract_chunks else None,
+                                            josa, None, matched))
+                continue
+            if tokens is None:
+                tokens = [token.span() for token in TOKEN_PATTERN.finditer(raw)]
+                token_starts = [token_start for token_start, _ in tokens]
+            first = bisect_right(token_starts, span[0]) - 1
+            last = bisect_right(token_starts, span[1] - 1) - 1
+            token = None
+            if first >= 0 and span[0] < tokens[first][1] and span[1] <= tokens[last][1]:
+                token = (tokens[first][0], tokens[last][1])
+            chunk = josa = suffix = None
+            if token is not None and extract_chunks:
+                chunk, josa, suffix = self.memo.extract_chunk_and_josa(raw[token[0]:token[1]], matched)
+            variants.append(MatchRecord(*location, idx, span, token, chunk, josa, suffix, matched))
+        return variants
+
+def prepare_amendment_pairs(pairs):
+    """
+    (찾을 문자열, 바꿀 문자열) 쌍 목록을 전처리하여 (찾을 문자열, 바꿀 문자열, 구문 여부) 목록으로 반환하는 함수.
+    찾을 문자열이 비어 있는 쌍은 건너뛰고, 같은 찾을 문자열이 여러 번 나오면 첫 번째 쌍만 사용합니다.
+    """
+    prepared = []
+    seen = set()
+    for find_word, replace_word in pairs:
+        # 중간점과 중괄호를 가운뎃점/낫표로 정규화
+        normalized_find_word = normalize_special_chars(find_word)  # 사용자 입력에 대한 정규화
+        normalized_replace_word = normalize_special_chars(replace_word)  # 사용자 입력에 대한 정규화
         
-        # 조번호 기준으로 그룹화
-        # defaultdict 덕분에 키가 없으면 자동으로 리스트 생성
-        article_groups[article_num].append((clause_part, title_part, outside_part, item_goal_part))
-    
-    # 결과 구성
-    result_parts = []
-    
-    # 조별로 처리 (조번호 순으로 정렬)
-    for article_num, items in sorted(article_groups.items(), key=lambda x: extract_article_num(x[0])):
-        # 항별로 그룹화 시도
-        clause_groups = defaultdict(list) # (항번호, 제목여부, 각목외의부분여부)를 키로 사용
+        # 검색어 전처리 (큰따옴표 유무에 따른 구문/단어 구분)
+        processed_find_word, is_phrase = preprocess_search_term(normalized_find_word)
+        processed_replace_word, _ = preprocess_search_term(normalized_replace_word) # 바꿀 문자열은 구문 여부 필요 없음
         
-        for clause, title, outside, item_goal in items:
-            key = (clause, title, outside) # 항, 제목, 각목외의부분 정보를 묶어 키로 사용
-            if item_goal:
-                clause_groups[key].append(item_goal) # 호목 정보만 추가
+        # 명시적으로 공백 제거 확인 (trim)
+        processed_find_word = processed_find_word.strip()
+        processed_replace_word = processed_replace_word.strip()
         
-        # 같은 항(및 제목/각목외의부분)끼리 처리
-        article_clause_parts = []
+        if not processed_find_word:
+            print(f"찾을 문자열이 비어 있어 건너뜁니다: ({find_word!r}, {replace_word!r})")
+            continue
+        if processed_find_word in seen:
+            print(f"찾을 문자열 '{processed_find_word}'이(가) 중복되어 첫 번째 쌍만 적용합니다.")
+            continue
+        seen.add(processed_find_word)
+        prepared.append((processed_find_word, processed_replace_word, is_phrase))
+    return prepared
+
+def _amendment_location(units, i, processed_find_word, spacing_insensitive=False):
+    """
+    i번째 텍스트 단위의 개정문 위치(AmendmentLocation)를 만드는 함수.
+    하나의 조문에서 제목과 본문 모두에 찾을 문자열이 있으면 '제목 및 본문'으로 표시합니다.
+    spacing_insensitive가 참이면 띄어쓰기만 다른 출현도 찾은 것으로 봅니다.
+    """
+    def contains(other):
+        if spacing_insensitive:
+            return clean(processed_find_word) in other.stripped
+        return processed_find_word in other.raw
+    
+    unit = units[i]
+    if unit.kind == "제목":
+        본문에_검색어_있음 = contains(units[i + 1])
+        return AmendmentLocation(unit.조문식별자, "", None, None, None, "제목 및 본문" if 본문에_검색어_있음 else "제목")
+    if unit.kind == "조문":
+        제목에_검색어_있음 = contains(units[i - 1])
+        return AmendmentLocation(unit.조문식별자, "", None, None, None, "제목 및 본문" if 제목에_검색어_있음 else "")
+    if unit.kind == "항":
+        return AmendmentLocation(unit.조문식별자, unit.항번호, None, None, None,
+                                 "각 목 외의 부분" if unit.각목외의부분 else "")
+    
+    # 호/목 단위 (호번호가 비어 있어도 호 위치로 구분)
+    return AmendmentLocation(unit.조문식별자, unit.항번호, str(unit.호번호), unit.호가지번호 or None,
+                             str(unit.목번호) if unit.kind == "목" else None, "")
+
+def _collect_amendment_chunks(records, pairs, locations, chunk_map):
+    """
+    텍스트 단위 하나의 MatchRecord 목록에서 덩어리(chunk)와 조사/접미사를 모아 chunk_map에 위치를 기록하는 함수.
+    locations는 쌍 번호별 위치입니다. 구문 쌍이면 구문(원문 표기)과 뒤따르는 조사를, 단어 쌍이면 찾을 문자열을 포함하는
+    토큰 단위 덩어리를 사용하며, 한 토큰에 여러 단어 쌍이 걸리면 가장 긴 찾을 문자열의 쌍 하나만 적용합니다.
+    덩어리는 문서 순서대로 기록합니다.
+    """
+    phrases = [] # (텍스트 내 위치, 쌍 번호, chunk_map 키)
+    tokens = {} # 토큰 위치 → 적용할 MatchRecord
+    for record in records:
+        processed_find_word, processed_replace_word, is_phrase = pairs[record.term]
+        if is_phrase:
+            phrases.append((record.span[0], record.term, (record.chunk, processed_replace_word, record.josa, None)))
+        elif record.token is not None:
+            current = tokens.get(record.token)
+            if current is None or (len(processed_find_word), -record.term) > (len(pairs[current.term][0]), -current.term):
+                tokens[record.token] = record
+    
+    found = [(pos, key, locations[idx]) for pos, idx, key in sorted(phrases, key=lambda item: item[:2])]
+    for token, record in sorted(tokens.items()):
+        processed_find_word, processed_replace_word, _ = pairs[record.term]
+        # 띄어쓰기가 다른 출현은 원문 표기를 바꿀 문자열로 교체
+        replaced = record.chunk.replace(record.matched or processed_find_word, processed_replace_word)
+        found.append((token[0], (record.chunk, replaced, record.josa, record.suffix), locations[record.term]))
+    
+    found.sort(key=lambda item: item[0])
+    for _, key, location in found:
+        chunk_map[key].append(location)
+
+def _build_law_amendment_rules(law_name, units, pairs, matcher, skipped_laws, memo, metrics):
+    """
+    법률 하나의 텍스트 단위 목록에서 찾을 문자열들의 출현 위치를 모두 찾아 개정 규칙 문장 목록을 만드는 함수.
+    공용 매처(LawMatcher)로 법률을 한 번 훑어 얻은 MatchRecord를 사용하며, 모든 쌍의 규칙을 하나의 목록으로 합칩니다.
+    부칙 조문은 개정문 생성에서 제외하며, 덩어리 추출과 규칙 문장은 실행 단위 메모(memo)를 거쳐 재사용합니다.
+    조문이 없거나 검색어를 찾지 못하면 None을 반환하며, 누락 사유는 skipped_laws에 (법률명, 사유)로 기록합니다.
+    단계별 소요 시간(scan, render, group)은 metrics에 기록합니다.
+    """
+    if not units:
+        skipped_laws.append((law_name, "조문단위 없음"))
+        return None # 조문이 없으면 건너뜀
         
-        # 항번호 순으로 정렬 (항번호가 없으면 0으로 간주하여 정렬)
-        # title과 outside가 None이 될 수 있으므로, 키 생성 시 안전하게 처리
-        sorted_clause_groups_keys = sorted(clause_groups.keys(),
-                                           key=lambda x: int(re.search(r'제(\d+)항', x[0]).group(1)) if re.search(r'제(\d+)항', x[0]) else 0)
+    if DEBUG_LOG:
+        print(f"조문 개수: {sum(1 for unit in units if unit.kind == '제목')}")
+    
+    scan_start = time.perf_counter()
+    
+    # 찾아낸 '덩어리'(chunk)와 위치 정보를 매핑할 딕셔너리
+    # 키: (원본 덩어리, 대체될 덩어리, 조사, 접미사), 값: [위치1, 위치2, ...]
+    chunk_map = defaultdict(list) 
+    
+    # 법률의 모든 텍스트 단위(조문 제목, 조문내용, 항, 호, 목)에서 찾은 출현을 텍스트 단위별로 문서 순서대로 처리
+    # (부칙은 개정문 생성에서 제외)
+    unit_records = defaultdict(list)
+    for record in matcher.match_law(law_name, units, include_부칙=False):
+        unit_records[record.unit].append(record)
+    
+    for i, records in unit_records.items():
+        locations = {}
+        for idx in sorted({record.term for record in records}):
+            locations[idx] = _amendment_location(units, i, pairs[idx][0], matcher.spacing_variants)
+            if DEBUG_LOG:
+                print(f"매치 발견: {locations[idx]}") # 디버깅
+        _collect_amendment_chunks(records, pairs, locations, chunk_map)
+    metrics.add_time("scan", time.perf_counter() - scan_start)
 
-        for (clause, title, outside) in sorted_clause_groups_keys:
-            loc_str = article_num # 조문 번호로 시작
-            
-            if title:
-                loc_str += title # 제목 추가
-                
-            if clause:
-                loc_str += clause # 항번호 추가
-                
-            if outside:
-                loc_str += outside # 각목외의부분 추가
-                
-            # 호목 처리
-            item_goals = clause_groups[(clause, title, outside)]
-            if item_goals:
-                # 호목 정렬 후 가운뎃점(ㆍ)으로 연결
-                # 전체 위치 문자열을 구성하여 parse_location으로 정렬 키 생성
-                sorted_items = sorted(item_goals, key=lambda x: parse_location(f"{article_num}{clause}{x}"))
-                
-                # 중복 위치 제거
-                unique_items = []
-                for item in sorted_items:
-                    if item not in unique_items:
-                        unique_items.append(item)
-                
-                if unique_items:
-                    # 가지번호가 있는 경우 주의해서 처리 (이미 format_location에서 처리됨)
-                    # "제"로 시작하지 않는 목번호(예: "가목") 앞에 "제"를 붙이는 것을 방지
-                    items_str = "ㆍ".join([
-                        item for item in unique_items
-                    ])
-                    loc_str += f"{items_str}" # 호목 문자열 추가
+    # 현재 법률에서 검색 결과가 없으면 다음 법률로
+    if not chunk_map:
+        find_words = ", ".join(f"'{pair[0]}'" for pair in pairs)
+        if DEBUG_LOG:
+            print(f"[{law_name}]에서 검색어 {find_words}를 찾지 못했습니다.") # 디버깅
+        return None
+        
+    # 디버깅을 위해 추출된 청크 정보 출력
+    if DEBUG_LOG:
+        print(f"추출된 청크 수: {len(chunk_map)}")
+        for (chunk, replaced, josa, suffix), locations in chunk_map.items():
+            print(f"청크: '{chunk}', 대체: '{replaced}', 조사: '{josa}', 접미사: '{suffix}', 위치 수: {len(locations)}")
+        
+    render_start = time.perf_counter()
+    
+    # 같은 출력 형식을 가진 항목들을 그룹화 (개정문 규칙별로 묶음)
+    rule_map = defaultdict(list)
+    
+    for (chunk, replaced, josa, suffix), locations in chunk_map.items():
+        # "로서/로써", "으로서/으로써" 특수 접미사 처리 -> 조사로 간주
+        if josa in ["으로서", "로써", "으로서", "으로써"]:
+            rule = memo.apply_josa_rule(chunk, replaced, josa)
+        # "등", "등의", "등인", "등만", "에" 등의 접미사는 덩어리에서 제외하고 일반 처리 (규칙 0 적용)
+        elif suffix in ["등", "등의", "등인", "등만", "등에", "에", "에게", "만", "만을", "만이", "만은", "만에", "만으로"]:
+            rule = memo.apply_josa_rule(chunk, replaced, josa)
+        elif suffix and suffix != "의": # "의"는 개별 처리하지 않음 (단순 소유격 조사로 간주)
+            # 접미사가 있는 경우 접미사를 포함한 단어로 처리 (예: "지방법원장"을 "고등법원장"으로)
+            orig_with_suffix = chunk + suffix
+            replaced_with_suffix = replaced + suffix
+            rule = memo.apply_josa_rule(orig_with_suffix, replaced_with_suffix, josa)
+        else:
+            # 일반 규칙 적용 (조사가 있거나 없는 경우)
+            rule = memo.apply_josa_rule(chunk, replaced, josa)
             
-            article_clause_parts.append(loc_str)
+        rule_map[rule].extend(locations) # 규칙별로 위치 정보 추가
+    metrics.add_time("render", time.perf_counter() - render_start)
+    
+    # 그룹화된 항목들을 정렬하여 출력
+    group_start = time.perf_counter()
+    consolidated_rules = []
+    for rule, locations in rule_map.items():
+        # 중복 위치 제거 (정렬은 group_locations에서 처리)
+        unique_locations = set(locations)
+        grouped = group_locations(unique_locations)
         
-        # 결과에 조별 정보 추가 - 각 조는 쉼표로 연결
-        if article_clause_parts:
-            # 마지막 항목 앞에만 '및'을 사용하고 나머지는 쉼표로 연결
-            if len(article_clause_parts) == 1:
-                result_parts.append(article_clause_parts[0])
+        # 2개 이상의 위치가 있으면 '각각'을 추가하는 규칙 적용
+        if len(unique_locations) > 1 and "각각" not in rule:
+            # "A"를 "B"로 한다 -> "A"를 각각 "B"로 한다 형식으로 변경 시도
+            # 이 정규식은 "XXX"을/를 "YYY"으로/로 한다. 패턴을 찾습니다.
+            parts = re.match(r'(".*?")(을|를) (".*?")(으로|로)? 한다\.?', rule)
+            if parts:
+                orig_quoted = parts.group(1) # 예: "대법원"
+                josa1 = parts.group(2) # 예: 을
+                replace_quoted = parts.group(3) # 예: "지방법원"
+                josa2 = parts.group(4) if parts.group(4) else "" # 예: 으로
+
+                # 새로운 규칙 형태: "A"을/를 각각 "B"으로/로 한다.
+                modified_rule = f'{orig_quoted}{josa1} 각각 {replace_quoted}{josa2} 한다.'
+                result_line = f"{grouped} 중 {modified_rule}"
             else:
-                result_parts.append(", ".join(article_clause_parts[:-1]) + f" 및 {article_clause_parts[-1]}")
-    
-    # 최종 결과 반환 - 모든 위치 정보를 평면적인 목록으로 다루고, 마지막 항목 앞에만 '및' 사용
-    # 이 부분은 이미 위에서 처리된 로직이므로, result_parts를 그대로 반환하거나
-    # 아니면 함수 외부에서 최종 포맷팅을 하는 것이 더 명확할 수 있습니다.
-    # 현재는 각 법률의 모든 위치를 한 줄로 합쳐서 반환하는 방식입니다.
-    if result_parts:
-        return "".join(result_parts) # 여기서는 쉼표/및 처리가 이미 완료된 각 조별 문자열을 합칩니다.
-    else:
-        return ""
+                # 정규식 매치 실패 시 원래 규칙 문자열 사용
+                result_line = f"{grouped} 중 {rule}"
+        else:
+            # 단일 위치 또는 이미 '각각'이 포함된 규칙
+            result_line = f"{grouped} 중 {rule}"
         
-def run_amendment_logic(find_word, replace_word, exclude_laws=None):
+        consolidated_rules.append(result_line)
+    metrics.add_time("group", time.perf_counter() - group_start)
+    
+    return consolidated_rules
+
+def format_law_amendment(번호, law_name, consolidated_rules):
     """
-    개정문 생성 로직을 실행하는 함수.
-    찾을 문자열과 바꿀 문자열, 그리고 개정 대상에서 제외할 법률 목록을 받습니다.
+    법률 하나의 개정 규칙 문장 목록을 번호가 붙은 HTML 개정문으로 만드는 함수.
+    21번째 결과물부터는 원문자가 아닌 괄호 숫자로 항목 번호를 표기합니다.
     """
-    amendment_results = []
-    skipped_laws = []  # 디버깅을 위해 누락된 법률 추적
+    # 21번째 결과물부터는 원문자가 아닌 괄호 숫자로 항목 번호 표기
+    prefix = chr(9312 + 번호 - 1) if 번호 <= 20 else f'({번호})'
+    
+    # HTML 형식으로 출력 (br 태그 사용)
+    amendment = f"{prefix} {law_name} 일부를 다음과 같이 개정한다.<br>"
+    
+    # 각 규칙마다 br 태그로 줄바꿈 추가
+    for i, rule in enumerate(consolidated_rules):
+        amendment += rule
+        # 마지막 규칙이 아니면 줄바꿈 두 번, 마지막 규칙은 줄바꿈 한 번
+        if i < len(consolidated_rules) - 1:
+            amendment += "<br>" # 다음 규칙과 한 줄 띄움
+        else:
+            amendment += "<br>" # 법률과 다음 법률 사이에 한 줄 띄움
+    
+    return amendment
 
-    # 배제할 법률 목록이 None이면 빈 리스트로 초기화
-    if exclude_laws is None:
-        exclude_laws = []
 
-    # 배제할 법률 목록 전처리 - 공백 정규화 (연속된 공백을 하나로, 앞뒤 공백 제거)
-    normalized_exclude_laws = []
-    for law in exclude_laws:
-        if law.strip():  # 빈 문자열이 아닌 경우에만 처리
-            normalized_law = ' '.join(law.split())
-            normalized_exclude_laws.append(normalized_law)
-            
-    # 중간점과 중괄호를 가운뎃점/낫표로 정규화
-    normalized_find_word = normalize_special_chars(find_word)  # 사용자 입력에 대한 정규화
-    normalized_replace_word = normalize_special_chars(replace_word)  # 사용자 입력에 대한 정규화
-    
-    # 새로 추가: 검색어 전처리 (큰따옴표 유무에 따른 구문/단어 구분)
-    processed_find_word, is_phrase = preprocess_search_term(normalized_find_word)
-    processed_replace_word, _ = preprocess_search_term(normalized_replace_word) # 바꿀 문자열은 구문 여부 필요 없음
+def iter_batch_amendment_logic(pairs, exclude_laws=None, max_workers=None, memo=None, metrics=None, with_law_name=False,
+                               spacing_insensitive=False):
+    """
+    여러 (찾을 문자열, 바꿀 문자열) 쌍을 한꺼번에 처리하는 개정문 생성 제너레이터.
+    쌍별 검색 결과의 합집합에 속한 법률을 한 번씩만 가져와, 각 법률 텍스트를 다중 패턴 자동자로 한 번 훑고
+    모든 쌍의 개정 규칙을 합친 개정문을 만듭니다.
+    법률 하나의 처리가 끝날 때마다 (처리된 법률 수, 검색된 전체 법률 수, 개정문) 튜플을 검색 결과 순서대로 반환하며,
+    개정 대상이 없거나 배제된 법률의 개정문은 None입니다. with_law_name이 참이면 법률명과 개정 규칙 문장 수를 함께 넣은
+    (처리된 법률 수, 검색된 전체 법률 수, 법률명, 개정문, 개정 규칙 수) 튜플을 반환합니다.
+    spacing_insensitive가 참이면 찾을 문자열과 띄어쓰기만 다른 표기(예: "특정범죄가중처벌"과 "특정범죄 가중처벌")도 찾아
+    개정문에는 원문 표기 그대로 인용합니다. 이때 대상 법률은 최신 로컬 색인이 있으면 색인(공백 무시)에서 찾고,
+    없으면 찾을 문자열과 공백을 뺀 표기로 각각 법제처 API를 검색합니다.
+    memo(AmendmentMemo)를 넘기면 그 메모를 사용하므로 실행 후 memo.stats()로 적중률을 확인할 수 있습니다.
+    metrics(RunMetrics)를 넘기면 단계별 소요 시간과 카운터를 기록하므로 실행 후 metrics.report()로 실행 보고서를 얻을 수 있습니다.
+    """
+    skipped_laws = []  # 디버깅을 위해 누락된 법률 추적 ((법률명, 사유) 목록)
+    if metrics is None:
+        metrics = RunMetrics()
 
-    # 추가: 명시적으로 공백 제거 확인 (trim)
-    processed_find_word = processed_find_word.strip()
-    processed_replace_word = processed_replace_word.strip()
-    
-    # 부칙 정보 확인을 위한 변수
-    부칙_검색됨 = False  # 부칙에서 검색어가 발견되었는지 여부 (현재는 사용되지 않음, 디버깅 목적)
-    
-    # 법제처 API를 통해 찾을 문자열을 포함하는 법률 목록 가져오기
-    laws = get_law_list_from_api(processed_find_word)
-    print(f"총 {len(laws)}개 법률이 검색되었습니다.")
+    # 배제할 법률 목록 전처리 - 공백 정규화
+    normalized_exclude_laws = normalize_exclude_laws(exclude_laws)
+    
+    # 찾을/바꿀 문자열 쌍 전처리 및 다중 패턴 자동자 구성
+    pairs = prepare_amendment_pairs(pairs)
+    if not pairs:
+        return
+    if memo is None:
+        memo = AmendmentMemo() # 이번 실행 동안만 쓰는 덩어리 추출/규칙 문장 메모
+    task = ("amendment", tuple(pairs), spacing_insensitive) # 법률별 처리 작업 설명 (다중 패턴 자동자는 _make_law_handler에서 구성)
+    
+    # 법제처 API를 통해 찾을 문자열별 법률 목록을 스트리밍으로 가져와 합집합을 구함
+    # (첫 페이지의 법률부터 바로 본문 요청을 시작하고, 나머지 페이지는 동시에 가져옴)
+    진행 = {"처리": 0, "검색": 0} # 처리된 법률 수와 검색된 전체 법률 수 (진행률 표시용)
+    
+    def iter_find_word_laws(processed_find_word):
+        """찾을 문자열 하나의 검색 결과 법률 (띄어쓰기 무시 모드에서는 로컬 색인 또는 공백을 뺀 표기의 검색 결과 포함)"""
+        queries = [processed_find_word]
+        if spacing_insensitive:
+            indexed_laws = search_law_index(processed_find_word, max_workers, metrics)
+            if indexed_laws is not None:
+                진행["검색"] += len(indexed_laws)
+                yield from indexed_laws
+                return
+            if clean(processed_find_word) != processed_find_word:
+                queries.append(clean(processed_find_word))
+        for query in queries:
+            yield from iter_law_list_from_api(query, max_workers,
+                                              on_total=lambda total: 진행.update(검색=진행["검색"] + total),
+                                              metrics=metrics)
+    
+    def iter_candidate_laws():
+        """찾을 문자열별 검색 결과를 차례로 이어 붙이되, 이미 나온 법률(MST 기준)은 한 번만 반환"""
+        seen_msts = set()
+        for processed_find_word, _, _ in pairs:
+            for law in iter_find_word_laws(processed_find_word):
+                if law["MST"] in seen_msts:
+                    진행["검색"] -= 1 # 중복된 법률은 전체 수에서 제외
+                    continue
+                seen_msts.add(law["MST"])
+                yield law
     
     # 실제로 출력된 법률을 추적하기 위한 변수 (출력 항목 번호 매기기 위함)
     출력된_법률수 = 0
     
-    for idx, law in enumerate(laws):
+    def iter_target_laws():
+        """배제 법률을 걸러내어 실제로 본문을 가져올 대상 법률만 반환"""
+        for law in iter_candidate_laws():
+            if is_excluded_law(law["법령명"], normalized_exclude_laws):
+                if DEBUG_LOG:
+                    print(f"배제됨: {law['법령명']} (사용자 지정 배제 법률)")
+                skipped_laws.append((law["법령명"], "사용자 지정 배제 법률"))
+                진행["처리"] += 1 # 배제된 법률도 처리된 것으로 계산
+                continue # 해당 법률은 건너뜀
+            yield law
+    
+    # 대상 법률의 본문을 동시에 가져오되, 결과는 검색 결과 순서대로 처리
+    # (프로세스 풀 모드에서는 파싱과 개정 규칙 생성도 작업 프로세스에서 동시에 진행)
+    for law, result, error in iter_law_results(iter_target_laws(), task, max_workers, metrics, memo):
+        진행["처리"] += 1
         law_name = law["법령명"]
-        
-        # 공백을 정규화한 법률명 생성 (배제 법률 비교를 위해)
-        normalized_law_name = ' '.join(law_name.split())
-        
-        # 배제할 법률 목록에 있는지 확인 - 다양한 방식으로 비교
-        exclude_match = False
-        for exclude_law in normalized_exclude_laws:
-            # 1. 정확히 일치하는 경우
-            if exclude_law == normalized_law_name:
-                exclude_match = True
-                break
-            # 2. 공백을 모두 제거하고 비교
-            if exclude_law.replace(" ", "") == normalized_law_name.replace(" ", ""):
-                exclude_match = True
-                break
-            # 3. 부분 문자열 비교 (기존 로직)
-            if exclude_law in normalized_law_name:
-                exclude_match = True
-                break
-        
-        if exclude_match:
-            print(f"배제됨: {law_name} (사용자 지정 배제 법률)")
-            skipped_laws.append(f"{law_name}: 사용자 지정 배제 법률")
-            continue # 해당 법률은 건너뜀
-            
         mst = law["MST"]
-        print(f"처리 중: {idx+1}/{len(laws)} - {law_name} (MST: {mst})")
-        
-        xml_data = get_law_text_by_mst(mst) # 법령 XML 데이터 가져오기
-        if not xml_data:
-            skipped_laws.append(f"{law_name}: XML 데이터 없음")
-            continue # XML 데이터가 없으면 건너뜀
-            
-        try:
-            tree = ET.fromstring(xml_data) # XML 파싱
-        except ET.ParseError as e:
-            skipped_laws.append(f"{law_name}: XML 파싱 오류 - {str(e)}")
-            continue # XML 파싱 오류 발생 시 건너뜀
-            
-        articles = tree.findall(".//조문단위") # 모든 조문단위 요소 찾기
-        if not articles:
-            skipped_laws.append(f"{law_name}: 조문단위 없음")
-            continue # 조문이 없으면 건너뜀
-            
-        print(f"조문 개수: {len(articles)}")
-        
-        # 찾아낸 '덩어리'(chunk)와 위치 정보를 매핑할 딕셔너리
-        # 키: (원본 덩어리, 대체될 덩어리, 조사, 접미사), 값: [위치1, 위치2, ...]
-        chunk_map = defaultdict(list) 
+        if DEBUG_LOG:
+            print(f"처리 중: {진행['처리']}/{진행['검색']} - {law_name} (MST: {mst})")
         
-        # 법률에서 검색어의 모든 출현을 찾기 위한 디버깅 변수
-        found_matches = 0
-        found_in_부칙 = False  # 부칙에서 검색어 발견 여부
-        
-        # 법률의 모든 텍스트 내용을 검색하며 조, 항, 호, 목 단위로 처리
-        for article in articles:
-            # 조문 정보 추출
-            조번호 = article.findtext("조문번호", "").strip()
-            조가지번호 = article.findtext("조문가지번호", "").strip()
-            조문식별자 = make_article_number(조번호, 조가지번호)
-            
-            # 조문의 부칙 여부 확인 (부칙은 개정문 대상에서 제외)
-            조문명 = article.findtext("조문명", "").strip()
-            is_부칙 = "부칙" in 조문명
-            
-            # 조문 제목 검색
-            조문제목 = article.findtext("조문제목", "") or ""
-            
-            # 조문 제목에서 검색어 확인
-            제목에_검색어_있음 = processed_find_word in 조문제목
-            
-            # 조문내용에서 검색
-            조문내용 = article.findtext("조문내용", "") or ""
-            
-            # 조문 내용에서 검색어 확인
-            본문에_검색어_있음 = processed_find_word in 조문내용
-            
-            if 제목에_검색어_있음 or 본문에_검색어_있음:
-                found_matches += 1
-                if is_부칙:
-                    found_in_부칙 = True
-                    continue  # 부칙은 개정문 생성에서 제외
-                
-                # 위치 정보에 제목 표시 추가
-                # 하나의 조문에서 제목과 본문 모두에 검색어가 있을 수 있음
-                if 제목에_검색어_있음 and 본문에_검색어_있음:
-                    # 제목에서 발견된 경우 처리
-                    if is_phrase:
-                        # 공백 포함 구문 처리
-                        phrase_matches = find_phrase_with_josa(조문제목, processed_find_word)
-                        for _, phrase, josa in phrase_matches:
-                            location = f"{조문식별자} 제목 및 본문" # 위치 문자열에 '제목 및 본문' 명시
-                            chunk_map[(processed_find_word, processed_replace_word, josa, None)].append(location)
-                    else:
-                        # 단어 단위 처리
-                        tokens = re.findall(r'[가-힣A-Za-z0-9「」]+', 조문제목) # 낫표 포함
-                        for token in tokens:
-                            if processed_find_word in token:
-                                chunk, josa, suffix = extract_chunk_and_josa(token, processed_find_word)
-                                replaced = chunk.replace(processed_find_word, processed_replace_word)
-                                location = f"{조문식별자} 제목 및 본문"
-                                chunk_map[(chunk, replaced, josa, suffix)].append(location)
-                    
-                    # 본문에서 발견된 경우 처리 (위치 문자열은 동일하게 '제목 및 본문')
-                    if is_phrase:
-                        phrase_matches = find_phrase_with_josa(조문내용, processed_find_word)
-                        for _, phrase, josa in phrase_matches:
-                            location = f"{조문식별자} 제목 및 본문"
-                            chunk_map[(processed_find_word, processed_replace_word, josa, None)].append(location)
-                    else:
-                        tokens = re.findall(r'[가-힣A-Za-z0-9「」]+', 조문내용)
-                        for token in tokens:
-                            if processed_find_word in token:
-                                chunk, josa, suffix = extract_chunk_and_josa(token, processed_find_word)
-                                replaced = chunk.replace(processed_find_word, processed_replace_word)
-                                location = f"{조문식별자} 제목 및 본문"
-                                chunk_map[(chunk, replaced, josa, suffix)].append(location)
-
-                elif 제목에_검색어_있음:
-                    # 제목에서만 발견된 경우
-                    if is_phrase:
-                        phrase_matches = find_phrase_with_josa(조문제목, processed_find_word)
-                        for _, phrase, josa in phrase_matches:
-                            location = f"{조문식별자} 제목"
-                            chunk_map[(processed_find_word, processed_replace_word, josa, None)].append(location)
-                    else:
-                        tokens = re.findall(r'[가-힣A-Za-z0-9「」]+', 조문제목)
-                        for token in tokens:
-                            if processed_find_word in token:
-                                chunk, josa, suffix = extract_chunk_and_josa(token, processed_find_word)
-                                replaced = chunk.replace(processed_find_word, processed_replace_word)
-                                location = f"{조문식별자} 제목"
-                                chunk_map[(chunk, replaced, josa, suffix)].append(location)
-                
-                elif 본문에_검색어_있음:
-                    # 본문에서만 발견된 경우
-                    print(f"매치 발견: {조문식별자}") # 디버깅
-                    if is_phrase:
-                        phrase_matches = find_phrase_with_josa(조문내용, processed_find_word)
-                        for _, phrase, josa in phrase_matches:
-                            location = f"{조문식별자}"
-                            chunk_map[(processed_find_word, processed_replace_word, josa, None)].append(location)
-                    else:
-                        tokens = re.findall(r'[가-힣A-Za-z0-9「」]+', 조문내용)
-                        for token in tokens:
-                            if processed_find_word in token:
-                                chunk, josa, suffix = extract_chunk_and_josa(token, processed_find_word)
-                                replaced = chunk.replace(processed_find_word, processed_replace_word)
-                                location = f"{조문식별자}"
-                                chunk_map[(chunk, replaced, josa, suffix)].append(location)
-
-            # 항 내용 검색
-            for 항 in article.findall("항"):
-                항번호 = normalize_number(항.findtext("항번호", "").strip())
-                항번호_부분 = f"제{항번호}항" if 항번호 else ""
-                
-                # 각 목 외의 부분 확인 (호에서 찾을 수 있음)
-                각목외의부분 = False
-                for 호 in 항.findall("호"):
-                    호속성 = 호.attrib
-                    if 호속성.get("구분") == "각목외의부분":
-                        각목외의부분 = True
-                        break # 발견하면 바로 반복 중단
-                
-                항내용 = 항.findtext("항내용", "") or ""
-                
-                # 항 내용에서 검색어 확인
-                항_검색어_있음 = processed_find_word in 항내용
-                
-                if 항_검색어_있음:
-                    found_matches += 1
-                    if is_부칙:
-                        found_in_부칙 = True
-                        continue # 부칙은 개정문 생성에서 제외
-                        
-                    additional_info = ""
-                    if 각목외의부분:
-                        additional_info = " 각 목 외의 부분"
-                        
-                    print(f"매치 발견: {조문식별자}{항번호_부분}{additional_info}") # 디버깅
-                    
-                    if is_phrase:
-                        # 공백 포함 구문 처리
-                        phrase_matches = find_phrase_with_josa(항내용, processed_find_word)
-                        for _, phrase, josa in phrase_matches:
-                            location = f"{조문식별자}{항번호_부분}{additional_info}"
-                            chunk_map[(processed_find_word, processed_replace_word, josa, None)].append(location)
-                    else:
-                        # 단어 단위 처리
-                        tokens = re.findall(r'[가-힣A-Za-z0-9「」]+', 항내용) # 낫표 포함
-                        for token in tokens:
-                            if processed_find_word in token:
-                                chunk, josa, suffix = extract_chunk_and_josa(token, processed_find_word)
-                                replaced = chunk.replace(processed_find_word, processed_replace_word)
-                                location = f"{조문식별자}{항번호_부분}{additional_info}"
-                                chunk_map[(chunk, replaced, josa, suffix)].append(location)
-                
-                # 호 내용 검색 (항의 자식으로 존재)
-                for 호 in 항.findall("호"):
-                    호번호 = 호.findtext("호번호")
-                    
-                    # 가지번호 확인 (예: 제14호의3)
-                    호가지번호 = None
-                    # 호가지번호는 XML 태그로 존재할 수 있음
-                    if 호.find("호가지번호") is not None:
-                        호가지번호 = 호.findtext("호가지번호", "").strip()
-                    
-                    호내용 = 호.findtext("호내용", "") or ""
-                    
-                    호_검색어_있음 = processed_find_word in 호내용
-                    
-                    if 호_검색어_있음:
-                        found_matches += 1
-                        if is_부칙:
-                            found_in_부칙 = True
-                            continue # 부칙은 개정문 생성에서 제외
-                            
-                        # 호번호 표시 (가지번호가 있으면 추가)
-                        호번호_표시 = f"제{호번호}호"
-                        if 호가지번호:
-                            호번호_표시 = f"제{호번호}호의{호가지번호}"
-                            
-                        print(f"매치 발견: {조문식별자}{항번호_부분}{호번호_표시}") # 디버깅
-                        
-                        if is_phrase:
-                            # 공백 포함 구문 처리
-                            phrase_matches = find_phrase_with_josa(호내용, processed_find_word)
-                            for _, phrase, josa in phrase_matches:
-                                location = f"{조문식별자}{항번호_부분}{호번호_표시}"
-                                chunk_map[(processed_find_word, processed_replace_word, josa, None)].append(location)
-                        else:
-                            # 단어 단위 처리
-                            tokens = re.findall(r'[가-힣A-Za-z0-9「」]+', 호내용) # 낫표 포함
-                            for token in tokens:
-                                if processed_find_word in token:
-                                    chunk, josa, suffix = extract_chunk_and_josa(token, processed_find_word)
-                                    replaced = chunk.replace(processed_find_word, processed_replace_word)
-                                    location = f"{조문식별자}{항번호_부분}{호번호_표시}"
-                                    chunk_map[(chunk, replaced, josa, suffix)].append(location)
-
-                    # 목 내용 검색 (호의 자식으로 존재)
-                    for 목 in 호.findall("목"):
-                        목번호 = 목.findtext("목번호")
-                        for m in 목.findall("목내용"):
-                            if not m.text:
-                                continue
-                                
-                            목_검색어_있음 = processed_find_word in m.text
-                                
-                            if 목_검색어_있음:
-                                found_matches += 1
-                                if is_부칙:
-                                    found_in_부칙 = True
-                                    continue # 부칙은 개정문 생성에서 제외
-                                    
-                                # 호번호 표시 (가지번호가 있으면 추가)
-                                호번호_표시 = f"제{호번호}호"
-                                if 호가지번호:
-                                    호번호_표시 = f"제{호번호}호의{호가지번호}"
-                                    
-                                print(f"매치 발견: {조문식별자}{항번호_부분}{호번호_표시}{목번호}목") # 디버깅
-                                
-                                if is_phrase:
-                                    # 공백 포함 구문 처리
-                                    for line in m.text.splitlines():
-                                        if processed_find_word in line:
-                                            phrase_matches = find_phrase_with_josa(line, processed_find_word)
-                                            for _, phrase, josa in phrase_matches:
-                                                location = f"{조문식별자}{항번호_부분}{호번호_표시}{목번호}목"
-                                                chunk_map[(processed_find_word, processed_replace_word, josa, None)].append(location)
-                                else:
-                                    # 단어 단위 처리
-                                    줄들 = [line.strip() for line in m.text.splitlines() if line.strip()]
-                                    for 줄 in 줄들:
-                                        if processed_find_word in 줄:
-                                            tokens = re.findall(r'[가-힣A-Za-z0-9「」]+', 줄) # 낫표 포함
-                                            for token in tokens:
-                                                if processed_find_word in token:
-                                                    chunk, josa, suffix = extract_chunk_and_josa(token, processed_find_word)
-                                                    replaced = chunk.replace(processed_find_word, processed_replace_word)
-                                                    location = f"{조문식별자}{항번호_부분}{호번호_표시}{목번호}목"
-                                                    chunk_map[(chunk, replaced, josa, suffix)].append(location)
-
-        # 현재 법률에서 검색 결과가 없으면 다음 법률로
-        if not chunk_map:
-            print(f"[{law_name}]에서 검색어 '{processed_find_word}'를 찾지 못했습니다.") # 디버깅
-            continue
-            
-        # 디버깅을 위해 추출된 청크 정보 출력
-        print(f"추출된 청크 수: {len(chunk_map)}")
-        for (chunk, replaced, josa, suffix), locations in chunk_map.items():
-            print(f"청크: '{chunk}', 대체: '{replaced}', 조사: '{josa}', 접미사: '{suffix}', 위치 수: {len(locations)}")
-            
-        # 같은 출력 형식을 가진 항목들을 그룹화 (개정문 규칙별로 묶음)
-        rule_map = defaultdict(list)
-        
-        for (chunk, replaced, josa, suffix), locations in chunk_map.items():
-            # "로서/로써", "으로서/으로써" 특수 접미사 처리 -> 조사로 간주
-            if josa in ["으로서", "로써", "으로서", "으로써"]:
-                rule = apply_josa_rule(chunk, replaced, josa)
-            # "등", "등의", "등인", "등만", "에" 등의 접미사는 덩어리에서 제외하고 일반 처리 (규칙 0 적용)
-            elif suffix in ["등", "등의", "등인", "등만", "등에", "에", "에게", "만", "만을", "만이", "만은", "만에", "만으로"]:
-                rule = apply_josa_rule(chunk, replaced, josa)
-            elif suffix and suffix != "의": # "의"는 개별 처리하지 않음 (단순 소유격 조사로 간주)
-                # 접미사가 있는 경우 접미사를 포함한 단어로 처리 (예: "지방법원장"을 "고등법원장"으로)
-                orig_with_suffix = chunk + suffix
-                replaced_with_suffix = replaced + suffix
-                rule = apply_josa_rule(orig_with_suffix, replaced_with_suffix, josa)
-            else:
-                # 일반 규칙 적용 (조사가 있거나 없는 경우)
-                rule = apply_josa_rule(chunk, replaced, josa)
-                
-            rule_map[rule].extend(locations) # 규칙별로 위치 정보 추가
-        
-        # 그룹화된 항목들을 정렬하여 출력
-        consolidated_rules = []
-        for rule, locations in rule_map.items():
-            # 중복 위치 제거 및 정렬
-            unique_locations = sorted(set(locations))
-            
-            # 2개 이상의 위치가 있으면 '각각'을 추가하는 규칙 적용
-            if len(unique_locations) > 1 and "각각" not in rule:
-                # "A"를 "B"로 한다 -> "A"를 각각 "B"로 한다 형식으로 변경 시도
-                # 이 정규식은 "XXX"을/를 "YYY"으로/로 한다. 패턴을 찾습니다.
-                parts = re.match(r'(".*?")(을|를) (".*?")(으로|로)? 한다\.?', rule)
-                if parts:
-                    orig_quoted = parts.group(1) # 예: "대법원"
-                    josa1 = parts.group(2) # 예: 을
-                    replace_quoted = parts.group(3) # 예: "지방법원"
-                    josa2 = parts.group(4) if parts.group(4) else "" # 예: 으로
-
-                    # 새로운 규칙 형태: "A"을/를 각각 "B"으로/로 한다.
-                    modified_rule = f'{orig_quoted}{josa1} 각각 {replace_quoted}{josa2} 한다.'
-                    result_line = f"{group_locations(unique_locations)} 중 {modified_rule}"
-                else:
-                    # 정규식 매치 실패 시 원래 규칙 문자열 사용
-                    result_line = f"{group_locations(unique_locations)} 중 {rule}"
-            else:
-                # 단일 위치 또는 이미 '각각'이 포함된 규칙
-                result_line = f"{group_locations(unique_locations)} 중 {rule}"
-            
-            consolidated_rules.append(result_line)
+        amendment = None
+        rule_count = 0
+        if error:
+            skipped_laws.append((law_name, error)) # XML 데이터가 없거나 파싱 오류 발생 시 건너뜀
+        else:
+            consolidated_rules, law_skipped = result
+            skipped_laws.extend(law_skipped)
+            if consolidated_rules:
+                출력된_법률수 += 1
+                rule_count = len(consolidated_rules)
+                with metrics.stage("render"):
+                    amendment = format_law_amendment(출력된_법률수, law_name, consolidated_rules)
+            elif consolidated_rules is not None:
+                # 이 법률에서 개정문이 생성되지 않은 경우
+                skipped_laws.append((law_name, "개정 대상 조문이 없음 (필터링 또는 검색 불일치)"))
+            elif not law_skipped:
+                metrics.count("laws_without_match")
+        metrics.count("laws_processed")
+        if amendment:
+            metrics.count("laws_amended")
         
-        # 출력 준비
-        if consolidated_rules:
-            출력된_법률수 += 1
-            # 21번째 결과물부터는 원문자가 아닌 괄호 숫자로 항목 번호 표기
-            prefix = chr(9312 + 출력된_법률수 - 1) if 출력된_법률수 <= 20 else f'({출력된_법률수})'
-            
-            # HTML 형식으로 출력 (br 태그 사용)
-            amendment = f"{prefix} {law_name} 일부를 다음과 같이 개정한다.<br>"
-            
-            # 각 규칙마다 br 태그로 줄바꿈 추가
-            for i, rule in enumerate(consolidated_rules):
-                amendment += rule
-                # 마지막 규칙이 아니면 줄바꿈 두 번, 마지막 규칙은 줄바꿈 한 번
-                if i < len(consolidated_rules) - 1:
-                    amendment += "<br>" # 다음 규칙과 한 줄 띄움
-                else:
-                    amendment += "<br>" # 법률과 다음 법률 사이에 한 줄 띄움
-            
-            amendment_results.append(amendment)
+        if with_law_name:
+            yield 진행["처리"], 진행["검색"], law_name, amendment, rule_count
         else:
-            # 이 법률에서 개정문이 생성되지 않은 경우
-            skipped_laws.append(f"{law_name}: 개정 대상 조문이 없음 (필터링 또는 검색 불일치)")
+            yield 진행["처리"], 진행["검색"], amendment
+    
+    # 누락 사유별 법률 수 (사유의 세부 내용(" - " 뒤)은 묶어서 집계)
+    for _, reason in skipped_laws:
+        metrics.skip(reason.split(" - ")[0])
+    metrics.extra["memo"] = memo.stats()
+    metrics.finish()
 
     # 디버깅 정보 출력: 누락된 법률 목록
-    if skipped_laws:
+    if DEBUG_LOG and skipped_laws:
         print("---누락된 법률 목록---")
-        for law_info in skipped_laws:
-            print(law_info)
-            
-    # 최종 결과 반환
-    return amendment_results if amendment_results else ["⚠️ 개정 대상 조문이 없습니다."]
+        for law_name, reason in skipped_laws:
+            print(f"{law_name}: {reason}")
     
-def run_search_logic(query, unit="법률"):
+    # 디버깅 정보 출력: 메모 적중률
+    if DEBUG_LOG:
+        for kind, stat in memo.stats().items():
+            print(f"메모 적중률({kind}): {stat['hit_rate']:.1%} (적중 {stat['hits']}, 실패 {stat['misses']}, 보관 {stat['size']})")
+
+def iter_amendment_logic(find_word, replace_word, exclude_laws=None, max_workers=None, metrics=None,
+                         spacing_insensitive=False):
     """
-    검색 로직 실행 함수.
-    사용자 질의에 따라 법률 조항을 검색하고 HTML 형식으로 반환합니다.
+    개정문 생성 로직을 실행하는 제너레이터.
+    법률 하나의 처리가 끝날 때마다 (처리된 법률 수, 검색된 전체 법률 수, 개정문) 튜플을 검색 결과 순서대로 반환합니다.
+    개정문은 run_amendment_logic 결과와 같은 형식의 HTML이며, 개정 대상이 없거나 배제된 법률은 None입니다.
     """
-    # 중간점과 중괄호를 가운뎃점/낫표로 정규화
-    normalized_query = normalize_special_chars(query)
-    
-    result_dict = {} # 법률명: [HTML 형식의 조문 내용] 딕셔너리
-    
-    # 검색어 전처리: 큰따옴표로 감싸진 경우 구문 검색으로 처리
-    processed_query, is_phrase = preprocess_search_term(normalized_query)
+    yield from iter_batch_amendment_logic([(find_word, replace_word)], exclude_laws, max_workers, metrics=metrics,
+                                          spacing_insensitive=spacing_insensitive)
+
+def run_batch_amendment_logic(pairs, exclude_laws=None, max_workers=None, memo=None, metrics=None,
+                              spacing_insensitive=False):
+    """
+    여러 (찾을 문자열, 바꿀 문자열) 쌍의 개정문을 한꺼번에 생성하는 함수.
+    법률마다 모든 쌍의 개정 규칙을 합친 개정문 하나를 만들며, 출력 형식은 run_amendment_logic과 같습니다.
+    """
+    amendment_results = [
+        amendment
+        for _, _, amendment in iter_batch_amendment_logic(pairs, exclude_laws, max_workers, memo, metrics,
+                                                          spacing_insensitive=spacing_insensitive)
+        if amendment
+    ]
     
-    # 디버깅 출력
-    print(f"원본 검색어: {query}")
-    print(f"정규화된 검색어: {normalized_query}")
-    print(f"처리된 검색어: {processed_query}")
-    print(f"구문 검색 모드: {is_phrase}")
+    # 최종 결과 반환
+    return amendment_results if amendment_results else ["⚠️ 개정 대상 조문이 없습니다."]
+
+def run_amendment_logic(find_word, replace_word, exclude_laws=None, max_workers=None, metrics=None,
+                        spacing_insensitive=False):
+    """
+    개정문 생성 로직을 실행하는 함수.
+    찾을 문자열과 바꿀 문자열, 그리고 개정 대상에서 제외할 법률 목록을 받습니다.
+    spacing_insensitive가 참이면 띄어쓰기만 다른 표기도 개정 대상으로 찾습니다.
+    법령 본문은 max_workers개까지 동시에 가져오며, 출력 순서는 검색 결과 순서를 따릅니다.
+    """
+    return run_batch_amendment_logic([(find_word, replace_word)], exclude_laws, max_workers, metrics=metrics,
+                                     spacing_insensitive=spacing_insensitive)
     
-    # 법제처 API를 통해 검색어에 해당하는 법률 목록 가져오기
-    for law in get_law_list_from_api(processed_query):
-        mst = law["MST"]
-        law_name = law["법령명"]
+def _search_law_units(law_name, units, matcher, highlighter, metrics):
+    """
+    법률 하나의 텍스트 단위 목록에서 검색어가 포함된 조문을 찾아 조문별 HTML 목록을 반환하는 함수.
+    공용 매처(LawMatcher)의 MatchRecord로 텍스트 단위별 검색 여부를 정합니다.
+    조문 제목은 원문 그대로, 그 밖의 텍스트는 구문 검색이면 원문, 아니면 공백을 제거한 텍스트에서 검색합니다.
+    검색된 텍스트의 검색어는 검색어별로 미리 만든 하이라이터(Highlighter)로 표시합니다.
+    검색어가 없으면 빈 리스트를 반환합니다. 소요 시간은 metrics의 scan, render 단계에 기록합니다.
+    """
+    # 텍스트 단위별 검색어 포함 여부
+    with metrics.stage("scan"):
+        hits = [False] * len(units)
+        for record in matcher.match_law(law_name, units, extract_chunks=False):
+            hits[record.unit] = True
+    with metrics.stage("render"):
+        return _render_law_search_results(units, hits, highlighter.mark)
+
+# 검색식의 논리연산자 (대문자로 띄어 쓴 경우에만 연산자로 인식)
+QUERY_OPERATORS = ("AND", "OR", "NOT")
+# 검색식 토큰: 큰따옴표 구문, 괄호, 닫히지 않은 큰따옴표, 그 밖의 낱말
+QUERY_TOKEN_PATTERN = re.compile(r'"[^"]*"|[()]|"|[^\s()"]+')
+
+def is_boolean_query(query):
+    """
+    검색어를 논리 검색식(parse_search_query)으로 처리해야 하는지 확인하는 함수.
+    논리연산자(AND, OR, NOT)가 독립된 낱말로 있거나 괄호, 큰따옴표가 있으면 참이므로 "(법원"처럼 잘못된 검색식은
+    parse_search_query에서 ValueError가 됩니다. 다만 검색어 전체를 큰따옴표로 묶은 구문 하나는 기존처럼 구문 검색으로 처리합니다.
+    """
+    tokens = QUERY_TOKEN_PATTERN.findall(query)
+    if len(tokens) == 1 and len(tokens[0]) > 1 and tokens[0].startswith('"'):
+        return False # 예: "특정범죄 가중처벌"
+    return any(token in QUERY_OPERATORS or token in ("(", ")") or token.startswith('"') for token in tokens)
+
+def parse_search_query(query):
+    """
+    AND, OR, NOT, 괄호, 큰따옴표 구문을 포함한 검색식을 구문 트리로 변환하는 함수.
+    (구문 트리, 검색어 목록, 긍정 검색어 번호 집합) 튜플을 반환하며, 검색어 목록의 각 항목은 (검색어, 구문 여부) 튜플입니다.
+    구문 트리의 노드는 ("term", 번호), ("not", 노드), ("and", 노드, 노드), ("or", 노드, 노드) 형태입니다.
+    연산자 없이 이어진 낱말들은 공백을 무시하는 하나의 검색어로 보고, 구문이나 괄호가 연산자 없이 이어지면 AND로 처리합니다.
+    NOT은 AND보다, AND는 OR보다 먼저 결합합니다. 검색식이 잘못되었으면 ValueError가 발생합니다.
+    """
+    tokens = QUERY_TOKEN_PATTERN.findall(query)
+    terms = [] # (검색어, 구문 여부)
+    positive = set() # NOT 아래에 있지 않은 검색어 번호
+    pos = 0
+    
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+    
+    def parse_or(negated):
+        nonlocal pos
+        node = parse_and(negated)
+        while peek() == "OR":
+            pos += 1
+            node = ("or", node, parse_and(negated))
+        return node
+    
+    def parse_and(negated):
+        nonlocal pos
+        node = parse_not(negated)
+        while True:
+            token = peek()
+            if token is None or token in ("OR", ")"):
+                return node
+            if token == "AND":
+                pos += 1
+            node = ("and", node, parse_not(negated))
+    
+    def parse_not(negated):
+        nonlocal pos
+        if peek() == "NOT":
+            pos += 1
+            return ("not", parse_not(not negated))
+        return parse_term(negated)
+    
+    def parse_term(negated):
+        nonlocal pos
+        token = peek()
+        if token is None:
+            raise ValueError("검색식 오류: 연산자 뒤에 검색어가 없습니다.")
+        if token in QUERY_OPERATORS or token == ")":
+            raise ValueError(f"검색식 오류: '{token}' 앞에 검색어가 필요합니다.")
+        if token == '"':
+            raise ValueError("검색식 오류: 닫는 큰따옴표가 없습니다.")
+        pos += 1
         
-        print(f"검색된 법령명: '{law_name}'") # 디버깅
+        if token == "(":
+            node = parse_or(negated)
+            if peek() != ")":
+                raise ValueError("검색식 오류: 닫는 괄호가 없습니다.")
+            pos += 1
+            return node
         
-        xml_data = get_law_text_by_mst(mst) # 법령의 상세 XML 데이터 가져오기
-        if not xml_data:
-            continue # 데이터가 없으면 건너뜀
-            
-        try:
-            tree = ET.fromstring(xml_data) # XML 파싱
-        except ET.ParseError as e:
-            print(f"법령 XML 파싱 오류: {e} for MST {mst}")
-            continue
-
-        articles = tree.findall(".//조문단위") # 모든 조문단위 요소 찾기
-        law_results = [] # 현재 법률에서 검색된 조문들의 HTML 리스트
+        if token.startswith('"'):
+            term = (token[1:-1].strip(), True)
+        else:
+            # 연산자/괄호/구문이 나올 때까지 이어진 낱말을 하나의 검색어로 묶음
+            words = [token]
+            while peek() is not None and peek() not in QUERY_OPERATORS and peek() not in ("(", ")") and not peek().startswith('"'):
+                words.append(peek())
+                pos += 1
+            term = (" ".join(words), False)
+        if not term[0]:
+            raise ValueError("검색식 오류: 빈 큰따옴표 구문이 있습니다.")
         
-        for article in articles:
-            # 조문 정보 추출
-            조번호 = article.findtext("조문번호", "").strip()
-            조가지번호 = article.findtext("조문가지번호", "").strip()
-            조문식별자 = make_article_number(조번호, 조가지번호)
-            조문내용 = article.findtext("조문내용", "") or ""
-            조문제목 = article.findtext("조문제목", "") or "" # 조문 제목 추가
-            항들 = article.findall("항") # 모든 항 요소 찾기
-            
-            출력덩어리 = [] # 현재 조문에서 출력할 내용들을 담을 리스트
+        if term not in terms:
+            terms.append(term)
+        idx = terms.index(term)
+        if not negated:
+            positive.add(idx)
+        return ("term", idx)
+    
+    if not tokens:
+        raise ValueError("검색식 오류: 검색어가 없습니다.")
+    node = parse_or(False)
+    if peek() is not None:
+        raise ValueError(f"검색식 오류: '{peek()}'에 대응하는 여는 괄호가 없습니다.")
+    if not positive:
+        raise ValueError("검색식 오류: NOT 외에 포함할 검색어를 하나 이상 입력하세요.")
+    return node, terms, positive
+
+def evaluate_search_query(node, present):
+    """구문 트리를 검색어 번호 집합(present)에 대해 평가하는 함수"""
+    kind = node[0]
+    if kind == "term":
+        return node[1] in present
+    if kind == "not":
+        return not evaluate_search_query(node[1], present)
+    if kind == "and":
+        return evaluate_search_query(node[1], present) and evaluate_search_query(node[2], present)
+    return evaluate_search_query(node[1], present) or evaluate_search_query(node[2], present)
+
+def _query_candidate_laws(node, term_laws):
+    """
+    구문 트리에 따라 긍정 검색어별 후보 법률({MST: 법률 정보}, 검색 결과 순서 유지)을 교집합/합집합하는 함수.
+    NOT 아래처럼 후보를 좁힐 수 없는 부분은 None(전체 법률)으로 취급합니다.
+    """
+    kind = node[0]
+    if kind == "term":
+        return term_laws[node[1]]
+    if kind == "not":
+        return None
+    left = _query_candidate_laws(node[1], term_laws)
+    right = _query_candidate_laws(node[2], term_laws)
+    if kind == "and":
+        if left is None or right is None:
+            return right if left is None else left
+        return {mst: law for mst, law in left.items() if mst in right}
+    if left is None or right is None:
+        return None
+    merged = dict(left)
+    for mst, law in right.items():
+        merged.setdefault(mst, law)
+    return merged
+
+def _fetch_query_candidate_laws(node, terms, positive, max_workers=None, metrics=None):
+    """
+    긍정 검색어별 법률 목록을 (로컬 색인이 최신이면 색인에서, 아니면 법제처 API에서) 한 번씩만 동시에 가져와
+    구문 트리에 따라 합친 후보 법률 목록을 반환하는 함수. 본문은 아직 가져오지 않습니다.
+    """
+    def fetch(idx):
+        text = terms[idx][0]
+        laws = search_law_index(text, max_workers, metrics)
+        if laws is None:
+            laws = get_law_list_from_api(text, max_workers, metrics)
+        if DEBUG_LOG:
+            print(f"검색어 '{text}' 후보 법률 수: {len(laws)}") # 디버깅
+        return idx, {law["MST"]: law for law in laws}
+    
+    with ThreadPoolExecutor(max_workers=min(len(positive), max_workers or MAX_WORKERS)) as executor:
+        term_laws = dict(executor.map(fetch, sorted(positive)))
+    
+    candidates = _query_candidate_laws(node, term_laws)
+    if candidates is None:
+        raise ValueError("검색식 오류: NOT 검색어만으로는 검색 대상 법률을 정할 수 없습니다. OR의 양쪽에 포함할 검색어를 넣어 주세요.")
+    return list(candidates.values())
+
+def _search_law_units_boolean(law_name, units, matcher, node, positive, highlighter, metrics):
+    """
+    논리 검색식으로 법률 하나의 텍스트 단위 목록을 검색하여 조문별 HTML 목록을 반환하는 함수.
+    공용 매처(LawMatcher)의 MatchRecord로 텍스트 단위마다 포함된 검색어를 구하고, 조문(제목+본문) → 항 → 호 → 목으로 내려가며
+    상위 단위의 검색어를 이어받아 각 단위에서 검색식을 평가합니다.
+    검색식을 만족하고 그 단위 자체에 긍정 검색어가 있는 경우에만 검색된 것으로 봅니다.
+    소요 시간은 metrics의 scan, render 단계에 기록합니다.
+    """
+    scan_start = time.perf_counter()
+    
+    # 텍스트 단위별로 포함된 검색어 번호
+    # (구문과 조문 제목은 원문, 그 밖의 낱말은 공백을 제거한 텍스트에서 찾은 것)
+    own = [set() for _ in units]
+    for record in matcher.match_law(law_name, units, extract_chunks=False):
+        own[record.unit].add(record.term)
+    own = [frozenset(terms) for terms in own]
+    
+    hits = [False] * len(units)
+    scopes = [frozenset()] * len(units) # 단위별로 상위 단위까지 포함한 검색어 집합
+    조문_검색어 = frozenset()
+    for i, unit in enumerate(units):
+        if unit.kind == "제목":
+            조문_검색어 = own[i] | own[i + 1] # 조문 제목과 본문은 같은 단계로 평가
+            scope = 조문_검색어
+        elif unit.kind == "조문":
+            scope = 조문_검색어
+        elif unit.parent is None:
+            scope = 조문_검색어 | own[i]
+        else:
+            scope = scopes[unit.parent] | own[i]
+        scopes[i] = scope
+        hits[i] = bool(own[i] & positive) and evaluate_search_query(node, scope)
+    metrics.add_time("scan", time.perf_counter() - scan_start)
+    
+    with metrics.stage("render"):
+        return _render_law_search_results(units, hits, highlighter.mark)
+
+def _render_law_search_results(units, hits, mark):
+    """
+    텍스트 단위별 검색 여부(hits)에 따라 법률 하나의 검색 결과를 조문별 HTML 목록으로 만드는 함수.
+    mark는 검색된 텍스트에 하이라이트를 입히는 함수입니다.
+    항 또는 그 하위 호/목에서 검색어가 발견되면 해당 항과 하위 내용을 함께 출력합니다.
+    """
+    # 1. 하위 호/목에서 검색어가 발견된 상위 항/호 표시
+    하위_검색됨 = [False] * len(units)
+    for i, unit in enumerate(units):
+        if hits[i] and unit.raw and unit.kind in ("호", "목"):
+            parent = unit.parent
+            while parent is not None:
+                하위_검색됨[parent] = True
+                parent = units[parent].parent
+    
+    # 2. 조문 단위로 출력 HTML 구성
+    law_results = [] # 현재 법률에서 검색된 조문들의 HTML 리스트
+    출력덩어리 = [] # 현재 조문에서 출력할 내용들을 담을 리스트
+    for i, unit in enumerate(units):
+        if unit.kind == "제목":
+            # 새 조문 시작: 이전 조문에서 검색된 내용이 있다면 결과에 추가
+            if 출력덩어리:
+                law_results.append("".join(출력덩어리))
+            출력덩어리 = []
             
-            # 조문 제목 검색
-            제목_검색됨 = processed_query in 조문제목
-            # 조문 내용 검색 (공백 포함 여부에 따라 다르게 처리)
-            본문_검색됨 = processed_query in 조문내용 if is_phrase else clean(processed_query) in clean(조문내용)
+            조문식별자 = unit.조문식별자
+            조문제목 = unit.raw
+            조문내용 = units[i + 1].raw
+            header_html = f"<h3>{조문식별자} {조문제목}</h3>" if 조문제목 else f"<h3>{조문식별자}</h3>"
             
+            제목_검색됨 = hits[i]
+            본문_검색됨 = hits[i + 1]
             # 해당 조문의 출력 여부 결정
             조문_출력될_것인가 = 제목_검색됨 or 본문_검색됨
-            
             첫_항출력됨 = False # 조문내용이 이미 출력되었는지 여부
             
             # 조문 제목 또는 내용에 검색어가 있을 경우 처리
             if 조문_출력될_것인가:
-                header_html = f"<h3>{조문식별자} {조문제목}</h3>" if 조문제목 else f"<h3>{조문식별자}</h3>"
                 출력덩어리.append(header_html)
-                
                 # 제목 내용 하이라이트 및 추가
                 if 제목_검색됨:
-                    출력덩어리.append(highlight(조문제목, processed_query))
-                
+                    출력덩어리.append(mark(조문제목))
                 # 본문 내용 하이라이트 및 추가
                 if 본문_검색됨:
-                    출력덩어리.append(highlight(조문내용, processed_query))
-                
+                    출력덩어리.append(mark(조문내용))
                 첫_항출력됨 = True # 조문 내용은 이미 출력되었음을 표시
-
-            for 항 in 항들:
-                항번호 = normalize_number(항.findtext("항번호", "").strip())
-                항내용 = 항.findtext("항내용", "") or ""
-                
-                # 항 내용 검색 (공백 포함 여부에 따라 다르게 처리)
-                항_검색됨 = processed_query in 항내용 if is_phrase else clean(processed_query) in clean(항내용)
-                
-                하위_호목_검색됨 = False # 현재 항의 하위 호/목에서 검색어가 발견되었는지 여부
-                항내용_출력_필요 = False # 현재 항 내용을 출력해야 하는지 여부
-                
-                호들 = 항.findall("호") # 모든 호 요소 찾기
-                
-                # 호 또는 목 내용에서 검색어 확인
-                for 호 in 호들:
-                    호내용 = 호.findtext("호내용", "") or ""
-                    호_검색됨 = processed_query in 호내용 if is_phrase else clean(processed_query) in clean(호내용)
-                    
-                    if 호_검색됨:
-                        하위_호목_검색됨 = True
-                        항내용_출력_필요 = True
-                        break # 호에서 발견되면 더 이상 하위 목을 검사할 필요 없음
-
-                    for 목 in 호.findall("목"):
-                        for m in 목.findall("목내용"):
-                            if m.text:
-                                목_검색됨 = processed_query in m.text if is_phrase else clean(processed_query) in clean(m.text)
-                                if 목_검색됨:
-                                    하위_호목_검색됨 = True
-                                    항내용_출력_필요 = True
-                                    break
-                        if 하위_호목_검색됨:
-                            break
+        
+        elif unit.kind == "항":
+            # 항 내용 자체에 검색어가 있거나, 하위 호/목에서 검색어가 발견되었다면 해당 항과 그 하위를 출력
+            항_출력 = hits[i] or 하위_검색됨[i]
+            if 항_출력:
+                if not 조문_출력될_것인가 and not 첫_항출력됨:
+                    # 조문 내용이 출력되지 않았고, 현재 항이 처음 출력되는 항이라면
+                    # 조문 헤더와 조문 내용을 먼저 출력 (하이라이트 포함)
+                    출력덩어리.append(header_html)
+                    출력덩어리.append(mark(조문내용))
+                    첫_항출력됨 = True
                 
-                # 항 내용 자체에 검색어가 있거나, 하위 호/목에서 검색어가 발견되었다면 해당 항과 그 하위를 출력
-                if 항_검색됨 or 하위_호목_검색됨:
-                    if not 조문_출력될_것인가 and not 첫_항출력됨:
-                        # 조문 내용이 출력되지 않았고, 현재 항이 처음 출력되는 항이라면
-                        # 조문 헤더와 조문 내용을 먼저 출력 (하이라이트 포함)
-                        header_html = f"<h3>{조문식별자} {조문제목}</h3>" if 조문제목 else f"<h3>{조문식별자}</h3>"
-                        출력덩어리.append(header_html)
-                        출력덩어리.append(highlight(조문내용, processed_query))
-                        첫_항출력됨 = True
-                        
-                    # 항 내용 자체 하이라이트 (이미 조문내용에 포함된 경우 제외)
-                    if 항_검색됨 and not 본문_검색됨: # 본문에서 이미 항내용이 하이라이트된 경우 중복 방지
-                        출력덩어리.append(f"<p>&nbsp;&nbsp;{항번호}. {highlight(항내용, processed_query)}</p>")
-                    elif not 항_검색됨 and 항내용_출력_필요: # 항 내용 자체에는 없지만 하위에서 찾은 경우
-                        출력덩어리.append(f"<p>&nbsp;&nbsp;{항번호}. {항내용}</p>")
-                    elif 항_검색됨 and 본문_검색됨: # 본문에서 이미 하이라이트되었지만 항번호가 필요한 경우
-                        # 본문 하이라이트가 더 큰 범위이므로, 항번호만 붙여서 다시 표시하거나, 이 부분을 재고해야 함.
-                        # 여기서는 일단 간단히 처리: 항번호만 표시하고 내용은 본문에서 하이라이트된 것으로 간주.
-                        # 더 정교하게 하려면 본문 하이라이트 시 항번호를 포함하도록 수정해야 함.
-                        # 현재 로직은 항내용 자체에 검색어가 있다면 항 번호와 내용을 다시 출력합니다.
-                         출력덩어리.append(f"<p>&nbsp;&nbsp;{항번호}. {highlight(항내용, processed_query)}</p>")
-
-                    # 호 내용 처리
-                    for 호 in 호들:
-                        호번호 = 호.findtext("호번호")
-                        호내용 = 호.findtext("호내용", "") or ""
-                        
-                        호_검색됨 = processed_query in 호내용 if is_phrase else clean(processed_query) in clean(호내용)
-                        
-                        if 호_검색됨:
-                            출력덩어리.append(f"<p>&nbsp;&nbsp;&nbsp;&nbsp;{호번호}. {highlight(호내용, processed_query)}</p>")
-                        elif (not 호_검색됨) and any(processed_query in (m.text or "") if is_phrase else clean(processed_query) in clean(m.text or "") for 목 in 호.findall("목") for m in 목.findall("목내용")):
-                            # 호 내용 자체에는 없지만 하위 목에서 찾은 경우
-                             출력덩어리.append(f"<p>&nbsp;&nbsp;&nbsp;&nbsp;{호번호}. {호내용}</p>")
-
-                        # 목 내용 처리
-                        for 목 in 호.findall("목"):
-                            for m in 목.findall("목내용"):
-                                if m.text:
-                                    목_검색됨 = processed_query in m.text if is_phrase else clean(processed_query) in clean(m.text)
-                                    if 목_검색됨:
-                                        줄들 = [line.strip() for line in m.text.splitlines() if line.strip()]
-                                        줄들 = [highlight(line, processed_query) for line in 줄들]
-                                        if 줄들:
-                                            출력덩어리.append(
-                                                "<div style='margin:0;padding:0'>" +
-                                                "<br>".join(f"&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;({목.findtext('목번호')}). {line}" for line in 줄들) +
-                                                "</div>"
-                                            )
-                                    elif (not 목_검색됨) and any(processed_query in (m.text or "") if is_phrase else clean(processed_query) in clean(m.text or "") for m in 목.findall("목내용")):
-                                        # 목 내용 자체에는 없지만 그 하위에 또 다른 내용이 있고 거기에 검색어가 있는 경우 (이런 경우는 거의 없지만 대비)
-                                        # 현재 코드 구조상 목의 자식으로 '목내용'만 있으므로 이 부분은 필요 없을 수 있음.
-                                        pass # 이 경우는 현재 로직에서 처리 안함
-                                        
-            # 현재 법률에서 검색된 조문들이 있다면 결과 딕셔너리에 추가
-            if 출력덩어리:
-                law_results.append("".join(출력덩어리))
+                if hits[i]: # 항 내용 자체 하이라이트
+                    출력덩어리.append(f"<p>&nbsp;&nbsp;{unit.항번호}. {mark(unit.raw)}</p>")
+                else: # 항 내용 자체에는 없지만 하위에서 찾은 경우
+                    출력덩어리.append(f"<p>&nbsp;&nbsp;{unit.항번호}. {unit.raw}</p>")
+        
+        elif unit.kind == "호":
+            if 항_출력:
+                if hits[i]:
+                    출력덩어리.append(f"<p>&nbsp;&nbsp;&nbsp;&nbsp;{unit.호번호}. {mark(unit.raw)}</p>")
+                elif 하위_검색됨[i]:
+                    # 호 내용 자체에는 없지만 하위 목에서 찾은 경우
+                    출력덩어리.append(f"<p>&nbsp;&nbsp;&nbsp;&nbsp;{unit.호번호}. {unit.raw}</p>")
+        
+        elif unit.kind == "목":
+            if 항_출력 and unit.raw and hits[i]:
+                줄들 = [line.strip() for line in unit.raw.splitlines() if line.strip()]
+                줄들 = [mark(line) for line in 줄들]
+                if 줄들:
+                    출력덩어리.append(
+                        "<div style='margin:0;padding:0'>" +
+                        "<br>".join(f"&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;({unit.목번호}). {line}" for line in 줄들) +
+                        "</div>"
+                    )
+    
+    # 마지막 조문에서 검색된 내용이 있다면 결과에 추가
+    if 출력덩어리:
+        law_results.append("".join(출력덩어리))
+    
+    return law_results
+
+
+def iter_search_logic(query, unit="법률", max_workers=None, metrics=None):
+    """
+    검색 로직을 실행하는 제너레이터.
+    법률 하나의 처리가 끝날 때마다 (처리된 법률 수, 검색된 전체 법률 수, 법률명, 조문 HTML 목록) 튜플을
+    검색 결과 순서대로 반환합니다. 검색어가 없거나 본문을 가져오지 못한 법률의 조문 HTML 목록은 빈 리스트입니다.
+    검색어에 AND, OR, NOT이나 괄호, 큰따옴표가 있으면 논리 검색식으로 처리하며(is_boolean_query, parse_search_query 참고),
+    검색식이 잘못되었으면 ValueError가 발생합니다.
+    metrics(RunMetrics)를 넘기면 단계별 소요 시간과 카운터를 기록하므로 실행 후 metrics.report()로 실행 보고서를 얻을 수 있습니다.
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    # 중간점과 중괄호를 가운뎃점/낫표로 정규화
+    normalized_query = normalize_special_chars(query)
+    
+    진행 = {"처리": 0, "검색": 0} # 처리된 법률 수와 검색된 전체 법률 수 (진행률 표시용)
+    
+    if is_boolean_query(normalized_query):
+        # 논리 검색식: 긍정 검색어별 후보 법률을 먼저 합친 뒤 본문을 가져옴
+        node, terms, positive = parse_search_query(normalized_query)
+        if DEBUG_LOG:
+            print(f"원본 검색어: {query}")
+            print(f"논리 검색식: {node}, 검색어: {terms}")
+        laws = _fetch_query_candidate_laws(node, terms, positive, max_workers, metrics)
+        if DEBUG_LOG:
+            print(f"후보 법률 수: {len(laws)}")
+        진행["검색"] = len(laws)
+        task = ("boolean", normalized_query) # 법률별 처리 작업 설명 (검색식은 _make_law_handler에서 다시 해석)
+    else:
+        # 검색어 전처리: 큰따옴표로 감싸진 경우 구문 검색으로 처리
+        processed_query, is_phrase = preprocess_search_term(normalized_query)
+        
+        # 디버깅 출력
+        if DEBUG_LOG:
+            print(f"원본 검색어: {query}")
+            print(f"정규화된 검색어: {normalized_query}")
+            print(f"처리된 검색어: {processed_query}")
+            print(f"구문 검색 모드: {is_phrase}")
+        
+        # 최신 로컬 색인이 있으면 색인에서 후보 법률을 찾고, 없으면 법제처 API를 통해 법률 목록을 스트리밍으로 가져옴
+        laws = search_law_index(processed_query, max_workers, metrics)
+        if laws is not None:
+            if DEBUG_LOG:
+                print(f"로컬 색인 검색 결과: {len(laws)}개 법률")
+            진행["검색"] = len(laws)
+        else:
+            laws = iter_law_list_from_api(processed_query, max_workers,
+                                          on_total=lambda total: 진행.update(검색=total), metrics=metrics)
+        task = ("search", processed_query, is_phrase) # 법률별 처리 작업 설명
+    
+    # 법령 본문을 동시에 조회 (디스크 캐시에 있으면 네트워크 요청 없음)
+    # (프로세스 풀 모드에서는 파싱과 조문 검색도 작업 프로세스에서 동시에 진행)
+    for law, law_results, error in iter_law_results(laws, task, max_workers, metrics):
+        진행["처리"] += 1
+        mst = law["MST"]
+        law_name = law["법령명"]
+        
+        if DEBUG_LOG:
+            print(f"검색된 법령명: '{law_name}'") # 디버깅
         
+        if error:
+            print(f"법령 XML 처리 실패: {error} for MST {mst}")
+            metrics.skip(error.split(" - ")[0])
+            law_results = [] # 데이터가 없거나 파싱 오류 발생 시 건너뜀
+        metrics.count("laws_processed")
+        if law_results:
+            metrics.count("laws_matched")
+        
+        yield 진행["처리"], 진행["검색"], law_name, law_results
+    metrics.finish()
+
+def run_search_logic(query, unit="법률", max_workers=None, metrics=None):
+    """
+    검색 로직 실행 함수.
+    사용자 질의에 따라 법률 조항을 검색하고 HTML 형식으로 반환합니다.
+    법령 본문은 max_workers개까지 동시에 가져오며, 결과 순서는 검색 결과 순서를 따릅니다.
+    """
+    result_dict = {} # 법률명: [HTML 형식의 조문 내용] 딕셔너리
+    
+    for _, _, law_name, law_results in iter_search_logic(query, unit, max_workers, metrics):
         # 현재 법률에서 최종 결과가 있다면 딕셔너리에 추가
         if law_results:
-            result_dict[law["법령명"]] = law_results
+            result_dict[law_name] = law_results
     
     return result_dict
+
+class _RunningResult:
+    """ResultCache에서 계산 중인 결과 하나 (지금까지 나온 항목과 상태)"""
+    __slots__ = ("items", "state", "error")
+    
+    def __init__(self):
+        self.items = []
+        self.state = "running" # running, done, failed, abandoned
+        self.error = None
+
+class ResultCache:
+    """
+    검색/개정문 생성 결과를 프로세스 전체에서 공유하는 캐시.
+    결과는 제너레이터가 반환한 항목 목록 그대로 보관하며, 유효 시간(ttl초)이 지나면 다시 계산하고
+    max_entries개를 넘으면 가장 오래 쓰이지 않은 결과부터 버립니다.
+    같은 키를 계산하는 중에 들어온 요청은 새로 계산하지 않고 진행 중인 계산의 항목을 나오는 대로 함께 받습니다.
+    계산하던 쪽이 도중에 그만두면 기다리던 요청 중 하나가 이어서 계산합니다.
+    """
+    
+    def __init__(self, max_entries=None, ttl=None):
+        self.max_entries = RESULT_CACHE_SIZE if max_entries is None else max_entries
+        self.ttl = RESULT_CACHE_TTL if ttl is None else ttl
+        self._lock = threading.Condition()
+        self._entries = OrderedDict() # 키 → (만료 시각, 항목 튜플)
+        self._running = {} # 키 → _RunningResult
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0}
+    
+    def iterate(self, key, compute, is_complete=None):
+        """
+        키에 해당하는 결과 항목을 차례로 반환하는 제너레이터.
+        캐시에 있으면 보관된 항목을, 같은 키를 계산 중이면 그 계산의 항목을, 둘 다 아니면 compute()로 계산한 항목을 반환합니다.
+        계산이 끝났을 때 is_complete()가 거짓이면 (일시적인 오류가 섞인 결과 등) 보관하지 않습니다.
+        """
+        skip = 0 # 이미 반환한 항목 수 (이어서 계산하는 경우 건너뜀)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] <= time.monotonic():
+                    del self._entries[key] # 유효 시간이 지난 결과
+                    entry = None
+                running = None
+                if entry is not None:
+                    self.counters["hits"] += 1
+                    self._entries.move_to_end(key)
+                else:
+                    running = self._running.get(key)
+                    owner = running is None
+                    if owner:
+                        running = self._running[key] = _RunningResult()
+                        self.counters["misses"] += 1
+                    else:
+                        self.counters["coalesced"] += 1
+            if entry is not None:
+                yield from entry[1][skip:]
+                return
+            if owner:
+                yield from self._compute(key, running, compute, is_complete, skip)
+                return
+            
+            # 진행 중인 계산의 항목을 나오는 대로 반환
+            index = skip
+            while True:
+                with self._lock:
+                    while index >= len(running.items) and running.state == "running":
+                        self._lock.wait()
+                    batch = running.items[index:]
+                    state = running.state
+                index += len(batch)
+                yield from batch
+                if batch:
+                    continue
+                if state == "done":
+                    return
+                if state == "failed":
+                    raise running.error
+                break # 계산하던 쪽이 그만둔 경우 이어서 계산
+            skip = index
+    
+    def _compute(self, key, running, compute, is_complete, skip):
+        """compute()의 항목을 기다리는 요청들과 나누며 반환하고, 끝나면 결과를 보관하는 제너레이터"""
+        state = "abandoned"
+        items = compute()
+        try:
+            for i, item in enumerate(items):
+                with self._lock:
+                    running.items.append(item)
+                    self._lock.notify_all()
+                if i >= skip:
+                    yield item
+            state = "done"
+        except Exception as e:
+            state = "failed"
+            running.error = e
+            raise
+        finally:
+            items.close()
+            with self._lock:
+                running.state = state
+                del self._running[key]
+                if state == "done" and self.max_entries > 0 and (is_complete is None or is_complete()):
+                    self._entries[key] = (time.monotonic() + self.ttl, tuple(running.items))
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                self._lock.notify_all()
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """적중/계산/합류 횟수와 현재 보관 중인 결과 수를 사전으로 반환"""
+        with self._lock:
+            return {**self.counters, "size": len(self._entries), "running": len(self._running)}
+
+# 서버 프로세스 전체에서 공유하는 결과 캐시
+RESULT_CACHE = ResultCache()
+
+def is_complete_run(metrics):
+    """
+    법률 목록이나 본문을 가져오지 못한 법률 없이 끝난 실행인지 확인하는 함수.
+    일시적인 오류가 섞인 결과는 결과 캐시에 저장하지 않고, 일괄 실행(law_batch.py)에서는 다시 실행할 대상으로 표시합니다.
+    """
+    return (not metrics.counters.get("list_page_errors")
+            and not any(reason in ("XML 데이터 없음", "XML 파싱 오류") for reason in metrics.skipped))
+
+def search_cache_key(query, unit="법률"):
+    """검색 결과 캐시 키: 특수문자를 정규화하고 전처리한 검색어 (논리 검색식은 정규화한 검색식)"""
+    normalized_query = normalize_special_chars(query).strip()
+    if is_boolean_query(normalized_query):
+        return ("boolean", normalized_query, unit)
+    processed_query, is_phrase = preprocess_search_term(normalized_query)
+    return ("search", processed_query, is_phrase, unit)
+
+def amendment_cache_key(pairs, exclude_laws=None, spacing_insensitive=False):
+    """개정문 생성 결과 캐시 키: 전처리한 (찾을 문자열, 바꿀 문자열) 쌍, 정규화한 배제 법률 목록, 띄어쓰기 무시 여부"""
+    return ("amendment", tuple(prepare_amendment_pairs(pairs)), tuple(sorted(set(normalize_exclude_laws(exclude_laws)))),
+            spacing_insensitive)
+
+def iter_search_logic_cached(query, unit="법률", max_workers=None, cache=None):
+    """
+    결과 캐시(cache, 기본값 RESULT_CACHE)를 거치는 iter_search_logic.
+    같은 검색어의 결과가 캐시에 있으면 바로 반환하고, 다른 요청이 같은 검색을 실행 중이면 그 결과를 함께 받습니다.
+    """
+    cache = RESULT_CACHE if cache is None else cache
+    metrics = RunMetrics()
+    yield from cache.iterate(search_cache_key(query, unit),
+                             lambda: iter_search_logic(query, unit, max_workers, metrics),
+                             lambda: is_complete_run(metrics))
+
+def iter_batch_amendment_logic_cached(pairs, exclude_laws=None, max_workers=None, cache=None, with_law_name=False,
+                                      spacing_insensitive=False):
+    """
+    결과 캐시(cache, 기본값 RESULT_CACHE)를 거치는 iter_batch_amendment_logic.
+    같은 쌍과 배제 법률 목록의 결과가 캐시에 있으면 바로 반환하고, 다른 요청이 같은 작업을 실행 중이면 그 결과를 함께 받습니다.
+    캐시에는 법률명과 개정 규칙 수를 포함한 결과를 보관하므로 with_law_name과 관계없이 같은 캐시 항목을 사용합니다.
+    """
+    cache = RESULT_CACHE if cache is None else cache
+    metrics = RunMetrics()
+    results = cache.iterate(amendment_cache_key(pairs, exclude_laws, spacing_insensitive),
+                            lambda: iter_batch_amendment_logic(pairs, exclude_laws, max_workers, metrics=metrics,
+                                                               with_law_name=True,
+                                                               spacing_insensitive=spacing_insensitive),
+                            lambda: is_complete_run(metrics))
+    try:
+        for processed, total, law_name, amendment, rule_count in results:
+            if with_law_name:
+                yield processed, total, law_name, amendment, rule_count
+            else:
+                yield processed, total, amendment
+    finally:
+        results.close() # 중간에 그만 받으면 실행 중인 작업을 다른 요청이 이어받을 수 있도록 바로 알림
+
+def iter_amendment_logic_cached(find_word, replace_word, exclude_laws=None, max_workers=None, cache=None, with_law_name=False,
+                                spacing_insensitive=False):
+    """결과 캐시(cache, 기본값 RESULT_CACHE)를 거치는 iter_amendment_logic"""
+    yield from iter_batch_amendment_logic_cached([(find_word, replace_word)], exclude_laws, max_workers, cache, with_law_name,
+                                                 spacing_insensitive)
@@ -0,0 +1,30 @@
+# 조사 규칙표(apply_josa_rule)와 예전 if-문 버전의 실행 시간을 비교하는 마이크로벤치마크.
+# 사용법: python tests/bench_josa_rules.py [--number N]
+
+import argparse
+import itertools
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import law_processor
+import legacy_josa
+from test_josa_rules import JOSA_VARIANTS, WORDS
+
+def main():
+    parser = argparse.ArgumentParser(description="조사 규칙표와 예전 if-문 버전의 apply_josa_rule 실행 시간 비교")
+    parser.add_argument("--number", type=int, default=200, help="전체 조합을 반복할 횟수")
+    args = parser.parse_args()
+    
+    cases = [(orig, replaced, josa) for josa in JOSA_VARIANTS
+             for orig, replaced in itertools.product(WORDS, WORDS)]
+    for name, func in (("if-문", legacy_josa.apply_josa_rule), ("규칙표", law_processor.apply_josa_rule)):
+        elapsed = min(timeit.repeat(lambda: [func(*case) for case in cases], number=args.number, repeat=5))
+        per_call = elapsed / (args.number * len(cases)) * 1e9
+        print(f"{name:6} {elapsed:.3f}초 ({len(cases)}개 조합 x {args.number}회, 호출당 {per_call:.0f}ns)")
+
+if __name__ == "__main__":
+    main()
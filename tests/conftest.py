@@ -0,0 +1,37 @@
+# 테스트에서 app 디렉토리의 모듈(law_processor 등)을 바로 import할 수 있도록 경로를 추가하고,
+# 캐시/색인을 쓰는 테스트가 함께 쓰는 임시 저장 경로와 가짜 법제처 API(fake_law_api.py) fixture를 제공합니다.
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+import law_processor  # noqa: E402
+from fake_law_api import FakeLawApi  # noqa: E402
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """법제처 API 요청을 FakeLawApi로 대신함"""
+    api = FakeLawApi()
+    monkeypatch.setattr(law_processor, "http_get", api)
+    return api
+
+
+@pytest.fixture
+def temp_store(tmp_path, monkeypatch):
+    """법령 XML 캐시, 전문 색인, 동기화 매니페스트를 임시 디렉터리에 두고 열린 연결을 새로 만듦"""
+    monkeypatch.setattr(law_processor, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(law_processor, "INDEX_PATH", str(tmp_path / "law_index.sqlite3"))
+    monkeypatch.setattr(law_processor, "SYNC_MANIFEST_PATH", str(tmp_path / "law_sync_manifest.json"))
+    monkeypatch.setattr(law_processor, "_cache_conn", None)
+    monkeypatch.setattr(law_processor, "_index_conn", None)
+    monkeypatch.setattr(law_processor, "_current_msts", None)
+    yield tmp_path
+    for name in ("_cache_conn", "_index_conn"):
+        conn = getattr(law_processor, name)
+        if conn is not None:
+            conn.close()
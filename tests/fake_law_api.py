@@ -0,0 +1,70 @@
+# 법제처 API(lawSearch.do, lawService.do)를 흉내 내는 테스트용 가짜 http_get과 법령 XML 생성 도구입니다.
+from urllib.parse import parse_qs, urlparse
+
+
+def law_xml(name, *articles):
+    """조문 내용 목록으로 lawService.do 응답 형식의 법령 XML(bytes)을 만듦"""
+    units = "".join(
+        f"<조문단위><조문번호>{number}</조문번호><조문내용>제{number}조 {text}</조문내용></조문단위>"
+        for number, text in enumerate(articles, 1)
+    )
+    return (f'<?xml version="1.0" encoding="UTF-8"?><법령><기본정보><법령명_한글>{name}</법령명_한글></기본정보>'
+            f"<조문>{units}</조문></법령>").encode("utf-8")
+
+
+class FakeResponse:
+    """requests.Response 중 law_processor가 쓰는 부분만 흉내 낸 응답"""
+
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+        self.encoding = None
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FakeLawApi:
+    """
+    law_processor.http_get 대신 쓰는 가짜 법제처 API.
+    laws는 MST → (법령명, 법령ID, 법령 XML)이며, lawSearch.do는 검색어가 XML에 들어 있는 법률을 한 쪽으로 반환합니다.
+    failing에 넣은 MST의 lawService.do 요청은 서버 오류(500)로 응답합니다.
+    """
+
+    def __init__(self):
+        self.laws = {}
+        self.failing = set()
+        self.requests = []
+
+    def add(self, mst, name, *articles, law_id=None):
+        self.laws[mst] = (name, law_id or name, law_xml(name, *articles))
+
+    def __call__(self, url, metrics=None, **kwargs):
+        self.requests.append(url)
+        parsed = urlparse(url)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        if parsed.path.endswith("lawService.do"):
+            if params.get("MST") in self.failing:
+                return FakeResponse(b"", 500)
+            law = self.laws.get(params.get("MST"))
+            return FakeResponse(law[2] if law else "<Law>일치하는 법령이 없습니다.</Law>".encode("utf-8"))
+        query = params.get("query", "").strip('"').encode("utf-8")
+        hits = [(mst, law) for mst, law in self.laws.items() if query in law[2]]
+        body = "".join(
+            f"<law><법령일련번호>{mst}</법령일련번호><법령명한글>{name}</법령명한글><법령ID>{law_id}</법령ID></law>"
+            for mst, (name, law_id, _) in hits
+        )
+        return FakeResponse(f"<LawSearch><totalCnt>{len(hits)}</totalCnt>{body}</LawSearch>".encode("utf-8"))
+
+    def requests_to(self, api):
+        return [url for url in self.requests if f"/{api}?" in url]
@@ -0,0 +1,233 @@
+# 조사 규칙표로 바꾸기 전의 apply_josa_rule (if-문 버전) 사본.
+# 조사 규칙표(law_processor.JOSA_RULE_TABLE)가 예전과 같은 개정문 형식을 만드는지 비교하는 기준으로만 사용합니다.
+
+def has_batchim(word):
+    """단어의 마지막 글자에 받침이 있는지 확인하는 함수 (한국어 조사 규칙 적용 위함)"""
+    if not word:
+        return False
+    
+    last_char = word[-1]
+    # 한글 유니코드 범위: AC00-D7A3
+    if '가' <= last_char <= '힣':
+        # 한글 유니코드 계산식: [(초성 * 21) + 중성] * 28 + 종성 + 0xAC00
+        char_code = ord(last_char)
+        # 종성 값 추출 (0은 받침 없음, 1-27은 받침 있음)
+        jongseong = (char_code - 0xAC00) % 28
+        return jongseong != 0
+    return False
+
+def has_rieul_batchim(word):
+    """단어의 마지막 글자에 'ㄹ' 받침이 있는지 확인하는 함수 (한국어 조사 규칙 적용 위함)"""
+    if not word:
+        return False
+    
+    last_char = word[-1]
+    if '가' <= last_char <= '힣':
+        char_code = ord(last_char)
+        # 종성 값 추출 (8은 'ㄹ' 받침)
+        jongseong = (char_code - 0xAC00) % 28
+        return jongseong == 8
+    return False
+
+def apply_josa_rule(orig, replaced, josa):
+    """
+    개정문 생성 시 한국어 조사 규칙에 따라 적절한 출력 형식을 반환하는 함수.
+    원본 단어(orig)와 대체될 단어(replaced)의 받침 유무, 조사(josa)에 따라 18가지 규칙을 적용합니다.
+    """
+    # 동일한 단어면 변경할 필요 없음
+    if orig == replaced:
+        return f'"{orig}"를 "{replaced}"로 한다.'
+        
+    # 받침 여부 확인
+    orig_has_batchim = has_batchim(orig)
+    replaced_has_batchim = has_batchim(replaced)
+    replaced_has_rieul = has_rieul_batchim(replaced)
+    
+    # 조사가 없는 경우 (규칙 0)
+    if josa is None:
+        if not orig_has_batchim:  # 규칙 0-1: A(원본)가 받침 없는 경우
+            if not replaced_has_batchim or replaced_has_rieul:  # 규칙 0-1-1, 0-1-2-1
+                return f'"{orig}"를 "{replaced}"로 한다.'
+            else:  # 규칙 0-1-2-2: B(바꿀 단어)의 받침이 ㄹ이 아닌 경우
+                return f'"{orig}"를 "{replaced}"으로 한다.'
+        else:  # 규칙 0-2: A(원본)가 받침 있는 경우
+            if not replaced_has_batchim or replaced_has_rieul:  # 규칙 0-2-1, 0-2-2-1
+                return f'"{orig}"을 "{replaced}"로 한다.'
+            else:  # 규칙 0-2-2-2: B(바꿀 단어)의 받침이 ㄹ이 아닌 경우
+                return f'"{orig}"을 "{replaced}"으로 한다.'
+    
+    # 따옴표가 있는 경우 조사에서 따옴표 제거 (예: "\"란" -> "란")
+    clean_josa = josa
+    if josa and josa.startswith('"'):
+        clean_josa = josa[1:]
+    
+    # 조사별 규칙 처리
+    if clean_josa == "을":  # 규칙 1: A을 -> B을/를/으로/로
+        if replaced_has_batchim: # B에 받침이 있는 경우
+            if replaced_has_rieul:  # 규칙 1-1-1: B의 받침이 ㄹ인 경우
+                return f'"{orig}"을 "{replaced}"로 한다.'
+            else:  # 규칙 1-1-2: B의 받침이 ㄹ이 아닌 경우
+                return f'"{orig}"을 "{replaced}"으로 한다.'
+        else:  # 규칙 1-2: B에 받침이 없는 경우
+            return f'"{orig}을"을 "{replaced}를"로 한다.'
+    
+    elif clean_josa == "를":  # 규칙 2: A를 -> B을/를
+        if replaced_has_batchim:  # 규칙 2-1: B에 받침이 있는 경우
+            return f'"{orig}를"을 "{replaced}을"로 한다.'
+        else:  # 규칙 2-2: B에 받침이 없는 경우
+            return f'"{orig}"를 "{replaced}"로 한다.'
+    
+    elif clean_josa == "과":  # 규칙 3: A과 -> B과/와/으로/로
+        if replaced_has_batchim: # B에 받침이 있는 경우
+            if replaced_has_rieul:  # 규칙 3-1-1: B의 받침이 ㄹ인 경우
+                return f'"{orig}"을 "{replaced}"로 한다.'
+            else:  # 규칙 3-1-2: B의 받침이 ㄹ이 아닌 경우
+                return f'"{orig}"을 "{replaced}"으로 한다.'
+        else:  # 규칙 3-2: B에 받침이 없는 경우
+            return f'"{orig}과"를 "{replaced}와"로 한다.'
+    
+    elif clean_josa == "와":  # 규칙 4: A와 -> B과/와
+        if replaced_has_batchim:  # 규칙 4-1: B에 받침이 있는 경우
+            return f'"{orig}와"를 "{replaced}과"로 한다.'
+        else:  # 규칙 4-2: B에 받침이 없는 경우
+            return f'"{orig}"를 "{replaced}"로 한다.'
+    
+    elif clean_josa == "이":  # 규칙 5: A이 -> B이/가/으로/로
+        if replaced_has_batchim: # B에 받침이 있는 경우
+            if replaced_has_rieul:  # 규칙 5-1-1: B의 받침이 ㄹ인 경우
+                return f'"{orig}"을 "{replaced}"로 한다.'
+            else:  # 규칙 5-1-2: B의 받침이 ㄹ이 아닌 경우
+                return f'"{orig}"을 "{replaced}"으로 한다.'
+        else:  # 규칙 5-2: B에 받침이 없는 경우
+            return f'"{orig}이"를 "{replaced}가"로 한다.'
+    
+    elif clean_josa == "가":  # 규칙 6: A가 -> B이/가
+        if replaced_has_batchim:  # 규칙 6-1: B에 받침이 있는 경우
+            return f'"{orig}가"를 "{replaced}이"로 한다.'
+        else:  # 규칙 6-2: B에 받침이 없는 경우
+            return f'"{orig}"를 "{replaced}"로 한다.'
+    
+    elif clean_josa == "이나":  # 규칙 7: A이나 -> B이나/나/으로/로
+        if replaced_has_batchim: # B에 받침이 있는 경우
+            if replaced_has_rieul:  # 규칙 7-1-1: B의 받침이 ㄹ인 경우
+                return f'"{orig}"을 "{replaced}"로 한다.'
+            else:  # 규칙 7-1-2: B의 받침이 ㄹ이 아닌 경우
+                return f'"{orig}"을 "{replaced}"으로 한다.'
+        else:  # 규칙 7-2: B에 받침이 없는 경우
+            return f'"{orig}이나"를 "{replaced}나"로 한다.'
+    
+    elif clean_josa == "나":  # 규칙 8: 아나 -> B이나/나
+        if replaced_has_batchim:  # 규칙 8-1: B에 받침이 있는 경우
+            return f'"{orig}나"를 "{replaced}이나"로 한다.'
+        else:  # 규칙 8-2: B에 받침이 없는 경우
+            return f'"{orig}"를 "{replaced}"로 한다.'
+    
+    elif clean_josa == "으로":  # 규칙 9: A으로 -> B으로/로
+        if replaced_has_batchim: # B에 받침이 있는 경우
+            if replaced_has_rieul:  # 규칙 9-1-1: B의 받침이 ㄹ인 경우
+                return f'"{orig}으로"를 "{replaced}로"로 한다.'
+            else:  # 규칙 9-1-2: B의 받침이 ㄹ이 아닌 경우
+                return f'"{orig}"을 "{replaced}"으로 한다.'
+        else:  # 규칙 9-2: B에 받침이 없는 경우
+            return f'"{orig}으로"를 "{replaced}로"로 한다.'
+    
+    elif clean_josa == "로":  # 규칙 10: A로 -> B으로/로
+        if orig_has_batchim:  # 규칙 10-1: A(원본)에 받침이 있는 경우
+            if replaced_has_batchim: # B에 받침이 있는 경우
+                if replaced_has_rieul:  # 규칙 10-1-1-1: B의 받침이 ㄹ인 경우
+                    return f'"{orig}"을 "{replaced}"로 한다.'
+                else:  # 규칙 10-1-1-2: B의 받침이 ㄹ이 아닌 경우
+                    return f'"{orig}로"를 "{replaced}으로"로 한다.'
+            else:  # 규칙 10-1-2: B에 받침이 없는 경우
+                return f'"{orig}"을 "{replaced}"로 한다.'
+        else:  # 규칙 10-2: A(원본)에 받침이 없는 경우
+            if replaced_has_batchim: # B에 받침이 있는 경우
+                if replaced_has_rieul:  # 규칙 10-2-1-1: B의 받침이 ㄹ인 경우
+                    return f'"{orig}"를 "{replaced}"로 한다.'
+                else:  # 규칙 10-2-1-2: B의 받침이 ㄹ이 아닌 경우
+                    return f'"{orig}로"를 "{replaced}으로"로 한다.'
+            else:  # 규칙 10-2-2: B에 받침이 없는 경우
+                return f'"{orig}"를 "{replaced}"로 한다.'
+    
+    elif clean_josa == "는":  # 규칙 11: A는 -> B은/는
+        if replaced_has_batchim:  # 규칙 11-1: B에 받침이 있는 경우
+            return f'"{orig}는"을 "{replaced}은"으로 한다.'
+        else:  # 규칙 11-2: B에 받침이 없는 경우
+            return f'"{orig}"를 "{replaced}"로 한다.'
+    
+    elif clean_josa == "은":  # 규칙 12: A은 -> B은/는/으로/로
+        if replaced_has_batchim: # B에 받침이 있는 경우
+            if replaced_has_rieul:  # 규칙 12-1-1: B의 받침이 ㄹ인 경우
+                return f'"{orig}"을 "{replaced}"로 한다.'
+            else:  # 규칙 12-1-2: B의 받침이 ㄹ이 아닌 경우
+                return f'"{orig}"을 "{replaced}"으로 한다.'
+        else:  # 규칙 12-2: B에 받침이 없는 경우
+            return f'"{orig}은"을 "{replaced}는"으로 한다.'
+    
+    elif clean_josa == "란":  # 규칙 13: A란 -> B이란/란
+        if replaced_has_batchim:  # 규칙 13-1: B에 받침이 있는 경우
+            quote_prefix = '"' if josa and josa.startswith('"') else ""
+            return f'"{orig}{josa}"을 "{replaced}이{quote_prefix}란"으로 한다.'
+        else:  # 규칙 13-2: B에 받침이 없는 경우
+            return f'"{orig}"를 "{replaced}"로 한다.'
+    
+    elif clean_josa == "이란":  # 규칙 14: A이란 -> B이란/란
+        if replaced_has_batchim: # B에 받침이 있는 경우
+            if replaced_has_rieul:  # 규칙 14-1-1: B의 받침이 ㄹ인 경우
+                return f'"{orig}"을 "{replaced}"로 한다.'
+            else:  # 규칙 14-1-2: B의 받침이 ㄹ이 아닌 경우
+                return f'"{orig}"을 "{replaced}"으로 한다.'
+        else:  # 규칙 14-2: B에 받침이 없는 경우
+            quote_prefix = '"' if josa and josa.startswith('"') else ""
+            return f'"{orig}{josa}"을 "{replaced}{quote_prefix}라"로 한다.'
+    
+    elif clean_josa == "로서" or clean_josa == "로써":  # 규칙 15: A로서/로써 -> B으로서/으로써/로서/로써
+        if orig_has_batchim:  # 규칙 15-1: A에 받침이 있는 경우
+            if replaced_has_batchim: # B에 받침이 있는 경우
+                if replaced_has_rieul:  # 규칙 15-1-1-1: B의 받침이 ㄹ인 경우
+                    return f'"{orig}"을 "{replaced}"로 한다.'
+                else:  # 규칙 15-1-1-2: B의 받침이 ㄹ이 아닌 경우
+                    return f'"{orig}{josa}"를 "{replaced}으{clean_josa}"로 한다.'
+            else:  # 규칙 15-1-2: B에 받침이 없는 경우
+                return f'"{orig}"을 "{replaced}"로 한다.'
+        else:  # 규칙 15-2: A에 받침이 없는 경우
+            if replaced_has_batchim: # B에 받침이 있는 경우
+                if replaced_has_rieul:  # 규칙 15-2-1-1: B의 받침이 ㄹ인 경우
+                    return f'"{orig}"를 "{replaced}"로 한다.'
+                else:  # 규칙 15-2-1-2: B의 받침이 ㄹ이 아닌 경우
+                    return f'"{orig}{josa}"를 "{replaced}으{clean_josa}"로 한다.'
+            else:  # 규칙 15-2-2: B에 받침이 없는 경우
+                return f'"{orig}"를 "{replaced}"로 한다.'
+    
+    elif clean_josa == "으로서" or clean_josa == "으로써":  # 규칙 16: A으로서/으로써 -> B으로서/으로써/로서/로써
+        if replaced_has_batchim: # B에 받침이 있는 경우
+            if replaced_has_rieul:  # 규칙 16-1-1: B의 받침이 ㄹ인 경우
+                return f'"{orig}{josa}"를 "{replaced}로{clean_josa[2:]}"로 한다.'
+            else:  # 규칙 16-1-2: B의 받침이 ㄹ이 아닌 경우
+                return f'"{orig}"을 "{replaced}"으로 한다.'
+        else:  # 규칙 16-2: B에 받침이 없는 경우
+            return f'"{orig}{josa}"를 "{replaced}로{clean_josa[2:]}"로 한다.'
+    
+    elif clean_josa == "라":  # 규칙 17: A라 -> B이라/라
+        if replaced_has_batchim:  # 규칙 17-1: B에 받침이 있는 경우
+            quote_prefix = '"' if josa and josa.startswith('"') else ""
+            return f'"{orig}{josa}"를 "{replaced}이{quote_prefix}라"로 한다.'
+        else:  # 규칙 17-2: B에 받침이 없는 경우
+            return f'"{orig}"를 "{replaced}"로 한다.'
+    
+    elif clean_josa == "이라":  # 규칙 18: A이라 -> B이라/라
+        if replaced_has_batchim: # B에 받침이 있는 경우
+            if replaced_has_rieul:  # 규칙 18-1-1: B의 받침이 ㄹ인 경우
+                return f'"{orig}"을 "{replaced}"로 한다.'
+            else:  # 규칙 18-1-2: B의 받침이 ㄹ이 아닌 경우
+                return f'"{orig}"을 "{replaced}"으로 한다.'
+        else:  # 규칙 18-2: B에 받침이 없는 경우
+            quote_prefix = '"' if josa and josa.startswith('"') else ""
+            return f'"{orig}{josa}"을 "{replaced}{quote_prefix}라"로 한다.'
+    
+    # 기본 출력 형식 (위에 정의된 규칙에 해당하지 않는 경우)
+    if orig_has_batchim:
+        return f'"{orig}"을 "{replaced}"로 한다.'
+    else:
+        return f'"{orig}"를 "{replaced}"로 한다.'
+
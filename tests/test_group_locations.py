@@ -0,0 +1,49 @@
+# 개정문 위치 인용(group_locations)의 정렬과 묶음 형식을 확인합니다.
+import pytest
+
+from law_processor import AmendmentLocation as L
+from law_processor import group_locations
+
+CASES = [
+    # 호 하나
+    ([L("제3조", "1", "2.", None, None, "")], "제3조제1항제2호"),
+    # 같은 항의 호목은 번호 순으로 가운뎃점 연결
+    ([L("제3조", "1", "10.", None, None, ""), L("제3조", "1", "2.", None, "나.", ""), L("제3조", "1", "2.", None, "가.", "")],
+     "제3조제1항제2호가목ㆍ제2호나목ㆍ제10호"),
+    # 같은 조의 여러 항은 쉼표와 '및'으로 연결
+    ([L("제3조", "2", "1.", None, None, ""), L("제3조", "1", "1.", None, None, ""), L("제3조", "3", "4.", None, None, "")],
+     "제3조제1항제1호, 제3조제2항제1호 및 제3조제3항제4호"),
+    # 조는 조번호, 가지번호 순
+    ([L("제10조의2", "", "1.", None, None, ""), L("제2조", "1", "1.", None, None, ""), L("제10조", "", "1.", None, None, "")],
+     "제2조제1항제1호제10조제1호제10조의2제1호"),
+    # 가지번호가 있는 호의 목은 호 단위로만 인용
+    ([L("제5조", "1", "14.", "3", None, ""), L("제5조", "1", "14.", "3", "가.", ""), L("제5조", "1", "2.", None, None, "")],
+     "제5조제1항제2호ㆍ제14호의3"),
+    # 항이 없는 조의 호목
+    ([L("제4조", "", "1.", None, None, ""), L("제4조", "", "1.", None, "다.", "")], "제4조제1호ㆍ제1호다목"),
+    # 중복 위치는 한 번만 인용
+    ([L("제7조", "1", "1.", None, None, "")] * 3, "제7조제1항제1호"),
+]
+
+
+@pytest.mark.parametrize("locations, expected", CASES)
+def test_group_locations(locations, expected):
+    assert group_locations(locations) == expected
+    assert group_locations(list(reversed(locations))) == expected
+
+
+def test_locations_without_item_are_not_cited():
+    # 호/목 번호가 없는 위치(조문 제목/본문, 항 본문, 각 목 외의 부분)는 묶음 인용에서 빠짐
+    without_item = [L("제1조", "", None, None, None, "제목"), L("제1조", "", None, None, None, "제목 및 본문"),
+                    L("제1조", "", None, None, None, ""), L("제2조", "1", None, None, None, ""),
+                    L("제6조", "1", None, None, None, "각 목 외의 부분")]
+    assert group_locations(without_item) == ""
+    assert group_locations(without_item + [L("제6조", "1", "3.", None, None, "")]) == "제6조제1항제3호"
+
+
+def test_location_str():
+    assert [str(location) for location in [
+        L("제1조", "", None, None, None, "제목"), L("제1조", "", None, None, None, "제목 및 본문"),
+        L("제2조", "1", None, None, None, ""), L("제6조", "1", None, None, None, "각 목 외의 부분"),
+        L("제5조", "1", "14.", "3", "가.", ""),
+    ]] == ["제1조 제목", "제1조 제목 및 본문", "제2조제1항", "제6조제1항 각 목 외의 부분", "제5조제1항제14.호의3가.목"]
@@ -0,0 +1,35 @@
+# 조사 규칙표(apply_josa_rule)가 예전 if-문 버전과 같은 개정문 형식을 만드는지 확인합니다.
+import itertools
+
+import pytest
+
+import law_processor
+import legacy_josa
+
+# 조사 없음, 규칙이 있는 18가지 조사, 규칙표에 없는 조사(기본 형식)
+JOSA_LIST = [None, "을", "를", "과", "와", "이", "가", "이나", "나", "으로", "로", "은", "는",
+             "란", "이란", "라", "이라", "로서", "으로서", "로써", "으로써", "의", "도"]
+# 따옴표가 붙은 조사 (예: "\"란")
+JOSA_VARIANTS = JOSA_LIST + ['"' + josa for josa in JOSA_LIST if josa]
+
+# 마지막 글자 받침 종류별 단어: 받침 없음, ㄹ 외의 받침, ㄹ 받침, 한글이 아닌 글자, 빈 문자열
+WORDS = ["대학교", "지방법원", "법률", "A", "제1조", "「민법」", ""]
+
+
+@pytest.mark.parametrize("josa", JOSA_VARIANTS)
+def test_apply_josa_rule_matches_legacy(josa):
+    for orig, replaced in itertools.product(WORDS, WORDS):
+        expected = legacy_josa.apply_josa_rule(orig, replaced, josa)
+        assert law_processor.apply_josa_rule(orig, replaced, josa) == expected, (orig, replaced, josa)
+
+
+def test_batchim_class_matches_legacy():
+    for word in WORDS + ["가", "힣", "각", "갈", "ㄱ", "가나다라"]:
+        expected = 0 if not legacy_josa.has_batchim(word) else 2 if legacy_josa.has_rieul_batchim(word) else 1
+        assert law_processor.batchim_class(word) == expected, word
+
+
+def test_rule_table_has_no_code_objects():
+    rules = list(law_processor.JOSA_RULE_TABLE.values()) + list(law_processor._DEFAULT_JOSA_RULES.values())
+    for rule in rules:
+        assert isinstance(rule, tuple) and all(isinstance(piece, str) for piece in rule)
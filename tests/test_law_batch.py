@@ -0,0 +1,103 @@
+# 개정문 일괄 생성 도구(law_batch.py)의 행 묶기(--combine)와 이어서 처리하기(--resume)를 가짜 법제처 API로 확인합니다.
+import json
+
+import pytest
+
+import law_batch
+import law_processor
+
+
+@pytest.fixture
+def batch_env(temp_store, fake_api, monkeypatch):
+    """임시 캐시와 가짜 API로 일괄 생성을 실행할 환경 (main이 바꾸는 모듈 설정은 테스트 후 되돌림)"""
+    monkeypatch.setattr(law_processor, "DEBUG_LOG", False)
+    monkeypatch.setattr(law_processor, "PARSE_PROCESSES", 0)
+    fake_api.add("1", "법원조직법", "지방법원과 가정법원을 둔다.")
+    fake_api.add("2", "검찰청법", "지방검찰청은 지방법원에 대응하여 둔다.")
+    fake_api.add("3", "경찰법", "경찰청과 가정법원은 협력한다.")
+    return fake_api
+
+
+def write_pairs(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def laws_by_rows(records):
+    result = {}
+    for record in records:
+        if record["type"] == "law":
+            result.setdefault(tuple(record["rows"]), []).append(record["law"])
+    return result
+
+
+def test_plan_runs_combines_rows_with_same_exclusions():
+    rows = [(2, "지방법원", "지방재판소", []), (3, "가정법원", "가사법원", []), (4, "경찰청", "경찰본부", ["경찰법"]),
+            (5, "검찰청", "검찰본부", ["경찰법 "])]
+    assert law_batch.plan_runs(rows, [], combine=False) == [
+        ([2], [("지방법원", "지방재판소")], []), ([3], [("가정법원", "가사법원")], []),
+        ([4], [("경찰청", "경찰본부")], ["경찰법"]), ([5], [("검찰청", "검찰본부")], ["경찰법 "]),
+    ]
+    assert law_batch.plan_runs(rows, ["검찰청법"], combine=True) == [
+        ([2, 3], [("지방법원", "지방재판소"), ("가정법원", "가사법원")], ["검찰청법"]),
+        ([4, 5], [("경찰청", "경찰본부"), ("검찰청", "검찰본부")], ["경찰법", "검찰청법"]),
+    ]
+
+
+def test_combine_writes_one_amendment_per_law(batch_env, tmp_path):
+    pairs = write_pairs(tmp_path / "pairs.csv", ["find,replace,exclude", "지방법원,지방재판소,", "가정법원,가사법원,"])
+    output = str(tmp_path / "result.jsonl")
+    law_batch.main([pairs, "--output", output, "--combine"])
+    records = read_records(output)
+    assert laws_by_rows(records) == {(2, 3): ["법원조직법", "검찰청법", "경찰법"]}
+    amendment = next(record["amendment"] for record in records if record.get("law") == "법원조직법")
+    assert "지방재판소" in amendment and "가사법원" in amendment # 두 쌍의 개정 규칙을 한 개정문에 합침
+    [run] = [record for record in records if record["type"] == "run"]
+    assert run["pairs"] == [["지방법원", "지방재판소"], ["가정법원", "가사법원"]]
+    assert run["complete"] and run["amended"] == 3
+
+
+def test_resume_redoes_only_incomplete_runs(batch_env, tmp_path):
+    pairs = write_pairs(tmp_path / "pairs.jsonl", [
+        json.dumps({"find": "지방법원", "replace": "지방재판소"}, ensure_ascii=False),
+        json.dumps({"find": "가정법원", "replace": "가사법원", "exclude": "경찰법"}, ensure_ascii=False),
+    ])
+    output = str(tmp_path / "result.jsonl")
+    batch_env.failing.add("2") # 검찰청법 본문을 가져오지 못함 → 1행 실행 단위가 완전하지 않음
+    with pytest.raises(SystemExit, match="1개 실행 단위"):
+        law_batch.main([pairs, "--output", output])
+    records = read_records(output)
+    assert [(record["rows"], record["complete"]) for record in records if record["type"] == "run"] == [
+        ([1], False), ([2], True)]
+    with open(output, "a", encoding="utf-8") as f:
+        f.write('{"type": "law", "rows": [1], "la') # 중단되며 잘린 마지막 줄
+    
+    batch_env.failing.clear()
+    batch_env.requests.clear()
+    law_batch.main([pairs, "--output", output, "--resume"])
+    # 끝난 2행은 다시 검색하지 않음
+    assert all("%EA%B0%80%EC%A0%95%EB%B2%95%EC%9B%90" not in url for url in batch_env.requests_to("lawSearch.do"))
+    records = read_records(output)
+    assert [(record["rows"], record["complete"]) for record in records if record["type"] == "run"] == [
+        ([2], True), ([1], True)]
+    assert laws_by_rows(records) == {(2,): ["법원조직법"], (1,): ["법원조직법", "검찰청법"]}
+
+
+def test_resume_requires_jsonl_output(batch_env, tmp_path):
+    pairs = write_pairs(tmp_path / "pairs.csv", ["지방법원,지방재판소"])
+    with pytest.raises(SystemExit, match="JSONL"):
+        law_batch.main([pairs, "--output", str(tmp_path / "result.html"), "--resume"])
+
+
+def test_html_output(batch_env, tmp_path):
+    pairs = write_pairs(tmp_path / "pairs.csv", ["지방법원,지방재판소", "고등법원,고등재판소"])
+    output = tmp_path / "result.html"
+    law_batch.main([pairs, "--output", str(output)])
+    text = output.read_text(encoding="utf-8")
+    assert text.count("<h2>") == 2 and text.endswith("</html>\n")
+    assert "개정 대상 조문이 없습니다" in text # 2행은 찾을 문자열이 있는 법률이 없음
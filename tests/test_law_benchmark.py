@@ -0,0 +1,57 @@
+# 녹화된 API 응답(tests/fixtures/benchmark)을 FixtureServer로 재생하여 성능 측정 보고서의 형식과 compare_reports 판정을 확인합니다.
+import contextlib
+import copy
+import io
+import os
+
+import pytest
+
+from law_benchmark import FixtureServer, compare_reports, fixture_key, run_benchmark
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "benchmark")
+
+
+@pytest.fixture(scope="module")
+def report():
+    server = FixtureServer(FIXTURES_DIR).start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return run_benchmark(server, server.manifest["scenarios"])
+    finally:
+        server.shutdown()
+
+
+def test_fixture_key_ignores_auth_key_and_parameter_order():
+    assert fixture_key("/DRF/lawService.do?OC=secret&type=XML&MST=200001&target=law") == \
+        "lawService.do?MST=200001&target=law&type=XML"
+
+
+def test_report_shape(report):
+    assert list(report["scenarios"]) == ["search-word", "search-boolean", "amend-word"]
+    for measured in report["scenarios"].values():
+        assert {"wall_seconds", "bytes_parsed", "peak_rss_kb", "stages", "run_report", "results", "result_sha1",
+                "requests", "wall_seconds_all"} <= set(measured)
+        assert all(counts["missing"] == 0 for counts in measured["requests"].values())
+    word = report["scenarios"]["search-word"]
+    assert word["results"] == 2
+    assert word["requests"]["lawSearch.do"]["requests"] == 1
+    assert word["requests"]["lawService.do"]["requests"] == 2
+    assert word["bytes_parsed"] == word["requests"]["lawService.do"]["bytes"]
+    assert report["scenarios"]["amend-word"]["results"] == 2
+
+
+def test_same_report_has_no_regressions(report):
+    assert compare_reports(report, report) == []
+
+
+def test_compare_reports_flags_regressions(report):
+    baseline = copy.deepcopy(report)
+    base = baseline["scenarios"]["search-word"]
+    base["result_sha1"] = "0" * 40
+    base["requests"]["lawService.do"]["requests"] -= 1
+    base["bytes_parsed"] -= 1
+    base["wall_seconds"] = report["scenarios"]["search-word"]["wall_seconds"] / 2
+    regressions = compare_reports(report, baseline, tolerance=0.2)
+    assert len(regressions) == 4
+    assert all(regression.startswith("search-word: ") for regression in regressions)
+    assert compare_reports(report, baseline, tolerance=10.0) == regressions[:3]
@@ -0,0 +1,79 @@
+# 법령 XML 디스크 캐시(SQLite에 zlib 압축 저장)의 LRU 제거, 최근 사용 시각 갱신, 손상된 항목 다시 받기를 확인합니다.
+import law_processor
+from fake_law_api import law_xml
+
+
+def cached_msts():
+    with law_processor._cache_lock:
+        conn = law_processor._get_cache_conn()
+        return {mst for mst, in conn.execute("SELECT mst FROM law_text")}
+
+
+def set_last_access(mst, value):
+    with law_processor._cache_lock:
+        conn = law_processor._get_cache_conn()
+        conn.execute("UPDATE law_text SET last_access = ? WHERE mst = ?", (value, mst))
+        conn.commit()
+
+
+def last_access(mst):
+    with law_processor._cache_lock:
+        conn = law_processor._get_cache_conn()
+        return conn.execute("SELECT last_access FROM law_text WHERE mst = ?", (mst,)).fetchone()[0]
+
+
+def test_store_and_read_back(temp_store):
+    law_processor.store_cached_law_text("1", b"<law>1</law>")
+    assert law_processor.get_cached_law_text("1") == b"<law>1</law>"
+    assert law_processor.get_cached_law_text("2") is None
+
+
+def test_evicts_least_recently_used_over_limit(temp_store, monkeypatch):
+    monkeypatch.setattr(law_processor, "CACHE_MAX_BYTES", 250)
+    monkeypatch.setattr(law_processor, "CACHE_TOUCH_INTERVAL", 0)
+    law_processor._store_compressed_law_text("a", b"a" * 100)
+    law_processor._store_compressed_law_text("b", b"b" * 100)
+    set_last_access("a", 1.0)
+    set_last_access("b", 2.0)
+    assert law_processor._get_cached_compressed("a") == b"a" * 100 # 읽으면 a가 가장 최근에 쓰인 항목이 됨
+    law_processor._store_compressed_law_text("c", b"c" * 100)
+    assert cached_msts() == {"a", "c"}
+
+
+def test_recent_reads_do_not_rewrite_last_access(temp_store, monkeypatch):
+    monkeypatch.setattr(law_processor, "CACHE_TOUCH_INTERVAL", 3600)
+    law_processor._store_compressed_law_text("a", b"a")
+    stored = last_access("a")
+    law_processor._get_cached_compressed("a")
+    assert last_access("a") == stored
+    set_last_access("a", stored - 7200)
+    law_processor._get_cached_compressed("a")
+    assert last_access("a") > stored - 7200
+
+
+def test_disabled_cache_stores_nothing(temp_store, monkeypatch):
+    monkeypatch.setattr(law_processor, "CACHE_MAX_BYTES", 0)
+    law_processor.store_cached_law_text("1", b"<law>1</law>")
+    assert law_processor.get_cached_law_text("1") is None
+    assert not (temp_store / "law_text.sqlite3").exists()
+
+
+def test_corrupt_blob_is_refetched_and_replaced(temp_store, fake_api):
+    fake_api.add("100", "시험법", "지방법원에 둔다.")
+    law_processor._store_compressed_law_text("100", b"not zlib data")
+    metrics = law_processor.RunMetrics()
+    units, error = law_processor._fetch_and_parse_law("100", metrics)
+    assert error is None
+    assert [unit.raw for unit in units if unit.raw] == ["제1조 지방법원에 둔다."]
+    assert metrics.counters["cache_hits"] == 1 and metrics.counters["cache_misses"] == 1
+    assert len(fake_api.requests_to("lawService.do")) == 1
+    assert law_processor.get_cached_law_text("100") == law_xml("시험법", "지방법원에 둔다.")
+    # 다시 읽으면 캐시에서 바로 가져옴
+    units, error = law_processor._fetch_and_parse_law("100")
+    assert error is None and len(fake_api.requests_to("lawService.do")) == 1
+
+
+def test_responses_without_articles_are_not_cached(temp_store, fake_api):
+    units, error = law_processor._fetch_and_parse_law("404")
+    assert (units, error) == ([], None)
+    assert law_processor.get_cached_law_text("404") is None
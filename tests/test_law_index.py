@@ -0,0 +1,98 @@
+# 로컬 전문 색인의 구축과 동기화(변경/삭제 감지, 매니페스트), 색인 검색의 현행 법률 목록 검증을 확인합니다.
+import json
+
+import pytest
+
+import law_processor
+
+
+@pytest.fixture
+def indexed(temp_store, fake_api):
+    """법률 세 개로 색인을 구축한 상태의 가짜 API"""
+    fake_api.add("1", "법원조직법", "지방법원을 둔다.", law_id="A")
+    fake_api.add("2", "검찰청법", "지방검찰청을 둔다.", law_id="B")
+    fake_api.add("3", "경찰법", "경찰청을 둔다.", law_id="C")
+    assert law_processor.build_law_index() == 3
+    return fake_api
+
+
+def search(text):
+    laws = law_processor.search_law_index(text)
+    return None if laws is None else [law["MST"] for law in laws]
+
+
+def index_state():
+    with law_processor._index_lock:
+        conn = law_processor._get_index_conn()
+        laws = dict(conn.execute("SELECT mst, name FROM indexed_law"))
+        postings = dict(conn.execute("SELECT gram, COUNT(*) FROM posting GROUP BY gram"))
+        gram_counts = dict(conn.execute("SELECT gram, n FROM gram_count"))
+    return laws, postings, gram_counts
+
+
+def test_build_writes_index_and_manifest(indexed):
+    assert search("지방") == ["1", "2"]
+    assert search("지방 법원") == ["1"] # 띄어쓰기 무시
+    assert search("해양경찰청") == []
+    manifest = law_processor.load_sync_manifest()
+    assert manifest["mode"] == "build"
+    assert manifest["laws"] == {"A": {"법령명": "법원조직법", "MST": "1"}, "B": {"법령명": "검찰청법", "MST": "2"},
+                                "C": {"법령명": "경찰법", "MST": "3"}}
+    _, postings, gram_counts = index_state()
+    assert gram_counts == postings
+
+
+def test_sync_detects_amended_added_and_removed_laws(indexed):
+    del indexed.laws["2"] # 검찰청법 개정: MST가 바뀌고 본문도 바뀜
+    indexed.add("22", "검찰청법", "고등검찰청을 둔다.", law_id="B")
+    del indexed.laws["3"] # 경찰법 폐지
+    indexed.add("4", "해양경찰법", "해양경찰청을 둔다.", law_id="D") # 새 법률
+    indexed.requests.clear()
+    
+    summary = law_processor.sync_law_index()
+    assert summary == {"added": 1, "updated": 1, "removed": 1, "unchanged": 1, "failed": 0}
+    # 바뀌지 않은 법원조직법은 본문을 다시 받지 않음
+    assert sorted(url.rsplit("MST=", 1)[1].split("&")[0] for url in indexed.requests_to("lawService.do")) == ["22", "4"]
+    assert search("검찰청") == ["22"]
+    assert search("지방검찰청") == []
+    assert search("경찰청") == ["4"]
+    laws, postings, gram_counts = index_state()
+    assert laws == {"1": "법원조직법", "22": "검찰청법", "4": "해양경찰법"}
+    assert gram_counts == postings
+    with open(law_processor.SYNC_MANIFEST_PATH, encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["mode"] == "sync" and manifest["summary"] == summary
+    assert {key: entry["MST"] for key, entry in manifest["laws"].items()} == {"A": "1", "B": "22", "D": "4"}
+
+
+def test_sync_keeps_old_entry_when_fetch_fails(indexed):
+    del indexed.laws["2"]
+    indexed.add("22", "검찰청법", "고등검찰청을 둔다.", law_id="B")
+    indexed.failing.add("22")
+    summary = law_processor.sync_law_index()
+    assert summary["failed"] == 1 and summary["updated"] == 0
+    assert law_processor.load_sync_manifest()["laws"]["B"]["MST"] == "2"
+    assert index_state()[0]["2"] == "검찰청법"
+    
+    indexed.failing.clear() # 다음 동기화 때 다시 시도
+    assert law_processor.sync_law_index()["updated"] == 1
+    assert law_processor.load_sync_manifest()["laws"]["B"]["MST"] == "22"
+
+
+def test_search_falls_back_when_index_differs_from_current_laws(indexed, monkeypatch):
+    assert search("지방법원") == ["1"]
+    indexed.add("4", "해양경찰법", "지방법원에 알린다.", law_id="D") # 색인 이후 새로 생긴 법률
+    assert search("지방법원") == ["1"] # 현행 법률 목록은 INDEX_VERIFY_INTERVAL 동안 재사용
+    monkeypatch.setattr(law_processor, "INDEX_VERIFY_INTERVAL", 0)
+    assert search("지방법원") is None
+    law_processor.sync_law_index()
+    assert search("지방법원") == ["1", "4"]
+
+
+def test_search_ignores_old_index(indexed, monkeypatch):
+    monkeypatch.setattr(law_processor, "INDEX_MAX_AGE", 0)
+    assert search("지방법원") is None
+
+
+def test_single_character_query_is_not_answered_from_index(indexed):
+    assert search("법") is None
@@ -0,0 +1,128 @@
+# 백그라운드 작업 관리자(JobManager)의 결과 저장, 취소, 실패 처리, 서버 재시작 후 중단 표시를 확인합니다.
+import threading
+import time
+
+import pytest
+
+import law_jobs
+import law_processor
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    """
+    작업이 실행하는 검색을 가짜로 바꿈. 검색어별로 (법률명, 조문 목록) 목록을 반환하며,
+    gates[검색어]가 있으면 첫 법률을 반환한 뒤 그 이벤트가 설정될 때까지 기다림
+    """
+    fake = {"results": {}, "gates": {}, "calls": []}
+
+    def iter_search_logic_cached(query, unit="법률", max_workers=None, cache=None):
+        fake["calls"].append(query)
+        if query == "(":
+            raise ValueError("검색식 오류: 괄호가 맞지 않습니다.")
+        results = fake["results"][query]
+        for processed, (law_name, sections) in enumerate(results, 1):
+            yield processed, len(results), law_name, sections
+            if processed == 1 and query in fake["gates"]:
+                fake["gates"][query].wait(5)
+
+    monkeypatch.setattr(law_processor, "iter_search_logic_cached", iter_search_logic_cached)
+    return fake
+
+
+def wait_for(jobs, job_id, states=law_jobs.FINISHED_STATES):
+    deadline = time.monotonic() + 5
+    while (job := jobs.get_job(job_id))["state"] not in states:
+        assert time.monotonic() < deadline, f"시간 초과: {job}"
+        time.sleep(0.01)
+    return job
+
+
+def wait_for_processed(jobs, job_id, processed):
+    deadline = time.monotonic() + 5
+    while jobs.get_job(job_id)["processed"] < processed:
+        assert time.monotonic() < deadline, "시간 초과"
+        time.sleep(0.01)
+
+
+def test_finished_job_keeps_results(tmp_path, searches):
+    searches["results"]["법원"] = [("법원조직법", ["<p>제1조</p>", "<p>제2조</p>"]), ("검찰청법", []), ("경찰법", ["<p>제3조</p>"])]
+    jobs = law_jobs.JobManager(db_path=str(tmp_path / "jobs.sqlite3"))
+    job_id = jobs.submit("search", {"query": "법원"})
+    job = wait_for(jobs, job_id)
+    assert (job["state"], job["processed"], job["total"], job["found"]) == ("done", 3, 3, 2)
+    assert jobs.get_summary(job_id) == [(0, "법원조직법", 2), (1, "경찰법", 1)]
+    assert jobs.get_item(job_id, 1) == ["경찰법", ["<p>제3조</p>"]]
+    assert jobs.get_items(job_id, 1) == [["경찰법", ["<p>제3조</p>"]]]
+
+
+def test_invalid_query_fails_job(tmp_path, searches):
+    jobs = law_jobs.JobManager(db_path=str(tmp_path / "jobs.sqlite3"))
+    job = wait_for(jobs, jobs.submit("search", {"query": "("}))
+    assert job["state"] == "failed"
+    assert job["error"] == "검색식 오류: 괄호가 맞지 않습니다."
+
+
+def test_cancel_running_job_stops_after_current_law(tmp_path, searches):
+    searches["results"]["법원"] = [("법원조직법", ["<p>1</p>"]), ("검찰청법", ["<p>2</p>"]), ("경찰법", ["<p>3</p>"])]
+    gate = searches["gates"]["법원"] = threading.Event()
+    jobs = law_jobs.JobManager(db_path=str(tmp_path / "jobs.sqlite3"))
+    job_id = jobs.submit("search", {"query": "법원"})
+    wait_for_processed(jobs, job_id, 1) # 첫 법률을 저장하고 두 번째 법률을 처리하는 중
+    jobs.cancel(job_id)
+    assert jobs.is_cancelling(job_id)
+    gate.set()
+    job = wait_for(jobs, job_id)
+    assert (job["state"], job["processed"], job["found"]) == ("cancelled", 2, 2)
+    assert not jobs.is_cancelling(job_id)
+
+
+def test_cancel_queued_job_never_runs(tmp_path, searches):
+    searches["results"]["법원"] = [("법원조직법", ["<p>1</p>"]), ("검찰청법", ["<p>2</p>"])]
+    searches["results"]["검찰"] = [("검찰청법", ["<p>2</p>"])]
+    gate = searches["gates"]["법원"] = threading.Event()
+    jobs = law_jobs.JobManager(db_path=str(tmp_path / "jobs.sqlite3"), max_running=1)
+    first = jobs.submit("search", {"query": "법원"})
+    second = jobs.submit("search", {"query": "검찰"})
+    wait_for(jobs, first, ("running",))
+    jobs.cancel(second)
+    assert jobs.get_job(second)["state"] == "cancelled" # 대기 중인 작업은 바로 취소됨
+    gate.set()
+    assert wait_for(jobs, first)["state"] == "done"
+    jobs._executor.shutdown(wait=True)
+    assert searches["calls"] == ["법원"]
+    assert not jobs.is_cancelling(second)
+
+
+def test_cancel_ignores_finished_and_unknown_jobs(tmp_path, searches):
+    searches["results"]["법원"] = []
+    jobs = law_jobs.JobManager(db_path=str(tmp_path / "jobs.sqlite3"))
+    job_id = jobs.submit("search", {"query": "법원"})
+    wait_for(jobs, job_id)
+    jobs.cancel(job_id)
+    jobs.cancel("없는작업")
+    assert jobs.get_job(job_id)["state"] == "done"
+    assert not jobs.is_cancelling(job_id) and not jobs.is_cancelling("없는작업")
+
+
+def test_restart_marks_unfinished_jobs_interrupted(tmp_path, searches):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    searches["results"]["법원"] = [("법원조직법", ["<p>1</p>"]), ("검찰청법", ["<p>2</p>"])]
+    gate = searches["gates"]["법원"] = threading.Event()
+    jobs = law_jobs.JobManager(db_path=db_path, max_running=1)
+    running = jobs.submit("search", {"query": "법원"})
+    queued = jobs.submit("search", {"query": "법원"})
+    wait_for_processed(jobs, running, 1)
+    
+    restarted = law_jobs.JobManager(db_path=db_path) # 같은 저장 파일로 서버가 다시 시작된 경우
+    assert restarted.get_job(running)["state"] == "interrupted"
+    assert restarted.get_job(queued)["state"] == "interrupted"
+    assert restarted.get_summary(running) == [(0, "법원조직법", 1)] # 중단 전까지의 결과는 남음
+    gate.set()
+    jobs._executor.shutdown(wait=True)
+
+
+def test_unknown_kind_is_rejected(tmp_path):
+    jobs = law_jobs.JobManager(db_path=str(tmp_path / "jobs.sqlite3"))
+    with pytest.raises(ValueError):
+        jobs.submit("index", {})
@@ -0,0 +1,76 @@
+# 다중 패턴 자동자(MultiPatternMatcher)와 LawMatcher의 출현 위치를 단순 str.find 탐색과 비교합니다.
+import random
+
+import pytest
+
+from law_processor import LawMatcher, LawTextUnit, MultiPatternMatcher
+
+
+def find_all(text, patterns):
+    """패턴마다 str.find로 겹치는 출현까지 모두 찾아 (시작, 끝, 패턴 번호) 집합으로 반환"""
+    hits = set()
+    for idx, pattern in enumerate(patterns):
+        pos = text.find(pattern)
+        while pos != -1:
+            hits.add((pos, pos + len(pattern), idx))
+            pos = text.find(pattern, pos + 1)
+    return hits
+
+
+# 서로 겹치거나 다른 패턴을 포함하는 패턴들
+PATTERNS = ["법원", "지방법원", "원장", "법원법원", "방법", "지방", "원"]
+
+
+@pytest.mark.parametrize("text", [
+    "지방법원장은 지방법원법원에 보고한다.",
+    "법원법원법원",
+    "원원원",
+    "",
+    "관련 없는 문장",
+])
+def test_finditer_matches_str_find(text):
+    hits = list(MultiPatternMatcher(PATTERNS).finditer(text))
+    assert len(hits) == len(set(hits))
+    assert set(hits) == find_all(text, PATTERNS)
+    assert [end for _, end, _ in hits] == sorted(end for _, end, _ in hits)
+
+
+def test_finditer_matches_str_find_on_random_texts():
+    rng = random.Random(0)
+    for _ in range(300):
+        patterns = ["".join(rng.choice("가나다") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 5))]
+        text = "".join(rng.choice("가나다 ") for _ in range(rng.randint(0, 40)))
+        assert set(MultiPatternMatcher(patterns).finditer(text)) == find_all(text, patterns), (patterns, text)
+
+
+def make_unit(raw, kind="항"):
+    return LawTextUnit(kind, "제1조", False, raw, 항번호="1")
+
+
+def test_law_matcher_spans_match_str_find():
+    raw = "지방법원장은 「지방법원」과 고등법원에 지방법원법원을 보고한다."
+    terms = [("지방법원", False), ("법원", False), ("법원에 지방", True)]
+    records = LawMatcher(terms).match_unit("시험법", 0, make_unit(raw))
+    got = {(record.span[0], record.span[1], record.term) for record in records}
+    assert got == find_all(raw, [text for text, _ in terms])
+    assert [record.span for record in records] == sorted(record.span for record in records)
+
+
+def test_law_matcher_chunks_and_josa():
+    raw = "지방법원장은 「지방법원」과 지방법원을 관할 법원에 지방 보고한다."
+    records = LawMatcher([("지방법원", False), ("법원에 지방", True)]).match_unit("시험법", 0, make_unit(raw))
+    assert [(raw[record.span[0]:record.span[1]], record.chunk, record.josa, record.suffix) for record in records] == [
+        ("지방법원", "지방법원장은", None, None),
+        ("지방법원", "「지방법원」과", None, None),
+        ("지방법원", "지방법원", "을", None),
+        ("법원에 지방", "법원에 지방", None, None),
+    ]
+
+
+def test_spacing_insensitive_search_finds_term_only_without_spaces():
+    unit = make_unit("특정범죄 가중처벌 등에 관한 법률")
+    matcher = LawMatcher([("특정범죄가중처벌", False)], spacing_insensitive=True)
+    assert [(record.term, record.span) for record in matcher.match_unit("시험법", 0, unit)] == [(0, None)]
+    # 조문 제목은 공백 무시 검색 대상이 아님
+    assert LawMatcher([("특정범죄가중처벌", False)], spacing_insensitive=True).match_unit(
+        "시험법", 0, make_unit(unit.raw, kind="제목")) == []
@@ -0,0 +1,74 @@
+# 법령 XML을 텍스트 단위(LawTextUnit) 평면 목록으로 바꾸는 parse_law_units의 순서와 번호를 확인합니다.
+import xml.etree.ElementTree as ET
+import zlib
+
+import pytest
+
+import law_processor
+
+SAMPLE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<법령><기본정보><법령명_한글>시험법</법령명_한글></기본정보>
+<조문>
+<조문단위><조문번호>1</조문번호><조문제목>목적</조문제목><조문내용>제1조(목적) 이 법은 지방법원에 관하여 정한다.</조문내용></조문단위>
+<조문단위><조문번호>2</조문번호><조문가지번호>3</조문가지번호><조문제목>정의</조문제목><조문내용>제2조의3(정의) </조문내용>
+<항><항번호>①</항번호><항내용>① 이 법에서 사용하는 용어의 뜻은 다음과 같다.</항내용>
+<호><호번호>1.</호번호><호내용>1. "법원"이란 지방법원을 말한다.</호내용></호>
+<호 구분="각목외의부분"><호번호>2.</호번호><호가지번호>2</호가지번호><호내용>2. 다음 각 목의 기관</호내용>
+<목><목번호>가.</목번호><목내용>가. 고등법원</목내용></목>
+<목><목번호>나.</목번호><목내용>나. 지방법원</목내용></목>
+</호>
+</항>
+<항><항번호>②</항번호><항내용>② 그 밖의 사항은 대통령령으로 정한다.</항내용></항>
+</조문단위>
+</조문>
+<부칙><조문단위><조문번호>1</조문번호><조문명>부칙</조문명><조문내용>이 법은 공포한 날부터 시행한다.</조문내용></조문단위></부칙>
+</법령>""".encode("utf-8")
+
+# (kind, 조문식별자, 항번호, 호번호, 호가지번호, 목번호, parent, 원문)
+EXPECTED = [
+    ("제목", "제1조", "", None, None, None, None, "목적"),
+    ("조문", "제1조", "", None, None, None, None, "제1조(목적) 이 법은 지방법원에 관하여 정한다."),
+    ("제목", "제2조의3", "", None, None, None, None, "정의"),
+    ("조문", "제2조의3", "", None, None, None, None, "제2조의3(정의) "),
+    ("항", "제2조의3", "1", None, None, None, None, "① 이 법에서 사용하는 용어의 뜻은 다음과 같다."),
+    ("호", "제2조의3", "1", "1.", None, None, 4, '1. "법원"이란 지방법원을 말한다.'),
+    ("호", "제2조의3", "1", "2.", "2", None, 4, "2. 다음 각 목의 기관"),
+    ("목", "제2조의3", "1", "2.", "2", "가.", 6, "가. 고등법원"),
+    ("목", "제2조의3", "1", "2.", "2", "나.", 6, "나. 지방법원"),
+    ("항", "제2조의3", "2", None, None, None, None, "② 그 밖의 사항은 대통령령으로 정한다."),
+    ("제목", "제1조", "", None, None, None, None, ""),
+    ("조문", "제1조", "", None, None, None, None, "이 법은 공포한 날부터 시행한다."),
+]
+
+
+def describe(units):
+    return [(u.kind, u.조문식별자, u.항번호, u.호번호, u.호가지번호, u.목번호, u.parent, u.raw) for u in units]
+
+
+def test_units_follow_document_order_and_numbering():
+    units = law_processor.parse_law_units(ET.fromstring(SAMPLE_XML).iter("조문단위"))
+    assert describe(units) == EXPECTED
+    assert [u.부칙 for u in units] == [False] * 10 + [True] * 2
+    assert [u.각목외의부분 for u in units if u.kind == "항"] == [True, False]
+    assert units[1].stripped == "제1조(목적)이법은지방법원에관하여정한다."
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, len(SAMPLE_XML)])
+def test_streaming_parse_matches_tree_parse(chunk_size):
+    chunks = (SAMPLE_XML[i:i + chunk_size] for i in range(0, len(SAMPLE_XML), chunk_size))
+    units = law_processor.parse_law_units(law_processor.iter_article_elements(chunks))
+    assert describe(units) == EXPECTED
+
+
+
+def test_worker_handler_is_scoped_to_one_run(monkeypatch):
+    monkeypatch.setattr(law_processor, "_worker_handlers", law_processor.OrderedDict())
+    compressed = zlib.compress(SAMPLE_XML)
+    task = ("amendment", (("지방법원", "지방재판소", False),), False)
+    first, error, _, _ = law_processor._run_law_task(1, task, "법원조직법", compressed)
+    assert error is None and first[0]
+    law_processor._run_law_task(1, task, "법원조직법", compressed)
+    law_processor._run_law_task(2, task, "법원조직법", compressed)
+    handlers = law_processor._worker_handlers
+    assert list(handlers) == [(1, task), (2, task)]
+    assert handlers[(1, task)] is not handlers[(2, task)]
@@ -0,0 +1,152 @@
+# 결과 캐시(ResultCache)의 적중/만료/제거, 같은 키 요청의 합류, 완전하지 않은 결과를 보관하지 않는 규칙을 확인합니다.
+import threading
+import time
+
+import pytest
+
+import law_processor
+from law_processor import ResultCache, RunMetrics, is_complete_run
+
+
+class Counted:
+    """호출 횟수를 세는 compute 함수 (items를 차례로 반환하는 제너레이터를 만듦)"""
+
+    def __init__(self, *items):
+        self.items = items
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return iter_items(self.items)
+
+
+def iter_items(items):
+    yield from items
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "시간 초과"
+        time.sleep(0.01)
+
+
+def test_second_request_is_a_hit():
+    cache = ResultCache(max_entries=4, ttl=60)
+    compute = Counted(1, 2, 3)
+    assert list(cache.iterate("k", compute)) == [1, 2, 3]
+    assert list(cache.iterate("k", compute)) == [1, 2, 3]
+    assert compute.calls == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "coalesced": 0, "size": 1, "running": 0}
+
+
+def test_incomplete_results_are_not_stored():
+    cache = ResultCache(max_entries=4, ttl=60)
+    compute = Counted(1)
+    assert list(cache.iterate("k", compute, lambda: False)) == [1]
+    assert list(cache.iterate("k", compute, lambda: True)) == [1]
+    list(cache.iterate("k", compute, lambda: True))
+    assert compute.calls == 2
+
+
+def test_failed_computation_is_not_stored():
+    cache = ResultCache(max_entries=4, ttl=60)
+
+    def compute():
+        yield 1
+        raise ValueError("검색식 오류")
+
+    with pytest.raises(ValueError):
+        list(cache.iterate("k", compute))
+    assert cache.stats()["size"] == 0 and cache.stats()["running"] == 0
+
+
+def test_expired_and_evicted_results_are_recomputed():
+    cache = ResultCache(max_entries=2, ttl=0)
+    compute = Counted(1)
+    list(cache.iterate("k", compute))
+    list(cache.iterate("k", compute))
+    assert compute.calls == 2 # 유효 시간이 지남
+    
+    cache = ResultCache(max_entries=2, ttl=60)
+    computes = {key: Counted(key) for key in "abc"}
+    for key in "abac": # b가 가장 오래 쓰이지 않은 결과
+        list(cache.iterate(key, computes[key]))
+    list(cache.iterate("a", computes["a"]))
+    list(cache.iterate("b", computes["b"]))
+    assert {key: compute.calls for key, compute in computes.items()} == {"a": 1, "b": 2, "c": 1}
+
+
+def test_concurrent_request_joins_running_computation():
+    cache = ResultCache(max_entries=4, ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        yield 1
+        started.set()
+        release.wait(5)
+        yield 2
+
+    results = {}
+    owner = threading.Thread(target=lambda: results.update(owner=list(cache.iterate("k", compute))))
+    owner.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.update(follower=list(cache.iterate("k", compute))))
+    follower.start()
+    wait_until(lambda: cache.stats()["coalesced"] == 1)
+    release.set()
+    owner.join(5)
+    follower.join(5)
+    assert results == {"owner": [1, 2], "follower": [1, 2]}
+    assert len(calls) == 1
+
+
+def test_follower_takes_over_when_owner_stops():
+    cache = ResultCache(max_entries=4, ttl=60)
+    compute = Counted(1, 2, 3)
+    owner = cache.iterate("k", compute)
+    assert next(owner) == 1
+    results = []
+    follower = threading.Thread(target=lambda: results.extend(cache.iterate("k", compute)))
+    follower.start()
+    wait_until(lambda: cache.stats()["coalesced"] == 1)
+    owner.close() # 계산하던 쪽이 도중에 그만둠
+    follower.join(5)
+    assert results == [1, 2, 3] # 이미 받은 항목은 다시 반환하지 않음
+    assert compute.calls == 2
+    assert list(cache.iterate("k", compute)) == [1, 2, 3]
+    assert compute.calls == 2
+
+
+def test_is_complete_run():
+    metrics = RunMetrics()
+    metrics.skip("배제된 법률")
+    assert is_complete_run(metrics)
+    metrics.skip("XML 데이터 없음")
+    assert not is_complete_run(metrics)
+    metrics = RunMetrics()
+    metrics.count("list_page_errors")
+    assert not is_complete_run(metrics)
+
+
+def test_search_with_missing_law_text_is_not_cached(temp_store, fake_api):
+    fake_api.add("1", "법원조직법", "지방법원을 둔다.")
+    fake_api.add("2", "검찰청법", "지방법원에 대응하여 둔다.")
+    fake_api.failing.add("2")
+    cache = ResultCache(max_entries=4, ttl=60)
+    first = [law_name for _, _, law_name, sections in law_processor.iter_search_logic_cached("지방법원", cache=cache)
+             if sections]
+    assert first == ["법원조직법"]
+    assert cache.stats()["size"] == 0
+    
+    fake_api.failing.clear()
+    second = [law_name for _, _, law_name, sections in law_processor.iter_search_logic_cached("지방법원", cache=cache)
+              if sections]
+    assert second == ["법원조직법", "검찰청법"]
+    assert cache.stats()["size"] == 1
+    requests = len(fake_api.requests)
+    list(law_processor.iter_search_logic_cached("지방법원", cache=cache))
+    assert len(fake_api.requests) == requests
@@ -0,0 +1,42 @@
+# 논리 검색식 판별(is_boolean_query)과 구문 해석(parse_search_query)을 확인합니다.
+import pytest
+
+import law_processor
+
+
+@pytest.mark.parametrize("query", ["법원 AND 검찰청", "NOT 군사법원 OR 법원", "(법원", "법원)", '법원 "군사', '"법원" "검찰청"'])
+def test_operators_parentheses_and_quotes_are_boolean(query):
+    assert law_processor.is_boolean_query(query)
+
+
+@pytest.mark.parametrize("query", ["지방법원", "특정범죄 가중처벌", '"특정범죄 가중처벌"', "시ㆍ도지사", "「형법」"])
+def test_plain_terms_and_single_phrase_are_not_boolean(query):
+    assert not law_processor.is_boolean_query(query)
+
+
+@pytest.mark.parametrize("query", ["(법원", "법원)", '법원 AND "군사', "법원 AND", "NOT 법원", '""'])
+def test_malformed_queries_raise_value_error(query):
+    with pytest.raises(ValueError):
+        law_processor.parse_search_query(query)
+
+
+def test_parse_search_query_precedence():
+    node, terms, positive = law_processor.parse_search_query('(법원 OR 검찰청) AND NOT "군사법원"')
+    assert terms == [("법원", False), ("검찰청", False), ("군사법원", True)]
+    assert node == ("and", ("or", ("term", 0), ("term", 1)), ("not", ("term", 2)))
+    assert positive == {0, 1}
+
+
+def test_malformed_search_raises_before_any_request(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("잘못된 검색식으로 법률 목록을 요청함")
+    monkeypatch.setattr(law_processor, "iter_law_list_from_api", fail)
+    with pytest.raises(ValueError):
+        list(law_processor.iter_search_logic("(법원"))
+
+
+def test_empty_query_does_not_list_all_laws(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("빈 검색어로 법률 목록을 요청함")
+    monkeypatch.setattr(law_processor, "_fetch_law_list_page", fail)
+    assert law_processor.get_law_list_from_api("") == []
@@ -0,0 +1,60 @@
+# 검색어와 띄어쓰기가 다른 출현의 하이라이트 위치와 개정문 인용 표기(원문 위치 되돌리기)를 확인합니다.
+import law_processor
+from law_processor import LawMatcher, LawTextUnit
+
+RAW = "제1조 이 법은 「특정범죄 가중처벌 등에 관한 법률」과 특정범죄  가중처벌을 정한다.\n특정범죄\n가중처벌"
+
+
+def test_clean_with_offsets_maps_back_to_raw_positions():
+    cleaned, offsets = law_processor.clean_with_offsets(" 특정 범죄\n가중")
+    assert cleaned == "특정범죄가중"
+    assert offsets == [1, 2, 4, 5, 7, 8]
+    cleaned, offsets = law_processor.clean_with_offsets(RAW)
+    assert "".join(RAW[i] for i in offsets) == cleaned
+
+
+def test_highlight_marks_original_spelling():
+    text = "이 법은 특정범죄 가중처벌과 특정범죄가중처벌, 특정범죄\n가중처벌을 정한다."
+    assert law_processor.highlight(text, "특정범죄가중처벌") == (
+        "이 법은 <mark>특정범죄 가중처벌</mark>과 <mark>특정범죄가중처벌</mark>, <mark>특정범죄\n가중처벌</mark>을 정한다."
+    )
+    assert law_processor.highlight(text, "특정범죄 가중 처벌") == law_processor.highlight(text, "특정범죄가중처벌")
+    # 큰따옴표로 감싼 구문은 원문 그대로만 표시
+    assert law_processor.highlight(text, '"특정범죄 가중처벌"') == (
+        "이 법은 <mark>특정범죄 가중처벌</mark>과 특정범죄가중처벌, 특정범죄\n가중처벌을 정한다."
+    )
+
+
+def test_spacing_variant_records_use_raw_spans():
+    unit = LawTextUnit("항", "제1조", False, RAW, 항번호="1")
+    for terms in ([("특정범죄가중처벌", False)], [("특정범죄 가중처벌", True)]):
+        records = LawMatcher(terms, spacing_variants=True).match_unit("시험법", 0, unit)
+        assert [RAW[start:end] for start, end in (record.span for record in records)] == [
+            "특정범죄 가중처벌", "특정범죄  가중처벌", "특정범죄\n가중처벌"]
+        for record in records:
+            assert record.matched in (None, RAW[record.span[0]:record.span[1]])
+    # 띄어쓰기까지 같은 출현은 원문 표기(matched) 없이 기록
+    records = LawMatcher([("특정범죄 가중처벌", True)], spacing_variants=True).match_unit("시험법", 0, unit)
+    assert [record.matched for record in records] == [None, "특정범죄  가중처벌", "특정범죄\n가중처벌"]
+    assert records[1].josa == "을"
+
+
+def test_amendment_quotes_original_spelling():
+    units = [
+        LawTextUnit("제목", "제1조", False, "목적"),
+        LawTextUnit("조문", "제1조", False, "제1조(목적)"),
+        LawTextUnit("항", "제1조", False, "① 다음 각 호의 사항", 항번호="1"),
+        LawTextUnit("호", "제1조", False, "1. 특정범죄 가중처벌을 위한 사항", parent=2, 항번호="1", 호번호="1."),
+        LawTextUnit("호", "제1조", False, "2. 특정범죄가중처벌을 위한 사항", parent=2, 항번호="1", 호번호="2."),
+    ]
+    handler = law_processor._make_law_handler(("amendment", (("특정범죄가중처벌", "특정범죄처벌", False),), True))
+    rules, skipped = handler("시험법", units, law_processor.RunMetrics())
+    assert sorted(rules) == [
+        '제1조제1항제1호 중 "특정범죄 가중처벌"을 "특정범죄처벌"로 한다.',
+        '제1조제1항제2호 중 "특정범죄가중처벌"을 "특정범죄처벌"로 한다.',
+    ]
+    assert skipped == []
+    # 띄어쓰기 무시 모드가 아니면 원문 표기가 다른 출현은 개정 대상이 아님
+    handler = law_processor._make_law_handler(("amendment", (("특정범죄가중처벌", "특정범죄처벌", False),), False))
+    rules, _ = handler("시험법", units, law_processor.RunMetrics())
+    assert rules == ['제1조제1항제2호 중 "특정범죄가중처벌"을 "특정범죄처벌"로 한다.']